@@ -0,0 +1,48 @@
+"""Measure local prayer time calculation throughput (location-days per second).
+
+Usage:
+    python benchmarks/bench_astronomical.py [--locations 1000] [--days 30]
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from athan.time_providers.astronomical import AstronomicalProvider, compute_prayer_hours
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--locations", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--method", default="5")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    coords = [(rng.uniform(-55, 55), rng.uniform(-180, 180)) for _ in range(args.locations)]
+    start = date(2025, 1, 1)
+    days = [start + timedelta(days=i) for i in range(args.days)]
+    total = args.locations * args.days
+
+    began = time.perf_counter()
+    for lat, lon in coords:
+        for day in days:
+            compute_prayer_hours(lat, lon, day, round(lon / 15), args.method)
+    raw = time.perf_counter() - began
+
+    provider = AstronomicalProvider()
+    date_strs = [d.isoformat() for d in days]
+    began = time.perf_counter()
+    for lat, lon in coords:
+        for day in date_strs:
+            provider.calculate(lat, lon, day, "UTC", args.method)
+    full = time.perf_counter() - began
+
+    print(f"location-days: {total:,}")
+    print(f"compute_prayer_hours:           {total / raw:>10,.0f}/s")
+    print(f"AstronomicalProvider.calculate: {total / full:>9,.0f}/s (incl. PrayerTimes model)")
+
+
+if __name__ == "__main__":
+    main()
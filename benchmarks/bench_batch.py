@@ -0,0 +1,53 @@
+"""Compare scalar vs. vectorized prayer time calculation throughput.
+
+Usage:
+    python benchmarks/bench_batch.py [--locations 10000] [--days 365] [--scalar-sample 200]
+
+The scalar path is timed on a sample of locations and extrapolated, since a
+full 10k x 365 scalar run takes tens of seconds.
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from athan.time_providers.astronomical import compute_prayer_hours
+from athan.time_providers.batch import compute_prayer_times_batch
+
+TIMEZONES = ["Europe/London", "Asia/Riyadh", "America/New_York", "Asia/Karachi", "Asia/Jakarta"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--locations", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--scalar-sample", type=int, default=200)
+    parser.add_argument("--method", default="5")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    locations = [(rng.uniform(-55, 55), rng.uniform(-180, 180)) for _ in range(args.locations)]
+    timezones = [rng.choice(TIMEZONES) for _ in range(args.locations)]
+    dates = [date(2025, 1, 1) + timedelta(days=i) for i in range(args.days)]
+    total = args.locations * args.days
+
+    sample = locations[: args.scalar_sample]
+    began = time.perf_counter()
+    for lat, lon in sample:
+        for day in dates:
+            compute_prayer_hours(lat, lon, day, 0.0, args.method)
+    scalar_rate = len(sample) * len(dates) / (time.perf_counter() - began)
+
+    began = time.perf_counter()
+    table = compute_prayer_times_batch(locations, dates, args.method, timezones)
+    vector_elapsed = time.perf_counter() - began
+
+    print(f"grid: {args.locations:,} locations x {args.days} days = {total:,} location-days")
+    print(f"scalar:     {scalar_rate:>12,.0f}/s  (~{total / scalar_rate:.1f}s extrapolated)")
+    print(f"vectorized: {total / vector_elapsed:>12,.0f}/s  ({vector_elapsed:.2f}s)")
+    print(f"table: {table.nbytes / 1e6:.1f} MB {table.dtype}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Compare notification bookkeeping throughput across SQLite configurations.
+
+Usage:
+    python benchmarks/bench_db.py [--notifications 2000]
+
+Each notification runs the scheduler's bookkeeping, either the legacy
+three-statement sequence (is_prayer_sent, record_scheduled_prayer,
+mark_prayer_sent) or a single claim_prayer. All notifications are issued
+at once, as happens when many guilds share a prayer time.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from athan.db import Database
+
+CONFIGS = {
+    "DELETE/FULL, commit per write": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "commit_window": 0.0,
+    },
+    "WAL/NORMAL, commit per write": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "commit_window": 0.0,
+    },
+    "WAL/NORMAL, 10 ms group commit": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "commit_window": 0.01,
+    },
+}
+
+
+async def _notify_legacy(db: Database, guild_id: int, date: str):
+    if await db.is_prayer_sent(guild_id, "Fajr", date):
+        return
+    await db.record_scheduled_prayer(guild_id, "Fajr", "05:00", date)
+    await db.mark_prayer_sent(guild_id, "Fajr", date)
+
+
+async def _notify_claim(db: Database, guild_id: int, date: str):
+    await db.claim_prayer(guild_id, "Fajr", date, "05:00")
+
+
+async def bench(config: dict, notifications: int, notify) -> tuple[float, int]:
+    with tempfile.TemporaryDirectory() as directory:
+        db = Database(os.path.join(directory, "bench.db"), **config)
+        await db.connect()
+        try:
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(notify(db, guild_id, "2025-01-01") for guild_id in range(notifications))
+            )
+            elapsed = time.perf_counter() - start
+        finally:
+            await db.close()
+    return elapsed, db.commits
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notifications", type=int, default=2000)
+    args = parser.parse_args()
+
+    for label, notify in (("legacy", _notify_legacy), ("claim", _notify_claim)):
+        for name, config in CONFIGS.items():
+            elapsed, commits = await bench(config, args.notifications, notify)
+            print(
+                f"{label:7s} {name:32s} {args.notifications / elapsed:10.0f} notifications/s"
+                f" {commits:6d} commits"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+"""Compare notification lateness for sequential sends versus the dispatcher.
+
+Usage:
+    python benchmarks/bench_dispatch.py [--guilds 2000] [--latency-ms 50]
+
+Every guild is due at the same instant and each send takes a fixed
+simulated round trip. Rate limits are raised so the comparison measures
+concurrency only; in production Discord's global bucket is the ceiling.
+"""
+
+import argparse
+import asyncio
+import time
+
+from athan.dispatch import NotificationDispatcher
+
+
+async def fake_send(
+    dispatcher: NotificationDispatcher, channel_id: int, due: float, latency: float
+):
+    await dispatcher.rate_limit(channel_id)
+    await asyncio.sleep(latency)
+    dispatcher.record_delivery(due)
+
+
+async def bench_sequential(guilds: int, latency: float) -> dict[str, float]:
+    dispatcher = NotificationDispatcher(global_rate=1e9)
+    due = time.time()
+    for channel_id in range(guilds):
+        await fake_send(dispatcher, channel_id, due, latency)
+    return dispatcher.lateness_stats()
+
+
+async def bench_dispatcher(guilds: int, latency: float, workers: int) -> dict[str, float]:
+    dispatcher = NotificationDispatcher(workers=workers, global_rate=1e9)
+    dispatcher.start()
+    due = time.time()
+    for channel_id in range(guilds):
+        dispatcher.submit(lambda c=channel_id: fake_send(dispatcher, c, due, latency))
+    await dispatcher.join()
+    await dispatcher.stop()
+    return dispatcher.lateness_stats()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--guilds", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--workers", type=int, default=32)
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+
+    for name, stats in (
+        ("sequential", await bench_sequential(args.guilds, latency)),
+        (f"{args.workers} workers", await bench_dispatcher(args.guilds, latency, args.workers)),
+    ):
+        print(f"{name:12s} lateness p50={stats['p50']:7.2f}s p99={stats['p99']:7.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
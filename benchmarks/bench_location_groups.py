@@ -0,0 +1,81 @@
+"""Count provider calls and planning time with guilds grouped by location.
+
+Usage:
+    python benchmarks/bench_location_groups.py [--guilds 10000] [--cities 200]
+
+Before grouping, every guild fetched its own day of prayer times; with
+location groups the scheduler fetches once per distinct location.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from athan.config import GuildSettings, Location, LocationType, PrayerTimes
+from athan.scheduler import PrayerScheduler
+
+
+class FakeDatabase:
+    def __init__(self, settings: list[GuildSettings]):
+        self.settings = {s.guild_id: s for s in settings}
+
+    async def get_guild_settings(self, guild_id: int) -> GuildSettings | None:
+        return self.settings.get(guild_id)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--guilds", type=int, default=10_000)
+    parser.add_argument("--cities", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    guilds = [
+        GuildSettings(
+            guild_id=guild_id,
+            location=Location(
+                location_type=LocationType.CITY,
+                city=f"city-{rng.randrange(args.cities)}",
+                country="XX",
+            ),
+            subscribed_channel_id=guild_id,
+        )
+        for guild_id in range(args.guilds)
+    ]
+
+    calls = 0
+
+    async def fake_get_prayer_times(settings: GuildSettings, date: str) -> PrayerTimes:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        return PrayerTimes(
+            date=date,
+            fajr="23:00",
+            sunrise="23:10",
+            dhuhr="23:20",
+            asr="23:30",
+            maghrib="23:40",
+            isha="23:50",
+            timezone=settings.timezone,
+        )
+
+    scheduler = PrayerScheduler(None, FakeDatabase(guilds), None, providers=None)
+    scheduler.get_prayer_times = fake_get_prayer_times
+    for settings in guilds:
+        scheduler._join_group(settings)
+
+    start = time.perf_counter()
+    for key in list(scheduler.groups):
+        await scheduler._plan_group(key)
+    elapsed = time.perf_counter() - start
+
+    print(f"guilds: {args.guilds}, location groups: {len(scheduler.groups)}")
+    print(f"provider calls per day: {args.guilds:>7,} before, {calls:>7,} grouped")
+    print(f"queued events: {len(scheduler.queue):,}, planning took {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
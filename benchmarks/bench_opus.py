@@ -0,0 +1,93 @@
+"""Compare CPU per voice stream: pre-encoded Opus packets versus per-playback transcoding.
+
+Usage:
+    python benchmarks/bench_opus.py [--file assets/adhan.mp3] [--streams 50]
+
+The native backend only copies packets out of a memory-mapped file. The
+Lavalink path decodes the MP3 and re-encodes Opus on every playback; it is
+approximated here by one ffmpeg transcode per stream, which is the same
+work minus the JVM overhead. Both figures are CPU seconds per second of
+audio, i.e. the fraction of a core one real-time stream costs.
+
+Without ffmpeg (or the audio file) only the native path is measured, on a
+synthetic three-minute file of 96 kb/s packets.
+"""
+
+import argparse
+import asyncio
+import resource
+import shutil
+import struct
+import tempfile
+import time
+from pathlib import Path
+
+from athan.opus import OpusPackets, OpusPacketSource, encode_opus
+
+SYNTHETIC_SECONDS = 180
+SYNTHETIC_PACKET = bytes(240)  # 20 ms at 96 kb/s
+
+
+def write_synthetic(path: Path):
+    """Ogg file of silent packets, one packet per page (headers included)."""
+    packets = [b"OpusHead" + bytes(11), b"OpusTags" + bytes(8)]
+    packets += [SYNTHETIC_PACKET] * (SYNTHETIC_SECONDS * 50)
+    pages = []
+    for packet in packets:
+        lacing = bytes([255] * (len(packet) // 255) + [len(packet) % 255])
+        header = struct.pack("<4sBBqIIIB", b"OggS", 0, 0, 0, 1, 0, 0, len(lacing))
+        pages.append(header + lacing + packet)
+    path.write_bytes(b"".join(pages))
+
+
+def bench_native(encoded: Path, streams: int) -> float:
+    """CPU seconds per audio second for streams reading every packet of the file."""
+    started = time.process_time()
+    packets = OpusPackets(encoded)
+    for _ in range(streams):
+        source = OpusPacketSource(packets)
+        while source.read():
+            pass
+    cpu = time.process_time() - started
+    return cpu / (streams * packets.duration)
+
+
+async def bench_transcode(source: Path, streams: int, duration: float) -> float:
+    """CPU seconds per audio second for one ffmpeg MP3 -> Opus transcode per stream."""
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    with tempfile.TemporaryDirectory() as tmp:
+        await asyncio.gather(
+            *(encode_opus(source, Path(tmp) / f"{i}.opus") for i in range(streams))
+        )
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    return cpu / (streams * duration)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--file", type=Path, default=Path("assets/adhan.mp3"))
+    parser.add_argument("--streams", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        encoded = Path(tmp) / "adhan.opus"
+        can_transcode = shutil.which("ffmpeg") is not None and args.file.exists()
+        if can_transcode:
+            await encode_opus(args.file, encoded)
+        else:
+            print("ffmpeg or audio file missing: native path only, synthetic audio")
+            write_synthetic(encoded)
+
+        native = bench_native(encoded, args.streams)
+        print(f"native      {native * 100:8.4f}% of a core per stream")
+
+        if can_transcode:
+            duration = OpusPackets(encoded).duration
+            transcode = await bench_transcode(args.file, args.streams, duration)
+            print(f"transcode   {transcode * 100:8.4f}% of a core per stream")
+            print(f"ratio       {transcode / native:8.0f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
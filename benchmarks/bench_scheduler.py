@@ -0,0 +1,82 @@
+"""Compare scheduler wakeups and CPU per simulated hour at 10k guilds.
+
+Usage:
+    python benchmarks/bench_scheduler.py [--guilds 10000]
+
+The legacy model woke every guild once a minute and re-checked all five
+prayers (it also re-read settings from SQLite on each wakeup, which is not
+counted here). The deadline queue only wakes when an event is due.
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from athan.config import Prayer
+from athan.deadlines import DeadlineQueue
+
+PRAYERS = [Prayer.FAJR, Prayer.DHUHR, Prayer.ASR, Prayer.MAGHRIB, Prayer.ISHA]
+HOUR = 3600
+
+
+def _random_day(rng: random.Random, midnight: float) -> list[float]:
+    """Five increasing prayer timestamps within a day, at minute resolution like the API."""
+    base = [4.5, 12.0, 15.5, 18.0, 19.5]
+    return [midnight + round((h + rng.uniform(-1, 1)) * 60) * 60 for h in base]
+
+
+def bench_polling(days: list[list[float]], start: float) -> tuple[int, float]:
+    """Legacy model: every guild checks every prayer every 60 seconds."""
+    wakeups = 0
+    cpu = time.process_time()
+    for minute in range(60):
+        now = start + minute * 60
+        for times in days:
+            wakeups += 1
+            for fire_at in times:
+                datetime.fromtimestamp(fire_at)  # stands in for strptime/ZoneInfo work
+                if -900 <= fire_at - now <= 60:
+                    pass
+    return wakeups, time.process_time() - cpu
+
+
+def bench_deadlines(days: list[list[float]], start: float) -> tuple[int, float]:
+    """Deadline queue: wake only at the next due event within the hour."""
+    cpu = time.process_time()
+    queue = DeadlineQueue()
+    for guild_id, times in enumerate(days):
+        for prayer, fire_at in zip(PRAYERS, times, strict=True):
+            if fire_at >= start:
+                queue.push(fire_at, guild_id, prayer)
+
+    wakeups = 0
+    end = start + HOUR
+    while (deadline := queue.next_deadline()) is not None and deadline <= end:
+        wakeups += 1
+        queue.pop_due(deadline)
+    return wakeups, time.process_time() - cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--guilds", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    midnight = datetime(2025, 3, 1).timestamp()
+    # Benchmark the busiest hour of the day around Maghrib
+    start = (datetime(2025, 3, 1) + timedelta(hours=17, minutes=30)).timestamp()
+    days = [_random_day(rng, midnight) for _ in range(args.guilds)]
+
+    poll_wakeups, poll_cpu = bench_polling(days, start)
+    queue_wakeups, queue_cpu = bench_deadlines(days, start)
+
+    print(f"guilds: {args.guilds}")
+    print(f"polling:   {poll_wakeups:>9,} wakeups/hour  {poll_cpu:8.3f}s CPU")
+    print(f"deadlines: {queue_wakeups:>9,} wakeups/hour  {queue_cpu:8.3f}s CPU (incl. planning)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Registry of the Adhan audio files shipped in assets/."""
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+from athan.config import Prayer
+
+logger = logging.getLogger(__name__)
+
+ASSETS_DIR = Path("assets")
+AUDIO_EXTENSIONS = {".mp3", ".ogg", ".opus", ".wav", ".flac", ".m4a"}
+DEFAULT_AUDIO = "adhan"
+
+
+@dataclass(frozen=True, slots=True)
+class AudioAsset:
+    """An indexed audio file; its mtime lets caches skip re-checking the file."""
+
+    name: str
+    path: Path
+    mtime_ns: int
+    size: int
+
+
+class AudioAssetRegistry:
+    """
+    Audio files in the assets directory, indexed once by name (the file stem).
+
+    A guild picks an Adhan by name. A ``<name>_<prayer>`` file, such as
+    ``adhan_fajr.mp3``, is used for that prayer in place of ``<name>``.
+    Guilds that have not picked anything use ``adhan``.
+    """
+
+    def __init__(self, directory: Path = ASSETS_DIR):
+        self.directory = directory
+        self.assets: dict[str, AudioAsset] = {}
+
+    def scan(self) -> int:
+        """
+        Index every non-empty audio file in the directory, replacing the previous index.
+
+        Returns:
+            Number of assets indexed
+        """
+        assets = {}
+        paths = sorted(self.directory.iterdir()) if self.directory.is_dir() else []
+        for path in paths:
+            if path.suffix.lower() not in AUDIO_EXTENSIONS or not path.is_file():
+                continue
+            stat = path.stat()
+            if not stat.st_size:
+                logger.warning(f"Skipping empty audio file {path}")
+                continue
+            name = path.stem.lower()
+            if name in assets:
+                logger.warning(f"Skipping {path}: another file is already named {name!r}")
+                continue
+            assets[name] = AudioAsset(name, path.absolute(), stat.st_mtime_ns, stat.st_size)
+
+        self.assets = assets
+        if DEFAULT_AUDIO not in assets:
+            logger.warning(f"No {DEFAULT_AUDIO} audio file found in {self.directory}")
+        logger.info(f"Indexed {len(assets)} audio file(s) in {self.directory}")
+        return len(assets)
+
+    def names(self) -> list[str]:
+        """Names a guild can choose from (per-prayer variants are picked automatically)."""
+        variants = {
+            f"{name}_{prayer.value.lower()}" for name in self.assets for prayer in Prayer
+        }
+        return [name for name in self.assets if name not in variants]
+
+    def get(self, name: str) -> AudioAsset | None:
+        """Asset by name, or None if there is no such file."""
+        return self.assets.get(name.lower())
+
+    def choice(self, name: str) -> AudioAsset | None:
+        """Asset a guild may pick by name; None for unknown names and per-prayer variants."""
+        asset = self.get(name)
+        return asset if asset and asset.name in self.names() else None
+
+    def for_prayer(
+        self, prayer: Prayer | None = None, selection: str | None = None
+    ) -> AudioAsset | None:
+        """
+        Pick the audio to play.
+
+        Args:
+            prayer: Prayer being announced, or None for a generic Adhan
+            selection: The guild's chosen asset name, if any
+
+        Returns:
+            The most specific asset available, or None if there is none at all
+        """
+        candidates = [selection, DEFAULT_AUDIO] if selection else [DEFAULT_AUDIO]
+        for name in candidates:
+            if prayer is not None:
+                variant = self.assets.get(f"{name}_{prayer.value.lower()}")
+                if variant:
+                    return variant
+            asset = self.assets.get(name)
+            if asset:
+                return asset
+        return None
+
+
+audio_assets = AudioAssetRegistry()
+
+
+def audio_file_key(audio_file: str | Path | AudioAsset) -> tuple[Path, int] | None:
+    """
+    Absolute path and mtime of an audio file, used to key resolved-audio caches.
+
+    Indexed assets answer from the index without touching the filesystem; a
+    replaced file is picked up when the registry is rescanned (at startup
+    and on /set_adhan). Plain paths cost a stat() call.
+
+    Returns:
+        ``(path, mtime_ns)``, or None if the file does not exist
+    """
+    if isinstance(audio_file, AudioAsset):
+        return audio_file.path, audio_file.mtime_ns
+    path = Path(audio_file).absolute()
+    try:
+        return path, path.stat().st_mtime_ns
+    except FileNotFoundError:
+        logger.error(f"Audio file not found: {path}")
+        return None
@@ -7,10 +7,19 @@ import discord
 import wavelink
 from discord import Intents
 
+from athan.audio import audio_assets
 from athan.commands import AthanCommands
-from athan.config import BotSettings, ensure_data_directory
+from athan.config import BotSettings, VoiceBackend, ensure_data_directory
 from athan.db import Database
+from athan.dispatch import NotificationDispatcher
 from athan.scheduler import PrayerScheduler
+from athan.time_providers.registry import ProviderRegistry
+from athan.voice import (
+    configure_voice_backend,
+    node_monitor,
+    preload_audio,
+    voice_sessions,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -36,6 +45,7 @@ class AthanBot(discord.Client):
 
         self.settings = settings
         self.db: Database = None
+        self.providers: ProviderRegistry = None
         self.scheduler: PrayerScheduler = None
         self.commands: AthanCommands = None
 
@@ -43,28 +53,55 @@ class AthanBot(discord.Client):
         """Initialize bot components and sync commands."""
         logger.info("Setting up bot components...")
 
-        # Initialize Wavelink (Lavalink)
-        try:
-            node: wavelink.Node = wavelink.Node(
-                uri=f"http://{self.settings.lavalink_host}:{self.settings.lavalink_port}",
-                password=self.settings.lavalink_password,
-            )
-            await wavelink.Pool.connect(client=self, nodes=[node])
-            logger.info("Connected to Lavalink server")
-        except Exception as e:
-            logger.warning(f"Failed to connect to Lavalink: {e}")
-            logger.warning("Voice features will not work without Lavalink running")
+        # Voice backend and session limits
+        backend = self.settings.voice_backend
+        configure_voice_backend(backend, self.settings.audio_cache_dir)
+        voice_sessions.idle_timeout = self.settings.voice_idle_timeout_seconds
+        voice_sessions.max_sessions = self.settings.voice_max_sessions
+
+        # Initialize Wavelink (Lavalink); players are spread across every node
+        if backend is not VoiceBackend.NATIVE:
+            await self._connect_lavalink()
+
+        # Index Adhan audio and resolve it once for the backends in use
+        audio_assets.scan()
+        ready = await preload_audio(audio_assets.assets.values())
+        logger.info(f"{ready} audio file(s) ready for voice playback")
 
         # Initialize database
         ensure_data_directory()
-        self.db = Database(self.settings.database_path)
+        self.db = Database(
+            self.settings.database_path,
+            journal_mode=self.settings.database_journal_mode,
+            synchronous=self.settings.database_synchronous,
+            cache_size_kib=self.settings.database_cache_size_kib,
+            mmap_size=self.settings.database_mmap_size,
+            commit_window=self.settings.database_commit_window_ms / 1000,
+        )
         await self.db.connect()
+        # No separate cache warm-up: scheduler.start() streams every subscribed
+        # guild's settings and each streamed row fills the settings cache
+        self.db.start_maintenance(
+            self.settings.database_maintenance_interval_hours * 3600,
+            retention_days=self.settings.database_retention_days,
+        )
+
+        # Shared prayer time providers (one HTTP session and cache for everything)
+        self.providers = ProviderRegistry(self.settings, store=self.db)
 
         # Initialize scheduler
-        self.scheduler = PrayerScheduler(self, self.db, self.settings)
+        self.scheduler = PrayerScheduler(
+            self,
+            self.db,
+            self.settings,
+            self.providers,
+            dispatcher=NotificationDispatcher(workers=self.settings.notification_workers),
+            voice_dispatcher=NotificationDispatcher(workers=self.settings.voice_workers),
+            voice_preconnect=self.settings.voice_preconnect_seconds,
+        )
 
         # Initialize commands
-        self.commands = AthanCommands(self, self.db, self.scheduler)
+        self.commands = AthanCommands(self, self.db, self.scheduler, self.providers)
 
         # Sync slash commands globally
         try:
@@ -75,6 +112,20 @@ class AthanBot(discord.Client):
 
         logger.info("Bot setup complete")
 
+    async def _connect_lavalink(self):
+        """Connect to every configured Lavalink node; voice players are spread across them."""
+        try:
+            nodes = [
+                wavelink.Node(uri=uri, password=self.settings.lavalink_password, identifier=uri)
+                for uri in self.settings.get_lavalink_uris()
+            ]
+            await wavelink.Pool.connect(client=self, nodes=nodes)
+            logger.info(f"Connected to {len(nodes)} Lavalink node(s)")
+            node_monitor.start()
+        except Exception as e:
+            logger.warning(f"Failed to connect to Lavalink: {e}")
+            logger.warning("Voice features will not work without Lavalink running")
+
     async def on_ready(self):
         """Handle bot ready event."""
         logger.info(f"Logged in as {self.user} (ID: {self.user.id})")
@@ -100,13 +151,36 @@ class AthanBot(discord.Client):
         # Clean up scheduler for this guild
         await self.scheduler.unschedule_guild(guild.id)
 
+    async def on_wavelink_node_disconnected(self, payload: wavelink.NodeDisconnectedEventPayload):
+        """Move players off a Lavalink node that dropped its connection."""
+        logger.warning(f"Lavalink node {payload.node.identifier} disconnected")
+        await node_monitor.fail_over(payload.node)
+
+    async def on_wavelink_track_end(self, payload: wavelink.TrackEndEventPayload):
+        """Start the idle countdown once the Adhan has finished."""
+        if payload.player and not payload.player.playing:
+            voice_sessions.finished(payload.player.guild.id)
+
+    async def on_voice_state_update(
+        self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState
+    ):
+        """Drop the session when the bot is disconnected from voice by someone else."""
+        if member.id == self.user.id and after.channel is None:
+            voice_sessions.forget(member.guild.id)
+
     async def close(self):
         """Clean up resources on shutdown."""
         logger.info("Shutting down bot...")
 
+        node_monitor.stop()
+        await voice_sessions.close()
+
         if self.scheduler:
             await self.scheduler.stop()
 
+        if self.providers:
+            await self.providers.close()
+
         if self.db:
             await self.db.close()
 
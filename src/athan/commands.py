@@ -3,14 +3,14 @@
 import asyncio
 import contextlib
 import logging
-from datetime import datetime, timedelta
-from pathlib import Path
+from datetime import datetime
 from zoneinfo import ZoneInfo
 
 import discord
 from discord import app_commands
 from discord.app_commands import Transform, Transformer
 
+from athan.audio import DEFAULT_AUDIO, audio_assets
 from athan.config import (
     GuildSettings,
     Location,
@@ -19,6 +19,8 @@ from athan.config import (
 )
 from athan.db import Database
 from athan.scheduler import PrayerScheduler
+from athan.time_providers.registry import ProviderRegistry
+from athan.voice import preload_audio, voice_sessions
 
 logger = logging.getLogger(__name__)
 
@@ -49,49 +51,20 @@ class VoiceChannelTransformer(Transformer):
 class AthanCommands:
     """Slash command handlers for Athan bot."""
 
-    def __init__(self, bot: discord.Client, db: Database, scheduler: PrayerScheduler):
+    def __init__(
+        self,
+        bot: discord.Client,
+        db: Database,
+        scheduler: PrayerScheduler,
+        providers: ProviderRegistry,
+    ):
         self.bot = bot
         self.db = db
         self.scheduler = scheduler
+        self.providers = providers
         self.tree = app_commands.CommandTree(bot)
         self._register_commands()
 
-    async def _get_timezone_from_api(
-        self, city: str, country: str | None
-    ) -> str | None:
-        """
-        Fetch timezone from prayer times API.
-        This ensures we get the correct timezone for ANY city the API supports.
-        """
-        try:
-            from .time_providers.muslimsalat import MuslimSalatProvider
-
-            # Create a temporary provider instance
-            provider = MuslimSalatProvider(
-                api_key=self.bot.settings.muslimsalat_api_key
-            )
-
-            # Create a temporary location
-            location = Location(
-                location_type=LocationType.CITY, city=city, country=country or ""
-            )
-
-            # Fetch prayer times (this also fetches timezone)
-            from datetime import date
-
-            prayer_times = await provider.get_prayer_times(location, date.today())
-
-            if prayer_times and prayer_times.timezone:
-                logger.info(
-                    f"Fetched timezone {prayer_times.timezone} for {city} from API"
-                )
-                return prayer_times.timezone
-
-        except Exception as e:
-            logger.warning(f"Could not fetch timezone from API for {city}: {e}")
-
-        return None
-
     def _get_timezone_for_location(
         self, city: str, country: str | None, daylight_saving: bool
     ) -> str:
@@ -250,6 +223,21 @@ class AthanCommands:
         ):
             await self._adhan_voice(interaction, voice_channel)
 
+        @self.tree.command(name="set_adhan", description="Choose the Adhan played in voice")
+        @app_commands.describe(audio="Adhan recording (from the bot's assets)")
+        async def set_adhan_command(interaction: discord.Interaction, audio: str):
+            await self._set_adhan(interaction, audio)
+
+        @set_adhan_command.autocomplete("audio")
+        async def set_adhan_autocomplete(
+            interaction: discord.Interaction, current: str
+        ) -> list[app_commands.Choice[str]]:
+            return [
+                app_commands.Choice(name=name, value=name)
+                for name in audio_assets.names()
+                if current.lower() in name
+            ][:25]
+
         @self.tree.command(name="status", description="Bot status and health check")
         async def status_command(interaction: discord.Interaction):
             await self._status(interaction)
@@ -281,12 +269,8 @@ class AthanCommands:
                 daylight_saving=daylight_saving,
             )
 
-            # Fetch prayer times from API to get the correct timezone
-            # The API knows the timezone for ANY city in the world!
-            timezone = await self._get_timezone_from_api(city, country)
-            if not timezone:
-                # Fallback to basic detection if API fails
-                timezone = self._get_timezone_for_location(city, country, daylight_saving)
+            # The prayer times API only reports a UTC offset, not a timezone name
+            timezone = self._get_timezone_for_location(city, country, daylight_saving)
 
             # Create guild settings
             settings = GuildSettings(
@@ -295,7 +279,14 @@ class AthanCommands:
                 timezone=timezone,
             )
 
+            # Fetch through the shared providers with the settings being saved, so the
+            # cached week is the one the scheduler, /today and /next_prayer look up
+            today = datetime.now(ZoneInfo(timezone)).strftime("%Y-%m-%d")
+            if not await self.providers.get_prayer_times(settings, today):
+                logger.warning(f"Could not fetch prayer times for {city} during /setup")
+
             await self.db.save_guild_settings(settings)
+            await self.scheduler.reschedule_guild(interaction.guild_id)
 
             location_str = f"{city}, {country}" if country else city
 
@@ -342,7 +333,7 @@ class AthanCommands:
         # Defer immediately to avoid timeout
         await interaction.response.defer(ephemeral=False)
 
-        settings = await self.db.get_guild_settings(interaction.guild_id)
+        settings = await self.db.get_guild_settings(interaction.guild_id, for_update=True)
         if not settings:
             await interaction.followup.send("⚠️ Please run `/setup` first.", ephemeral=True)
             return
@@ -367,6 +358,7 @@ class AthanCommands:
         # Update calculation method
         settings.calculation_method = str(method)
         await self.db.save_guild_settings(settings)
+        await self.scheduler.reschedule_guild(interaction.guild_id)
 
         embed = discord.Embed(
             title="✅ Calculation Method Updated",
@@ -390,7 +382,7 @@ class AthanCommands:
         # Defer immediately to avoid timeout
         await interaction.response.defer(ephemeral=False)
 
-        settings = await self.db.get_guild_settings(interaction.guild_id)
+        settings = await self.db.get_guild_settings(interaction.guild_id, for_update=True)
         if not settings:
             await interaction.followup.send("Please run `/setup` first.", ephemeral=True)
             return
@@ -406,6 +398,7 @@ class AthanCommands:
 
         settings.prayer_offsets[prayer_enum.value] = offset
         await self.db.save_guild_settings(settings)
+        await self.scheduler.reschedule_guild(interaction.guild_id)
 
         offset_str = f"+{offset}" if offset > 0 else str(offset)
         await interaction.followup.send(
@@ -428,7 +421,7 @@ class AthanCommands:
             return
 
         try:
-            settings = await self.db.get_guild_settings(interaction.guild_id)
+            settings = await self.db.get_guild_settings(interaction.guild_id, for_update=True)
             if not settings:
                 await interaction.followup.send(
                     "⚠️ Please run `/setup` first to configure your location.", ephemeral=True
@@ -536,7 +529,7 @@ class AthanCommands:
             logger.error(f"Interaction expired for /subscribe_vc in guild {interaction.guild_id}")
             return
 
-        settings = await self.db.get_guild_settings(interaction.guild_id)
+        settings = await self.db.get_guild_settings(interaction.guild_id, for_update=True)
         if not settings:
             await interaction.followup.send(
                 "⚠️ Please run `/setup` first to configure your location.", ephemeral=True
@@ -552,6 +545,8 @@ class AthanCommands:
         # Save voice channel
         settings.voice_channel_id = voice_channel.id
         await self.db.save_guild_settings(settings)
+        # Replan so upcoming prayers carry the voice channel and get pre-connected
+        await self.scheduler.reschedule_guild(interaction.guild_id)
 
         embed = discord.Embed(
             title="✅ Voice Adhan Enabled!",
@@ -572,7 +567,7 @@ class AthanCommands:
         # Defer immediately to avoid timeout
         await interaction.response.defer(ephemeral=False)
 
-        settings = await self.db.get_guild_settings(interaction.guild_id)
+        settings = await self.db.get_guild_settings(interaction.guild_id, for_update=True)
         if not settings or not settings.subscribed_channel_id:
             await interaction.followup.send(
                 "This server is not subscribed to notifications.", ephemeral=True
@@ -607,15 +602,11 @@ class AthanCommands:
 
             # Get today's date
             today = datetime.now(ZoneInfo(settings.timezone))
-            date_str = today.strftime("%Y-%m-%d")
 
-            # Fetch prayer times using the provider
-            from athan.time_providers.muslimsalat import MuslimSalatProvider
-
-            provider = MuslimSalatProvider()
+            # Today's precomputed schedule (offsets applied, shared with the scheduler)
             try:
-                prayer_times = await asyncio.wait_for(
-                    provider.get_prayer_times(settings.location, date_str, settings.timezone),
+                schedule = await asyncio.wait_for(
+                    self.scheduler.get_schedule(settings),
                     timeout=10.0,
                 )
             except TimeoutError:
@@ -624,10 +615,8 @@ class AthanCommands:
                     ephemeral=True,
                 )
                 return
-            finally:
-                await provider.close()
 
-            if not prayer_times:
+            if not schedule:
                 await interaction.followup.send(
                     "❌ Could not fetch prayer times. Please try again.", ephemeral=True
                 )
@@ -643,20 +632,10 @@ class AthanCommands:
 
             # Add each prayer time
             for prayer in [Prayer.FAJR, Prayer.DHUHR, Prayer.ASR, Prayer.MAGHRIB, Prayer.ISHA]:
-                prayer_time_str = prayer_times.get_time(prayer)
-                if prayer_time_str:
-                    # Parse time string to datetime
-                    dt_str = f"{date_str} {prayer_time_str}"
-                    prayer_dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
-                    prayer_dt = prayer_dt.replace(tzinfo=ZoneInfo(settings.timezone))
-
-                    # Apply offset
+                prayer_dt = schedule.at(prayer)
+                if prayer_dt:
                     offset = settings.get_offset(prayer)
-                    if offset != 0:
-                        prayer_dt = prayer_dt + timedelta(minutes=offset)
-                        offset_str = f" ({offset:+d}m)"
-                    else:
-                        offset_str = ""
+                    offset_str = f" ({offset:+d}m)" if offset != 0 else ""
 
                     # Check if prayer has passed
                     status = "✅" if prayer_dt < today else "⏳"
@@ -668,13 +647,8 @@ class AthanCommands:
                     )
 
             # Add sunrise
-            if prayer_times.sunrise:
-                # Parse sunrise string to datetime
-                sunrise_str = prayer_times.sunrise
-                dt_str = f"{date_str} {sunrise_str}"
-                sunrise_dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
-                sunrise_dt = sunrise_dt.replace(tzinfo=ZoneInfo(settings.timezone))
-
+            sunrise_dt = schedule.at(Prayer.SUNRISE)
+            if sunrise_dt:
                 embed.add_field(
                     name="🌅 Sunrise",
                     value=sunrise_dt.strftime("%I:%M %p"),
@@ -827,20 +801,25 @@ class AthanCommands:
         # ALWAYS play Adhan in voice if configured, regardless of text message status
         if settings.voice_channel_id:
             logger.info(f"[TEST] Starting voice playback for channel {settings.voice_channel_id}")
-            await self._play_test_adhan(settings.voice_channel_id)
+            await self._play_test_adhan(settings.voice_channel_id, settings.adhan_audio)
         else:
             logger.info("[TEST] No voice channel configured - test complete")
 
-    async def _play_test_adhan(self, voice_channel_id: int):
-        """Play Adhan in voice channel for test using Lavalink."""
+    async def _play_test_adhan(self, voice_channel_id: int, audio: str | None = None):
+        """Play the guild's Adhan in voice channel for test."""
         from athan.voice import play_adhan_in_voice_channel
         
         logger.info(f"[TEST] Playing test Adhan in channel {voice_channel_id}")
-        
+
+        asset = audio_assets.for_prayer(None, audio)
+        if asset is None:
+            logger.error("[TEST] ❌ No Adhan audio available")
+            return
+
         success = await play_adhan_in_voice_channel(
             bot=self.bot,
             voice_channel_id=voice_channel_id,
-            adhan_file="assets/adhan.mp3"
+            adhan_file=asset,
         )
         
         if success:
@@ -853,7 +832,7 @@ class AthanCommands:
         interaction: discord.Interaction,
         voice_channel: discord.VoiceChannel | None,
     ):
-        """Handle /adhan_voice command using Lavalink."""
+        """Handle /adhan_voice command."""
         from athan.voice import play_adhan_in_voice_channel
         
         # Defer immediately to avoid timeout
@@ -869,20 +848,20 @@ class AthanCommands:
                 )
                 return
 
-        # Check for adhan file
-        adhan_path = Path("assets/adhan.mp3")
-        if not adhan_path.exists():
+        # Use the guild's chosen Adhan from the indexed assets
+        settings = await self.db.get_guild_settings(interaction.guild_id)
+        asset = audio_assets.for_prayer(None, settings.adhan_audio if settings else None)
+        if asset is None:
             await interaction.followup.send(
                 "⚠️ Adhan audio file not found. Please add `assets/adhan.mp3`.",
                 ephemeral=True,
             )
             return
 
-        # Play Adhan using Lavalink
         success = await play_adhan_in_voice_channel(
             bot=self.bot,
             voice_channel_id=voice_channel.id,
-            adhan_file=adhan_path
+            adhan_file=asset,
         )
         
         if success:
@@ -894,6 +873,48 @@ class AthanCommands:
                 ephemeral=True
             )
 
+    async def _set_adhan(self, interaction: discord.Interaction, audio: str):
+        """Handle /set_adhan command."""
+        # Defer immediately to avoid timeout
+        await interaction.response.defer(ephemeral=False)
+
+        settings = await self.db.get_guild_settings(interaction.guild_id, for_update=True)
+        if not settings:
+            await interaction.followup.send("⚠️ Please run `/setup` first.", ephemeral=True)
+            return
+
+        # Pick up files added or replaced since the last scan
+        audio_assets.scan()
+        await preload_audio(audio_assets.assets.values())
+
+        asset = audio_assets.choice(audio)
+        if asset is None:
+            available = ", ".join(f"`{name}`" for name in audio_assets.names()) or "none"
+            await interaction.followup.send(
+                f"❌ Unknown Adhan audio. Available: {available}", ephemeral=True
+            )
+            return
+
+        settings.adhan_audio = None if asset.name == DEFAULT_AUDIO else asset.name
+        await self.db.save_guild_settings(settings)
+
+        embed = discord.Embed(
+            title="✅ Adhan Updated",
+            description=f"Voice Adhan will use **{asset.name}**",
+            color=discord.Color.green(),
+        )
+        variants = [
+            prayer.value
+            for prayer in Prayer
+            if audio_assets.for_prayer(prayer, asset.name) not in (asset, None)
+        ]
+        if variants:
+            embed.add_field(
+                name="Prayer-specific Adhan", value=", ".join(variants), inline=False
+            )
+        await interaction.followup.send(embed=embed)
+        logger.info(f"Guild {interaction.guild_id} selected Adhan audio {asset.name}")
+
     async def _status(self, interaction: discord.Interaction):
         """Handle /status command."""
         # Defer immediately to avoid timeout
@@ -909,6 +930,17 @@ class AthanCommands:
         embed.add_field(name="Guilds", value=str(guilds_count), inline=True)
         embed.add_field(name="Subscribed Guilds", value=str(subscribed_count), inline=True)
         embed.add_field(name="Latency", value=f"{round(self.bot.latency * 1000)}ms", inline=True)
+        sessions = voice_sessions.counts()
+        embed.add_field(
+            name="Voice Sessions",
+            value=f"{sessions['active']} playing, {sessions['idle']} idle",
+            inline=True,
+        )
+        for name, dispatcher in (
+            ("Notification Lateness", self.scheduler.dispatcher),
+            ("Voice Adhan Lateness", self.scheduler.voice_dispatcher),
+        ):
+            embed.add_field(name=name, value=dispatcher.lateness_summary(), inline=True)
         embed.set_footer(text="Bot Version • v0.1.0")
 
         await interaction.followup.send(embed=embed)
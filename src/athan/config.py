@@ -37,6 +37,14 @@ class LocationType(str, Enum):
     COORDINATES = "coordinates"
 
 
+class VoiceBackend(str, Enum):
+    """How voice Adhan audio is played."""
+
+    LAVALINK = "lavalink"  # Stream through a Lavalink node
+    NATIVE = "native"  # Send pre-encoded Opus packets straight from the bot
+    AUTO = "auto"  # Lavalink when a node is connected, native otherwise
+
+
 class BotSettings(BaseSettings):
     """Bot-wide configuration from environment."""
 
@@ -54,9 +62,42 @@ class BotSettings(BaseSettings):
     lavalink_host: str = Field(default="localhost", alias="LAVALINK_HOST")
     lavalink_port: int = Field(default=2333, alias="LAVALINK_PORT")
     lavalink_password: str = Field(default="youshallnotpass", alias="LAVALINK_PASSWORD")
+    lavalink_nodes: str = Field(
+        default="",
+        alias="LAVALINK_NODES",
+        description="Comma-separated host:port list; overrides LAVALINK_HOST/LAVALINK_PORT",
+    )
     database_path: str = Field(default="data/athan.db", alias="DATABASE_PATH")
+    database_journal_mode: str = Field(default="WAL", alias="DATABASE_JOURNAL_MODE")
+    database_synchronous: str = Field(default="NORMAL", alias="DATABASE_SYNCHRONOUS")
+    database_cache_size_kib: int = Field(default=16384, alias="DATABASE_CACHE_SIZE_KIB")
+    database_mmap_size: int = Field(default=64 * 1024 * 1024, alias="DATABASE_MMAP_SIZE")
+    database_commit_window_ms: int = Field(default=10, alias="DATABASE_COMMIT_WINDOW_MS")
+    database_retention_days: int = Field(default=30, alias="DATABASE_RETENTION_DAYS")
+    database_maintenance_interval_hours: float = Field(
+        default=6, alias="DATABASE_MAINTENANCE_INTERVAL_HOURS"
+    )
+    prayer_cache_size: int = Field(default=4096, alias="PRAYER_CACHE_SIZE")
+    http_connection_limit: int = Field(default=100, alias="HTTP_CONNECTION_LIMIT")
+    http_connection_limit_per_host: int = Field(default=20, alias="HTTP_CONNECTION_LIMIT_PER_HOST")
+    http_dns_cache_ttl: int = Field(default=300, alias="HTTP_DNS_CACHE_TTL")
+    http_keepalive_timeout: int = Field(default=60, alias="HTTP_KEEPALIVE_TIMEOUT")
+    notification_workers: int = Field(default=32, alias="NOTIFICATION_WORKERS")
+    voice_workers: int = Field(default=4, alias="VOICE_WORKERS")
+    voice_preconnect_seconds: float = Field(default=30, alias="VOICE_PRECONNECT_SECONDS")
+    voice_idle_timeout_seconds: float = Field(default=60, alias="VOICE_IDLE_TIMEOUT_SECONDS")
+    voice_max_sessions: int = Field(default=100, alias="VOICE_MAX_SESSIONS")
+    voice_backend: VoiceBackend = Field(default=VoiceBackend.AUTO, alias="VOICE_BACKEND")
+    audio_cache_dir: str = Field(default="data/audio", alias="AUDIO_CACHE_DIR")
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
 
+    def get_lavalink_uris(self) -> list[str]:
+        """HTTP URIs of every configured Lavalink node."""
+        nodes = [node.strip() for node in self.lavalink_nodes.split(",") if node.strip()]
+        if not nodes:
+            nodes = [f"{self.lavalink_host}:{self.lavalink_port}"]
+        return [node if "://" in node else f"http://{node}" for node in nodes]
+
 
 class Location(BaseModel):
     """Location specification for prayer times."""
@@ -79,6 +120,7 @@ class GuildSettings(BaseModel):
     subscribed_channel_id: int | None = None
     voice_channel_id: int | None = None
     ping_role_id: int | None = None  # Role to mention in notifications
+    adhan_audio: str | None = None  # Audio asset name for voice Adhan (None = default)
     enabled_prayers: list[Prayer] = Field(
         default_factory=lambda: [
             Prayer.FAJR,
@@ -1,38 +1,273 @@
 """Database persistence layer using aiosqlite."""
 
+import asyncio
 import json
 import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
 import aiosqlite
 
-from athan.config import GuildSettings, Location, Prayer, UserSettings
+from athan.config import (
+    GuildSettings,
+    Location,
+    LocationType,
+    Prayer,
+    PrayerTimes,
+    UserSettings,
+)
 
 logger = logging.getLogger(__name__)
 
 
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+# Bit per prayer in the in-memory sent-prayer masks
+PRAYER_BITS = {prayer.value: 1 << index for index, prayer in enumerate(Prayer)}
+SENT_DAYS_KEPT = 3  # Guild-local dates span up to three UTC days at any moment
+
+# Native guild_settings columns, in the order they are read and written after guild_id
+OFFSET_COLUMNS = {prayer.value: f"offset_{prayer.value.lower()}" for prayer in Prayer}
+GUILD_SETTINGS_COLUMNS = (
+    "calculation_method",
+    "timezone",
+    "subscribed_channel_id",
+    "voice_channel_id",
+    "ping_role_id",
+    "adhan_audio",
+    "location_type",
+    "city",
+    "country",
+    "latitude",
+    "longitude",
+    "daylight_saving",
+    "city_norm",
+    "country_norm",
+    "prayers_mask",
+    *OFFSET_COLUMNS.values(),
+)
+_GUILD_SELECT = ", ".join(GUILD_SETTINGS_COLUMNS)
+
+PRUNE_CHUNK_SIZE = 1000  # Rows deleted per transaction during maintenance
+VACUUM_PAGES = 1000  # Free pages returned to the OS per maintenance run
+PRAYER_TIMES_RETENTION_DAYS = 2  # Persisted prayer times older than this are never read again
+AUTO_VACUUM_INCREMENTAL = 2  # PRAGMA auto_vacuum value for INCREMENTAL
+
+
+def normalize_place(name: str | None) -> str | None:
+    """Case- and whitespace-insensitive form of a city or country name for lookups."""
+    if not name:
+        return None
+    return " ".join(name.split()).lower()
+
+
+def encode_prayers(prayers: list[Prayer]) -> int:
+    """Pack a list of prayers into a bitmask."""
+    mask = 0
+    for prayer in prayers:
+        mask |= PRAYER_BITS[prayer.value]
+    return mask
+
+
+def decode_prayers(mask: int) -> list[Prayer]:
+    """Unpack a bitmask into prayers, in canonical order."""
+    return [prayer for prayer in Prayer if mask & PRAYER_BITS[prayer.value]]
+
+
 class Database:
     """Async SQLite database for persistent settings."""
 
-    def __init__(self, db_path: str):
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        journal_mode: str = "WAL",
+        synchronous: str = "NORMAL",
+        cache_size_kib: int = 16384,
+        mmap_size: int = 64 * 1024 * 1024,
+        commit_window: float = 0.0,
+    ):
+        """
+        Args:
+            db_path: Path to the SQLite file
+            journal_mode: SQLite journal mode (WAL lets readers run during writes)
+            synchronous: SQLite synchronous level (NORMAL is safe with WAL)
+            cache_size_kib: Page cache size in KiB
+            mmap_size: Bytes of the file to memory-map for reads (0 disables)
+            commit_window: Seconds to wait so concurrent writes share one commit (0 disables)
+        """
+        journal_mode = journal_mode.upper()
+        synchronous = synchronous.upper()
+        if journal_mode not in JOURNAL_MODES:
+            raise ValueError(f"Invalid journal mode: {journal_mode}")
+        if synchronous not in SYNCHRONOUS_MODES:
+            raise ValueError(f"Invalid synchronous mode: {synchronous}")
+
         self.db_path = db_path
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size_kib = int(cache_size_kib)
+        self.mmap_size = int(mmap_size)
+        self.commit_window = commit_window
         self.conn: aiosqlite.Connection | None = None
+        self._pending_commit: asyncio.Future | None = None
+        self._flush_task: asyncio.Task | None = None
+        self.commits = 0
+        # Write-through cache of parsed guild settings (None = known to have no row)
+        self._guild_settings_cache: dict[int, GuildSettings | None] = {}
+        self.settings_cache_hits = 0
+        self.settings_cache_misses = 0
+        # date -> guild_id -> bitmask of prayers known to be sent
+        self._sent_prayers: dict[str, dict[int, int]] = {}
+        self._maintenance_task: asyncio.Task | None = None
 
     async def connect(self):
         """Open database connection and initialize schema."""
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
         self.conn = await aiosqlite.connect(self.db_path)
+        await self._apply_pragmas()
         await self._init_schema()
-        logger.info(f"Database connected: {self.db_path}")
+        await self._enable_incremental_vacuum()
+        logger.info(f"Database connected: {self.db_path} (journal_mode={self.journal_mode})")
 
     async def close(self):
-        """Close database connection."""
+        """Flush pending writes and close database connection."""
+        self.stop_maintenance()
         if self.conn:
+            if self._flush_task:
+                self._flush_task.cancel()
+                await self._flush()
             await self.conn.close()
             logger.info("Database closed")
 
+    async def _apply_pragmas(self):
+        """Configure journaling, durability and caching."""
+        # Only takes effect for new database files; see _enable_incremental_vacuum()
+        await self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        # Values are validated in __init__, so interpolation is safe here
+        await self.conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+        await self.conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        await self.conn.execute(f"PRAGMA cache_size=-{self.cache_size_kib}")
+        await self.conn.execute(f"PRAGMA mmap_size={self.mmap_size}")
+
+    async def _commit(self):
+        """
+        Commit the current transaction.
+
+        With a commit window, the first writer schedules a commit and every
+        write issued before it runs joins the same transaction, so a burst of
+        notifications costs one fsync instead of one per statement. Callers
+        still only return once their write is durable.
+        """
+        if self.commit_window <= 0:
+            await self.conn.commit()
+            self.commits += 1
+            return
+
+        if self._pending_commit is None:
+            self._pending_commit = asyncio.get_running_loop().create_future()
+            self._flush_task = asyncio.create_task(self._flush_after(self.commit_window))
+        await asyncio.shield(self._pending_commit)
+
+    async def _flush_after(self, delay: float):
+        await asyncio.sleep(delay)
+        await self._flush()
+
+    async def _flush(self):
+        """Commit now and resolve everyone waiting on the pending group commit."""
+        pending, self._pending_commit = self._pending_commit, None
+        self._flush_task = None
+        if pending is None:
+            return
+        try:
+            await self.conn.commit()
+            self.commits += 1
+        except Exception as e:
+            pending.set_exception(e)
+        else:
+            pending.set_result(None)
+
     async def _init_schema(self):
-        """Create tables if they don't exist."""
+        """
+        Bring the schema up to date.
+
+        The applied version is read from ``schema_version``; any newer steps from
+        _migrations() run in order inside a single transaction, so an up-to-date
+        database costs one query and a failed upgrade leaves nothing half-applied.
+        """
+        await self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+        async with self.conn.execute("SELECT MAX(version) FROM schema_version") as cursor:
+            current = (await cursor.fetchone())[0] or 0
+
+        pending = [m for m in self._migrations() if m[0] > current]
+        if not pending:
+            return
+
+        await self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for version, description, step in pending:
+                logger.info(f"Running migration {version}: {description}")
+                await step()
+                await self.conn.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                    (version, description),
+                )
+        except Exception:
+            await self.conn.rollback()
+            raise
+        await self.conn.commit()
+        logger.info(f"Database schema at version {pending[-1][0]}")
+
+    async def _enable_incremental_vacuum(self):
+        """
+        Switch a database created without incremental auto-vacuum over to it.
+
+        The mode of an existing file only changes through a full VACUUM, which
+        cannot run inside a transaction, so it is done here once, after the
+        migrations have committed, instead of as a migration step.
+        """
+        async with self.conn.execute("PRAGMA auto_vacuum") as cursor:
+            mode = (await cursor.fetchone())[0]
+        if mode == AUTO_VACUUM_INCREMENTAL:
+            return
+        logger.info("Rebuilding database to enable incremental auto-vacuum")
+        await self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        await self.conn.execute("VACUUM")
+
+    def _migrations(self) -> list[tuple[int, str, Callable[[], Awaitable[None]]]]:
+        """
+        Ordered schema migrations.
+
+        Databases created before versioning start at 0 and replay every step,
+        so each step must be idempotent. Append new steps; never renumber.
+        """
+        return [
+            (1, "Create settings and scheduling tables", self._create_base_tables),
+            (2, "Add guild_settings.ping_role_id", self._add_ping_role_id),
+            (3, "Create prayer_times_cache", self._create_prayer_times_cache),
+            (4, "Index scheduled_prayers by date", self._index_scheduled_prayers_date),
+            (5, "Store guild settings in native columns", self._normalize_guild_settings),
+            (6, "Index guild_settings by location", self._index_guild_settings_location),
+            (7, "Add guild_settings.adhan_audio", self._add_adhan_audio),
+            (8, "Add scheduled_prayers.voice_sent", self._add_voice_sent),
+        ]
+
+    async def _table_columns(self, table: str) -> set[str]:
+        async with self.conn.execute(f"PRAGMA table_info({table})") as cursor:
+            return {row[1] for row in await cursor.fetchall()}
+
+    async def _create_base_tables(self):
         await self.conn.execute(
             """
             CREATE TABLE IF NOT EXISTS guild_settings (
@@ -42,7 +277,6 @@ class Database:
                 timezone TEXT DEFAULT 'UTC',
                 subscribed_channel_id INTEGER,
                 voice_channel_id INTEGER,
-                ping_role_id INTEGER,
                 enabled_prayers TEXT,
                 prayer_offsets TEXT,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
@@ -61,9 +295,6 @@ class Database:
             )
             """
         )
-
-        # Run migrations
-        await self._run_migrations()
         await self.conn.execute(
             """
             CREATE TABLE IF NOT EXISTS scheduled_prayers (
@@ -78,89 +309,279 @@ class Database:
             )
             """
         )
-        await self.conn.commit()
 
-    async def _run_migrations(self):
-        """Run database migrations for schema updates."""
-        # Migration: Add ping_role_id column if it doesn't exist
-        try:
-            await self.conn.execute("SELECT ping_role_id FROM guild_settings LIMIT 1")
-        except Exception:
-            logger.info("Running migration: Adding ping_role_id column to guild_settings")
+    async def _add_ping_role_id(self):
+        if "ping_role_id" not in await self._table_columns("guild_settings"):
             await self.conn.execute("ALTER TABLE guild_settings ADD COLUMN ping_role_id INTEGER")
-            await self.conn.commit()
-            logger.info("Migration completed: ping_role_id column added")
 
-    async def get_guild_settings(self, guild_id: int) -> GuildSettings | None:
-        """Retrieve guild settings."""
+    async def _add_adhan_audio(self):
+        if "adhan_audio" not in await self._table_columns("guild_settings"):
+            await self.conn.execute("ALTER TABLE guild_settings ADD COLUMN adhan_audio TEXT")
+
+    async def _add_voice_sent(self):
+        if "voice_sent" not in await self._table_columns("scheduled_prayers"):
+            await self.conn.execute(
+                "ALTER TABLE scheduled_prayers ADD COLUMN voice_sent INTEGER DEFAULT 0"
+            )
+
+    async def _create_prayer_times_cache(self):
+        await self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS prayer_times_cache (
+                location_key TEXT NOT NULL,
+                date TEXT NOT NULL,
+                fajr TEXT NOT NULL,
+                sunrise TEXT NOT NULL,
+                dhuhr TEXT NOT NULL,
+                asr TEXT NOT NULL,
+                maghrib TEXT NOT NULL,
+                isha TEXT NOT NULL,
+                timezone TEXT NOT NULL,
+                fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (location_key, date)
+            )
+            """
+        )
+
+    async def _index_scheduled_prayers_date(self):
+        await self.conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_scheduled_prayers_date
+            ON scheduled_prayers (date)
+            """
+        )
+
+    async def _index_guild_settings_location(self):
+        """Let get_all_subscribed_guild_settings() stream guilds in location order unsorted."""
+        await self.conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_guild_settings_location
+            ON guild_settings (city_norm, country_norm, calculation_method, daylight_saving)
+            """
+        )
+
+    async def _normalize_guild_settings(self):
+        """Add native columns, backfill them from the JSON columns, then drop the JSON."""
+        if "prayers_mask" in await self._table_columns("guild_settings"):
+            return
+
+        for column, column_type in (
+            ("location_type", "TEXT"),
+            ("city", "TEXT"),
+            ("country", "TEXT"),
+            ("latitude", "REAL"),
+            ("longitude", "REAL"),
+            ("daylight_saving", "INTEGER DEFAULT 0"),
+            ("city_norm", "TEXT"),
+            ("country_norm", "TEXT"),
+            ("prayers_mask", "INTEGER DEFAULT 0"),
+            *((column, "INTEGER") for column in OFFSET_COLUMNS.values()),
+        ):
+            await self.conn.execute(f"ALTER TABLE guild_settings ADD COLUMN {column} {column_type}")
+
         cursor = await self.conn.execute(
             """
-            SELECT location_json, calculation_method, timezone,
+            SELECT guild_id, location_json, calculation_method, timezone,
                    subscribed_channel_id, voice_channel_id, ping_role_id,
                    enabled_prayers, prayer_offsets
             FROM guild_settings
-            WHERE guild_id = ?
-            """,
-            (guild_id,),
+            """
         )
-        row = await cursor.fetchone()
-        if not row:
-            return None
+        rows = await cursor.fetchall()
 
-        location = json.loads(row[0]) if row[0] else None
-        enabled_prayers = json.loads(row[6]) if row[6] else []
-        prayer_offsets = json.loads(row[7]) if row[7] else {}
+        # Columns added by later migrations do not exist yet
+        existing = await self._table_columns("guild_settings")
+        present = [i for i, column in enumerate(GUILD_SETTINGS_COLUMNS) if column in existing]
+        updates = []
+        for row in rows:
+            location = json.loads(row[1]) if row[1] else None
+            settings = GuildSettings(
+                guild_id=row[0],
+                location=Location(**location) if location else None,
+                calculation_method=row[2],
+                timezone=row[3],
+                subscribed_channel_id=row[4],
+                voice_channel_id=row[5],
+                ping_role_id=row[6],
+                enabled_prayers=[Prayer(p) for p in json.loads(row[7])] if row[7] else [],
+                prayer_offsets=json.loads(row[8]) if row[8] else {},
+            )
+            values = self._guild_settings_to_row(settings)
+            updates.append((*(values[i] for i in present), settings.guild_id))
+
+        assignments = ", ".join(f"{GUILD_SETTINGS_COLUMNS[i]} = ?" for i in present)
+        await self.conn.executemany(
+            f"UPDATE guild_settings SET {assignments} WHERE guild_id = ?", updates
+        )
+        for column in ("location_json", "enabled_prayers", "prayer_offsets"):
+            await self.conn.execute(f"ALTER TABLE guild_settings DROP COLUMN {column}")
+
+    async def get_guild_settings(
+        self, guild_id: int, *, for_update: bool = False
+    ) -> GuildSettings | None:
+        """
+        Retrieve guild settings, served from the in-memory cache when possible.
+
+        Args:
+            guild_id: Guild to look up
+            for_update: Return a private copy the caller may change and re-save.
+                Otherwise the cached instance is shared and must not be mutated.
+        """
+        if guild_id in self._guild_settings_cache:
+            self.settings_cache_hits += 1
+            settings = self._guild_settings_cache[guild_id]
+        else:
+            self.settings_cache_misses += 1
+            cursor = await self.conn.execute(
+                f"SELECT {_GUILD_SELECT} FROM guild_settings WHERE guild_id = ?",
+                (guild_id,),
+            )
+            row = await cursor.fetchone()
+            settings = self._row_to_guild_settings(guild_id, row) if row else None
+            self._guild_settings_cache[guild_id] = settings
+
+        if settings and for_update:
+            return settings.model_copy(deep=True)
+        return settings
+
+    async def warm_guild_settings_cache(self) -> int:
+        """Load every guild's settings into the cache with a single query."""
+        cursor = await self.conn.execute(f"SELECT guild_id, {_GUILD_SELECT} FROM guild_settings")
+        rows = await cursor.fetchall()
+        for row in rows:
+            self._guild_settings_cache[row[0]] = self._row_to_guild_settings(row[0], row[1:])
+        logger.info(f"Loaded settings for {len(rows)} guilds into cache")
+        return len(rows)
+
+    async def get_all_subscribed_guild_settings(
+        self, batch_size: int = 500
+    ) -> AsyncIterator[GuildSettings]:
+        """
+        Stream settings for every subscribed guild from a single SELECT.
+
+        Rows are fetched ``batch_size`` at a time so startup memory does not
+        depend on how many guilds are subscribed. Each row also refreshes the
+        settings cache, and the cached instance is yielded, so it must not be
+        mutated. Guilds sharing a location arrive next to each other.
+        """
+        cursor = await self.conn.execute(
+            f"""
+            SELECT guild_id, {_GUILD_SELECT}
+            FROM guild_settings
+            WHERE subscribed_channel_id IS NOT NULL
+            ORDER BY city_norm, country_norm, calculation_method, daylight_saving
+            """
+        )
+        try:
+            while rows := await cursor.fetchmany(batch_size):
+                for row in rows:
+                    settings = self._row_to_guild_settings(row[0], row[1:])
+                    self._guild_settings_cache[row[0]] = settings
+                    yield settings
+        finally:
+            await cursor.close()
+
+    def settings_cache_stats(self) -> dict[str, float]:
+        """Guild settings cache size and hit rate."""
+        lookups = self.settings_cache_hits + self.settings_cache_misses
+        return {
+            "size": len(self._guild_settings_cache),
+            "hits": self.settings_cache_hits,
+            "misses": self.settings_cache_misses,
+            "hit_rate": self.settings_cache_hits / lookups if lookups else 0.0,
+        }
+
+    @staticmethod
+    def _row_to_guild_settings(guild_id: int, row: tuple) -> GuildSettings:
+        """Build GuildSettings from a row of GUILD_SETTINGS_COLUMNS."""
+        (
+            calculation_method,
+            timezone,
+            subscribed_channel_id,
+            voice_channel_id,
+            ping_role_id,
+            adhan_audio,
+            location_type,
+            city,
+            country,
+            latitude,
+            longitude,
+            daylight_saving,
+            _city_norm,
+            _country_norm,
+            prayers_mask,
+            *offsets,
+        ) = row
+
+        location = None
+        if location_type:
+            location = Location(
+                location_type=LocationType(location_type),
+                city=city,
+                country=country,
+                latitude=latitude,
+                longitude=longitude,
+                daylight_saving=bool(daylight_saving),
+            )
 
         return GuildSettings(
             guild_id=guild_id,
-            location=Location(**location) if location else None,
-            calculation_method=row[1],
-            timezone=row[2],
-            subscribed_channel_id=row[3],
-            voice_channel_id=row[4],
-            ping_role_id=row[5],
-            enabled_prayers=[Prayer(p) for p in enabled_prayers],
-            prayer_offsets=prayer_offsets,
+            location=location,
+            calculation_method=calculation_method,
+            timezone=timezone,
+            subscribed_channel_id=subscribed_channel_id,
+            voice_channel_id=voice_channel_id,
+            ping_role_id=ping_role_id,
+            adhan_audio=adhan_audio,
+            enabled_prayers=decode_prayers(prayers_mask or 0),
+            prayer_offsets={
+                prayer: offset
+                for prayer, offset in zip(OFFSET_COLUMNS, offsets, strict=True)
+                if offset is not None
+            },
+        )
+
+    @staticmethod
+    def _guild_settings_to_row(settings: GuildSettings) -> tuple:
+        """Flatten GuildSettings into values for GUILD_SETTINGS_COLUMNS."""
+        location = settings.location
+        return (
+            settings.calculation_method,
+            settings.timezone,
+            settings.subscribed_channel_id,
+            settings.voice_channel_id,
+            settings.ping_role_id,
+            settings.adhan_audio,
+            location.location_type.value if location else None,
+            location.city if location else None,
+            location.country if location else None,
+            location.latitude if location else None,
+            location.longitude if location else None,
+            int(location.daylight_saving) if location else 0,
+            normalize_place(location.city) if location else None,
+            normalize_place(location.country) if location else None,
+            encode_prayers(settings.enabled_prayers),
+            *(settings.prayer_offsets.get(prayer) for prayer in OFFSET_COLUMNS),
         )
 
     async def save_guild_settings(self, settings: GuildSettings):
         """Save or update guild settings."""
-        location_json = json.dumps(settings.location.model_dump()) if settings.location else None
-        enabled_prayers_json = json.dumps([p.value for p in settings.enabled_prayers])
-        prayer_offsets_json = json.dumps(settings.prayer_offsets)
-
+        placeholders = ", ".join("?" * (len(GUILD_SETTINGS_COLUMNS) + 1))
+        assignments = ", ".join(
+            f"{column} = excluded.{column}" for column in GUILD_SETTINGS_COLUMNS
+        )
         await self.conn.execute(
-            """
-            INSERT INTO guild_settings (
-                guild_id, location_json, calculation_method, timezone,
-                subscribed_channel_id, voice_channel_id, ping_role_id,
-                enabled_prayers, prayer_offsets
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            f"""
+            INSERT INTO guild_settings (guild_id, {_GUILD_SELECT})
+            VALUES ({placeholders})
             ON CONFLICT(guild_id) DO UPDATE SET
-                location_json = excluded.location_json,
-                calculation_method = excluded.calculation_method,
-                timezone = excluded.timezone,
-                subscribed_channel_id = excluded.subscribed_channel_id,
-                voice_channel_id = excluded.voice_channel_id,
-                ping_role_id = excluded.ping_role_id,
-                enabled_prayers = excluded.enabled_prayers,
-                prayer_offsets = excluded.prayer_offsets,
+                {assignments},
                 updated_at = CURRENT_TIMESTAMP
             """,
-            (
-                settings.guild_id,
-                location_json,
-                settings.calculation_method,
-                settings.timezone,
-                settings.subscribed_channel_id,
-                settings.voice_channel_id,
-                settings.ping_role_id,
-                enabled_prayers_json,
-                prayer_offsets_json,
-            ),
+            (settings.guild_id, *self._guild_settings_to_row(settings)),
         )
-        await self.conn.commit()
+        await self._commit()
+        self._guild_settings_cache[settings.guild_id] = settings.model_copy(deep=True)
         logger.info(f"Saved settings for guild {settings.guild_id}")
 
     async def get_user_settings(self, user_id: int) -> UserSettings | None:
@@ -214,7 +635,7 @@ class Database:
                 prayer_offsets_json,
             ),
         )
-        await self.conn.commit()
+        await self._commit()
         logger.info(f"Saved settings for user {settings.user_id}")
 
     async def get_all_subscribed_guilds(self) -> list[int]:
@@ -239,10 +660,82 @@ class Database:
             """,
             (guild_id, prayer, date),
         )
-        await self.conn.commit()
+        await self._commit()
+
+    def _is_known_sent(self, guild_id: int, prayer: str, date: str) -> bool:
+        return bool(self._sent_prayers.get(date, {}).get(guild_id, 0) & PRAYER_BITS[prayer])
+
+    def _remember_sent(self, guild_id: int, prayer: str, date: str):
+        day = self._sent_prayers.setdefault(date, {})
+        day[guild_id] = day.get(guild_id, 0) | PRAYER_BITS[prayer]
+        while len(self._sent_prayers) > SENT_DAYS_KEPT:
+            del self._sent_prayers[min(self._sent_prayers)]
+
+    async def claim_prayer(
+        self, guild_id: int, prayer: str, date: str, scheduled_time: str
+    ) -> bool:
+        """
+        Atomically reserve a prayer notification for sending.
+
+        Args:
+            guild_id: Guild to notify
+            prayer: Prayer name
+            date: Guild-local date in YYYY-MM-DD format
+            scheduled_time: Local time of the notification (HH:MM)
+
+        Returns:
+            True if the caller should send it, False if it was already claimed
+        """
+        if self._is_known_sent(guild_id, prayer, date):
+            return False
+
+        # Inserts a sent row, or flips an unsent one; returns nothing if already sent
+        rows = await self.conn.execute_fetchall(
+            """
+            INSERT INTO scheduled_prayers (guild_id, prayer, scheduled_time, date, sent)
+            VALUES (?, ?, ?, ?, 1)
+            ON CONFLICT(guild_id, prayer, date) DO UPDATE SET sent = 1
+            WHERE sent = 0
+            RETURNING id
+            """,
+            (guild_id, prayer, scheduled_time, date),
+        )
+        claimed = bool(rows)
+        await self._commit()
+
+        self._remember_sent(guild_id, prayer, date)
+        return claimed
+
+    async def claim_voice(
+        self, guild_id: int, prayer: str, date: str, scheduled_time: str
+    ) -> bool:
+        """
+        Atomically reserve a prayer's voice Adhan for playing.
+
+        Claimed independently of the text notification (same row, own flag),
+        so playback can start without waiting for the message to go out.
+
+        Returns:
+            True if the caller should play it, False if it was already claimed
+        """
+        rows = await self.conn.execute_fetchall(
+            """
+            INSERT INTO scheduled_prayers (guild_id, prayer, scheduled_time, date, sent, voice_sent)
+            VALUES (?, ?, ?, ?, 0, 1)
+            ON CONFLICT(guild_id, prayer, date) DO UPDATE SET voice_sent = 1
+            WHERE voice_sent = 0
+            RETURNING id
+            """,
+            (guild_id, prayer, scheduled_time, date),
+        )
+        await self._commit()
+        return bool(rows)
 
     async def is_prayer_sent(self, guild_id: int, prayer: str, date: str) -> bool:
         """Check if prayer notification was already sent."""
+        if self._is_known_sent(guild_id, prayer, date):
+            return True
+
         cursor = await self.conn.execute(
             """
             SELECT sent
@@ -266,4 +759,177 @@ class Database:
             """,
             (guild_id, prayer, scheduled_time, date),
         )
-        await self.conn.commit()
+        await self._commit()
+
+    async def get_cached_prayer_times(self, location_key: str, date: str) -> PrayerTimes | None:
+        """Retrieve persisted prayer times for a normalized location key and date."""
+        cursor = await self.conn.execute(
+            """
+            SELECT fajr, sunrise, dhuhr, asr, maghrib, isha, timezone
+            FROM prayer_times_cache
+            WHERE location_key = ? AND date = ?
+            """,
+            (location_key, date),
+        )
+        row = await cursor.fetchone()
+        if not row:
+            return None
+
+        return PrayerTimes(
+            date=date,
+            fajr=row[0],
+            sunrise=row[1],
+            dhuhr=row[2],
+            asr=row[3],
+            maghrib=row[4],
+            isha=row[5],
+            timezone=row[6],
+        )
+
+    async def save_cached_prayer_times(self, location_key: str, days: list[PrayerTimes]):
+        """Persist fetched prayer times so they survive restarts."""
+        await self.conn.executemany(
+            """
+            INSERT OR REPLACE INTO prayer_times_cache
+                (location_key, date, fajr, sunrise, dhuhr, asr, maghrib, isha, timezone)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    location_key,
+                    t.date,
+                    t.fajr,
+                    t.sunrise,
+                    t.dhuhr,
+                    t.asr,
+                    t.maghrib,
+                    t.isha,
+                    t.timezone,
+                )
+                for t in days
+            ],
+        )
+        await self._commit()
+
+    async def prune_prayer_times_cache(self, before_date: str) -> int:
+        """Delete persisted prayer times dated before ``before_date`` (YYYY-MM-DD)."""
+        cursor = await self.conn.execute(
+            "DELETE FROM prayer_times_cache WHERE date < ?",
+            (before_date,),
+        )
+        await self._commit()
+        if cursor.rowcount:
+            logger.info(f"Pruned {cursor.rowcount} cached prayer time rows before {before_date}")
+        return cursor.rowcount
+
+    async def prune_scheduled_prayers(
+        self, before_date: str, chunk_size: int = PRUNE_CHUNK_SIZE
+    ) -> int:
+        """
+        Delete sent-prayer records dated before ``before_date`` (YYYY-MM-DD).
+
+        Rows are deleted in chunks with one commit each, yielding to the event
+        loop in between so a large backlog never stalls notifications.
+
+        Returns:
+            Number of rows deleted
+        """
+        total = 0
+        while True:
+            cursor = await self.conn.execute(
+                """
+                DELETE FROM scheduled_prayers
+                WHERE id IN (
+                    SELECT id FROM scheduled_prayers WHERE date < ? LIMIT ?
+                )
+                """,
+                (before_date, chunk_size),
+            )
+            await self._commit()
+            total += cursor.rowcount
+            if cursor.rowcount < chunk_size:
+                return total
+            await asyncio.sleep(0)
+
+    async def reclaim_free_pages(self, max_pages: int = VACUUM_PAGES) -> int:
+        """
+        Return up to ``max_pages`` free pages to the OS.
+
+        incremental_vacuum frees one page per step of its statement and a
+        plain execute() steps it only once, so it is run as a script, which
+        steps every statement to completion.
+
+        Returns:
+            Number of pages freed
+        """
+        before = await self._freelist_count()
+        await self.conn.executescript(f"PRAGMA incremental_vacuum({int(max_pages)});")
+        return before - await self._freelist_count()
+
+    async def _freelist_count(self) -> int:
+        async with self.conn.execute("PRAGMA freelist_count") as cursor:
+            return (await cursor.fetchone())[0]
+
+    async def table_stats(self) -> dict[str, int]:
+        """Row count of scheduled_prayers and overall database file usage."""
+        async with self.conn.execute("SELECT COUNT(*) FROM scheduled_prayers") as cursor:
+            rows = (await cursor.fetchone())[0]
+        stats = {"scheduled_prayers_rows": rows}
+        for pragma in ("page_count", "page_size", "freelist_count"):
+            async with self.conn.execute(f"PRAGMA {pragma}") as cursor:
+                stats[pragma] = (await cursor.fetchone())[0]
+        stats["size_bytes"] = stats["page_count"] * stats["page_size"]
+        return stats
+
+    async def run_maintenance(self, retention_days: int = 30) -> dict[str, float]:
+        """
+        Prune old sent-prayer records and prayer times, reclaim free pages, refresh stats.
+
+        Args:
+            retention_days: Keep records dated within this many days of today (UTC)
+
+        Returns:
+            Table statistics plus rows pruned and seconds spent pruning
+        """
+        cutoff = (datetime.now(UTC) - timedelta(days=retention_days)).strftime("%Y-%m-%d")
+
+        started = time.perf_counter()
+        pruned = await self.prune_scheduled_prayers(cutoff)
+        prune_seconds = time.perf_counter() - started
+
+        times_cutoff = datetime.now(UTC) - timedelta(days=PRAYER_TIMES_RETENTION_DAYS)
+        await self.prune_prayer_times_cache(times_cutoff.strftime("%Y-%m-%d"))
+
+        await self.reclaim_free_pages()
+        await self.conn.execute("PRAGMA optimize")
+
+        report = {**await self.table_stats(), "pruned": pruned, "prune_seconds": prune_seconds}
+        logger.info(
+            f"Database maintenance: pruned {pruned} rows before {cutoff} in "
+            f"{prune_seconds:.3f}s, {report['scheduled_prayers_rows']} rows remain, "
+            f"{report['size_bytes'] / 1024:.0f} KiB on disk"
+        )
+        return report
+
+    def start_maintenance(self, interval: float, retention_days: int = 30):
+        """Run maintenance now and then every ``interval`` seconds in the background."""
+        self.stop_maintenance()
+        self._maintenance_task = asyncio.create_task(
+            self._maintenance_loop(interval, retention_days)
+        )
+
+    def stop_maintenance(self):
+        """Cancel the background maintenance task, if running."""
+        if self._maintenance_task:
+            self._maintenance_task.cancel()
+            self._maintenance_task = None
+
+    async def _maintenance_loop(self, interval: float, retention_days: int):
+        while True:
+            try:
+                await self.run_maintenance(retention_days)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Database maintenance failed: {e}", exc_info=True)
+            await asyncio.sleep(interval)
@@ -0,0 +1,75 @@
+"""Deadline-ordered event queue used by the prayer scheduler."""
+
+import heapq
+import itertools
+from collections.abc import Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass(order=True, slots=True)
+class ScheduledEvent:
+    """A single event due at an absolute UNIX timestamp."""
+
+    fire_at: float
+    seq: int
+    key: Hashable = field(compare=False)
+    payload: Any = field(compare=False, default=None)
+    generation: int = field(compare=False, default=0)
+
+
+class DeadlineQueue:
+    """
+    Min-heap of upcoming events keyed by owner.
+
+    Events are pushed with an owner key (e.g. a guild ID). Discarding a key
+    bumps its generation so all of its queued events become stale; stale
+    entries are dropped lazily when they reach the top of the heap, which
+    keeps both push and discard O(log n) / O(1).
+    """
+
+    def __init__(self):
+        self._heap: list[ScheduledEvent] = []
+        self._generations: dict[Hashable, int] = {}
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        """Number of queued entries, including stale ones not yet dropped."""
+        return len(self._heap)
+
+    def push(self, fire_at: float, key: Hashable, payload: Any = None) -> ScheduledEvent:
+        """Queue an event for ``key`` at ``fire_at`` (UNIX timestamp)."""
+        event = ScheduledEvent(
+            fire_at=fire_at,
+            seq=next(self._counter),
+            key=key,
+            payload=payload,
+            generation=self._generations.get(key, 0),
+        )
+        heapq.heappush(self._heap, event)
+        return event
+
+    def discard(self, key: Hashable):
+        """Invalidate every queued event for ``key``."""
+        self._generations[key] = self._generations.get(key, 0) + 1
+
+    def _is_live(self, event: ScheduledEvent) -> bool:
+        return event.generation == self._generations.get(event.key, 0)
+
+    def _drop_stale(self):
+        while self._heap and not self._is_live(self._heap[0]):
+            heapq.heappop(self._heap)
+
+    def next_deadline(self) -> float | None:
+        """Timestamp of the earliest live event, or None if the queue is empty."""
+        self._drop_stale()
+        return self._heap[0].fire_at if self._heap else None
+
+    def pop_due(self, now: float) -> list[ScheduledEvent]:
+        """Remove and return all live events with ``fire_at <= now``, in order."""
+        due: list[ScheduledEvent] = []
+        while self._heap and self._heap[0].fire_at <= now:
+            event = heapq.heappop(self._heap)
+            if self._is_live(event):
+                due.append(event)
+        return due
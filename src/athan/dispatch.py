@@ -0,0 +1,186 @@
+"""Bounded-concurrency delivery of prayer notifications."""
+
+import asyncio
+import contextlib
+import itertools
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Discord allows roughly 50 requests/second per bot and 5 messages per 5 seconds
+# per channel; staying under both avoids 429s and the retry stalls they cause
+GLOBAL_RATE = 50.0
+CHANNEL_RATE = 1.0
+CHANNEL_BURST = 5
+LATENESS_SAMPLES = 10_000
+BUCKET_SWEEP_SIZE = 1024  # Channel buckets held before idle ones are swept
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` tokens per second, holding at most ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it (waiters are served FIFO)."""
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    def is_idle(self) -> bool:
+        """Whether the bucket is full with nobody waiting, i.e. a new one would behave the same."""
+        self._refill()
+        return self.tokens >= self.capacity and not self._lock.locked()
+
+
+class NotificationDispatcher:
+    """
+    Worker pool that delivers notifications independently of the scheduler loop.
+
+    Jobs are queued and run by a fixed number of workers, so a burst of
+    thousands of guilds at Maghrib neither blocks the scheduler nor opens
+    thousands of concurrent requests. Senders call
+    rate_limit() before each message so deliveries stay within Discord's
+    global and per-channel buckets, and record_delivery() once a message is
+    out, which feeds the lateness percentiles.
+    """
+
+    def __init__(
+        self,
+        workers: int = 32,
+        global_rate: float = GLOBAL_RATE,
+        channel_rate: float = CHANNEL_RATE,
+        channel_burst: int = CHANNEL_BURST,
+    ):
+        self.workers = workers
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.channel_rate = channel_rate
+        self.channel_burst = channel_burst
+        self._channel_buckets: dict[Hashable, TokenBucket] = {}
+        self._sweep_at = BUCKET_SWEEP_SIZE
+        # (priority, sequence, job): urgent jobs first, FIFO within a priority
+        self._queue: asyncio.PriorityQueue[tuple[int, int, Callable[[], Awaitable[Any]]]] = (
+            asyncio.PriorityQueue()
+        )
+        self._sequence = itertools.count()
+        self._tasks: list[asyncio.Task] = []
+        self._lateness: deque[float] = deque(maxlen=LATENESS_SAMPLES)
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        """Start the worker tasks."""
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Cancel workers; queued jobs that have not started are dropped."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+        if self._queue.qsize():
+            logger.warning(f"Dropping {self._queue.qsize()} undelivered notifications")
+        self._queue = asyncio.PriorityQueue()
+
+    def submit(self, job: Callable[[], Awaitable[Any]], *, urgent: bool = False):
+        """
+        Queue ``job``, a coroutine function taking no arguments.
+
+        Urgent jobs (e.g. an Adhan due now) start before any queued non-urgent
+        job (e.g. a pre-connect for a later prayer).
+        """
+        self.submitted += 1
+        self._queue.put_nowait((0 if urgent else 1, next(self._sequence), job))
+
+    async def join(self):
+        """Wait until every submitted job has finished."""
+        await self._queue.join()
+
+    async def rate_limit(self, channel_id: Hashable):
+        """Wait for both the global and the channel's message bucket."""
+        bucket = self._channel_buckets.get(channel_id)
+        if bucket is None:
+            if len(self._channel_buckets) >= self._sweep_at:
+                self._sweep_channel_buckets()
+            bucket = TokenBucket(self.channel_rate, self.channel_burst)
+            self._channel_buckets[channel_id] = bucket
+        await bucket.acquire()
+        await self.global_bucket.acquire()
+
+    def _sweep_channel_buckets(self):
+        """
+        Drop buckets of channels that are full and idle.
+
+        Sweeps run only when the map has doubled since the last one, so
+        their cost stays amortized O(1) per new channel.
+        """
+        idle = [key for key, bucket in self._channel_buckets.items() if bucket.is_idle()]
+        for key in idle:
+            del self._channel_buckets[key]
+        self._sweep_at = max(BUCKET_SWEEP_SIZE, 2 * len(self._channel_buckets))
+        logger.debug(f"Dropped {len(idle)} idle channel buckets")
+
+    def record_delivery(self, scheduled_at: float):
+        """Record that a notification due at ``scheduled_at`` was delivered now."""
+        self._lateness.append(time.time() - scheduled_at)
+
+    def lateness_stats(self) -> dict[str, float]:
+        """Delivery lateness percentiles in seconds over recent notifications."""
+        if not self._lateness:
+            return {"count": 0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+        samples = sorted(self._lateness)
+        return {
+            "count": len(samples),
+            "p50": samples[int(0.50 * (len(samples) - 1))],
+            "p99": samples[int(0.99 * (len(samples) - 1))],
+            "max": samples[-1],
+        }
+
+    def lateness_summary(self) -> str:
+        """One-line p50/p99 lateness for status output."""
+        stats = self.lateness_stats()
+        if not stats["count"]:
+            return "no deliveries yet"
+        return (
+            f"p50 {stats['p50']:.2f}s, p99 {stats['p99']:.2f}s "
+            f"over {stats['count']} deliveries"
+        )
+
+    async def _worker(self):
+        while True:
+            _, _, job = await self._queue.get()
+            try:
+                await job()
+                self.completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Notification job failed: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+            if self.completed + self.failed == self.submitted:
+                logger.debug(f"Notification queue drained: lateness {self.lateness_summary()}")
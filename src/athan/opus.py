@@ -0,0 +1,238 @@
+"""Pre-encoded Opus audio for native (Lavalink-free) voice playback.
+
+Audio is transcoded once with ffmpeg into an Ogg Opus file. At runtime the
+file is memory-mapped and its packets are indexed, so each playback only
+copies ready-made 20 ms Opus frames to the voice connection: no decoding,
+no re-encoding and no Lavalink node involved.
+"""
+
+import asyncio
+import logging
+import mmap
+import struct
+import threading
+from pathlib import Path
+
+import discord
+
+from athan.audio import AudioAsset, audio_file_key
+
+logger = logging.getLogger(__name__)
+
+OPUS_BITRATE = "96k"
+OPUS_CACHE_DIR = Path("data/audio")
+
+# Ogg page header: capture, version, flags, granule, serial, sequence, CRC, segment count
+_PAGE_HEADER = struct.Struct("<4sBBqIIIB")
+
+
+class OpusPackets:
+    """
+    Random access to the Opus packets of a memory-mapped Ogg file.
+
+    Only packet boundaries are indexed; packet bytes stay in the page cache
+    and are shared by every stream reading the same file.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._spans: list[tuple[int, int] | bytes] = []
+        self._streams = 0  # Sources still reading the map
+        self._retired = False
+        self._lock = threading.Lock()  # Sources are released on discord.py's audio thread
+        try:
+            self._index()
+        except ValueError:
+            self._map.close()
+            raise
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def __getitem__(self, index: int) -> bytes:
+        span = self._spans[index]
+        if isinstance(span, bytes):
+            return span
+        return self._map[span[0] : span[1]]
+
+    @property
+    def duration(self) -> float:
+        """Playback length in seconds (discord.py frames are 20 ms)."""
+        return len(self) * discord.opus.Encoder.FRAME_LENGTH / 1000
+
+    def close(self):
+        """Unmap the file."""
+        self._map.close()
+
+    def acquire(self):
+        """Register a stream reading the packets; the file stays mapped until it releases."""
+        with self._lock:
+            if self._retired and not self._streams:
+                raise ValueError(f"Packets of {self.path} are already unmapped")
+            self._streams += 1
+
+    def release(self):
+        """Unregister a stream, unmapping the file if it was the last one of retired packets."""
+        with self._lock:
+            self._streams -= 1
+            unmap = self._retired and not self._streams
+        if unmap:
+            self.close()
+
+    def retire(self):
+        """Unmap the file once no stream is reading it any more."""
+        with self._lock:
+            self._retired = True
+            unmap = not self._streams
+        if unmap:
+            self.close()
+
+    def _index(self):
+        """Record where each packet lives, skipping the OpusHead/OpusTags headers."""
+        data = self._map
+        offset = 0
+        pieces: list[tuple[int, int]] = []  # Parts of a packet continued across pages
+        packets = 0
+
+        while offset < len(data):
+            if len(data) - offset < _PAGE_HEADER.size:
+                raise ValueError(f"Truncated Ogg page at byte {offset} of {self.path}")
+            capture, _, _, _, _, _, _, segments = _PAGE_HEADER.unpack_from(data, offset)
+            if capture != b"OggS":
+                raise ValueError(f"Invalid Ogg page at byte {offset} of {self.path}")
+            table_start = offset + _PAGE_HEADER.size
+            position = table_start + segments
+            body_size = sum(data[table_start:position])
+            if position + body_size > len(data):
+                raise ValueError(f"Truncated Ogg page at byte {offset} of {self.path}")
+
+            for lacing in data[table_start : table_start + segments]:
+                if pieces and pieces[-1][1] == position:
+                    pieces[-1] = (pieces[-1][0], position + lacing)  # Extend contiguous run
+                else:
+                    pieces.append((position, position + lacing))
+                position += lacing
+
+                if lacing < 255:  # Packet ends here
+                    packets += 1
+                    if packets > 2:  # Skip OpusHead and OpusTags
+                        if len(pieces) == 1:
+                            self._spans.append(pieces[0])
+                        else:
+                            self._spans.append(b"".join(data[a:b] for a, b in pieces))
+                    pieces = []
+
+            offset = position
+
+
+class OpusPacketSource(discord.AudioSource):
+    """AudioSource that replays pre-encoded packets without transcoding."""
+
+    def __init__(self, packets: OpusPackets):
+        self.packets: OpusPackets | None = None
+        self.position = 0
+        packets.acquire()
+        self.packets = packets
+
+    def read(self) -> bytes:
+        if self.packets is None or self.position >= len(self.packets):
+            return b""
+        packet = self.packets[self.position]
+        self.position += 1
+        return packet
+
+    def is_opus(self) -> bool:
+        return True
+
+    def cleanup(self):
+        """Release the packets; called by discord.py when playback ends or is stopped."""
+        packets, self.packets = self.packets, None
+        if packets is not None:
+            packets.release()
+
+
+async def encode_opus(source: Path, target: Path, bitrate: str = OPUS_BITRATE):
+    """
+    Transcode an audio file to 48 kHz stereo Ogg Opus with 20 ms frames.
+
+    Raises:
+        RuntimeError: If ffmpeg fails
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    partial = target.with_suffix(target.suffix + ".part")
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg",
+        "-nostdin",
+        "-loglevel", "error",
+        "-y",
+        "-i", str(source),
+        "-vn",
+        "-c:a", "libopus",
+        "-b:a", bitrate,
+        "-ar", "48000",
+        "-ac", "2",
+        "-frame_duration", "20",
+        "-f", "ogg",
+        str(partial),
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        partial.unlink(missing_ok=True)
+        raise RuntimeError(f"ffmpeg failed to encode {source}: {stderr.decode().strip()}")
+    partial.replace(target)
+    logger.info(f"Encoded {source} to {target}")
+
+
+class OpusAssetCache:
+    """
+    Encoded, memory-mapped packets for audio files.
+
+    Each source file is encoded once into ``cache_dir`` (and again only if the
+    source is newer than its encoding), then mapped and indexed once per
+    process.
+    """
+
+    def __init__(self, cache_dir: Path = OPUS_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._packets: dict[Path, tuple[int, OpusPackets]] = {}
+        self._locks: dict[Path, asyncio.Lock] = {}
+
+    def encoded_path(self, source: Path) -> Path:
+        """Where the encoding of ``source`` is stored."""
+        return self.cache_dir / f"{source.stem}.opus"
+
+    async def get(self, audio_file: str | Path | AudioAsset) -> OpusPackets | None:
+        """Packets for a file, encoding it first if needed; None if it cannot be loaded."""
+        key = audio_file_key(audio_file)
+        if key is None:
+            return None
+        source, mtime = key
+
+        cached = self._packets.get(source)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        async with self._locks.setdefault(source, asyncio.Lock()):
+            cached = self._packets.get(source)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+            target = self.encoded_path(source)
+            try:
+                if not target.exists() or target.stat().st_mtime_ns < mtime:
+                    await encode_opus(source, target)
+                packets = await asyncio.to_thread(OpusPackets, target)
+            except (OSError, RuntimeError, ValueError) as e:
+                logger.error(f"Could not prepare Opus audio for {source}: {e}")
+                return None
+
+            if cached:
+                cached[1].retire()  # Streams still playing the old encoding keep it mapped
+            self._packets[source] = (mtime, packets)
+            logger.info(
+                f"Loaded {len(packets)} Opus packets ({packets.duration:.0f}s) for {source}"
+            )
+            return packets
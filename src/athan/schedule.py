@@ -0,0 +1,108 @@
+"""A guild's prayer times for one local day, precomputed as epoch timestamps."""
+
+import math
+from array import array
+from datetime import date as dt_date
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from athan.config import GuildSettings, Prayer, PrayerTimes
+from athan.db import PRAYER_BITS, encode_prayers
+
+PRAYERS = tuple(Prayer)  # Slot order of the timestamp arrays
+MISSING = math.nan  # Timestamp of a time the provider did not return
+
+
+def base_timestamps(prayer_times: PrayerTimes) -> array:
+    """
+    Epoch timestamps of a day's prayer times, without offsets.
+
+    Parsed once per location; every guild sharing the times derives its
+    schedule from the result.
+    """
+    tz = ZoneInfo(prayer_times.timezone)
+    day = dt_date.fromisoformat(prayer_times.date)
+    stamps = array("d")
+    for prayer in PRAYERS:
+        time_str = prayer_times.get_time(prayer)
+        if not time_str:
+            stamps.append(MISSING)
+            continue
+        hour, minute = time_str.split(":")
+        local = datetime(day.year, day.month, day.day, int(hour), int(minute), tzinfo=tz)
+        stamps.append(local.timestamp())
+    return stamps
+
+
+class DailySchedule:
+    """
+    One guild's prayer times for one local date, offsets already applied.
+
+    Built once per day (the scheduler rebuilds it at the guild's local
+    midnight) so notifications, /next_prayer and /today read timestamps
+    instead of re-parsing time strings and re-applying offsets.
+    """
+
+    __slots__ = ("date", "enabled_mask", "timestamps", "tz")
+
+    def __init__(self, date: str, tz: ZoneInfo, timestamps: array, enabled_mask: int):
+        self.date = date
+        self.tz = tz
+        self.timestamps = timestamps
+        self.enabled_mask = enabled_mask
+
+    @classmethod
+    def build(
+        cls, prayer_times: PrayerTimes, settings: GuildSettings, base: array | None = None
+    ) -> "DailySchedule":
+        """
+        Apply a guild's offsets and enabled prayers to a day's times.
+
+        Args:
+            prayer_times: Provider times for the day
+            settings: Guild whose offsets and enabled prayers apply
+            base: base_timestamps(prayer_times), when already parsed for the location
+        """
+        if base is None:
+            base = base_timestamps(prayer_times)
+        stamps = array(
+            "d",
+            (
+                stamp + settings.get_offset(prayer) * 60
+                for prayer, stamp in zip(PRAYERS, base, strict=True)
+            ),
+        )
+        return cls(
+            prayer_times.date,
+            ZoneInfo(prayer_times.timezone),
+            stamps,
+            encode_prayers(settings.enabled_prayers),
+        )
+
+    def timestamp(self, prayer: Prayer) -> float | None:
+        """Epoch time of a prayer, or None if the provider had no time for it."""
+        stamp = self.timestamps[PRAYERS.index(prayer)]
+        return None if math.isnan(stamp) else stamp
+
+    def at(self, prayer: Prayer) -> datetime | None:
+        """Local time of a prayer."""
+        stamp = self.timestamp(prayer)
+        return None if stamp is None else datetime.fromtimestamp(stamp, self.tz)
+
+    def is_enabled(self, prayer: Prayer) -> bool:
+        return bool(self.enabled_mask & PRAYER_BITS[prayer.value])
+
+    def prayers(self) -> list[tuple[Prayer, float]]:
+        """Enabled prayers (never Sunrise) with their timestamps, in order of the day."""
+        return [
+            (prayer, stamp)
+            for prayer, stamp in zip(PRAYERS, self.timestamps, strict=True)
+            if prayer != Prayer.SUNRISE and self.is_enabled(prayer) and not math.isnan(stamp)
+        ]
+
+    def next_prayer(self, after: float) -> tuple[Prayer, datetime] | None:
+        """First enabled prayer strictly after an epoch time, or None if the day is over."""
+        for prayer, stamp in self.prayers():
+            if stamp > after:
+                return prayer, datetime.fromtimestamp(stamp, self.tz)
+        return None
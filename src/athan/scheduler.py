@@ -1,156 +1,373 @@
 """Prayer time scheduler with offset support and persistence."""
 
 import asyncio
+import contextlib
 import logging
+import time
 from datetime import datetime, timedelta
+from datetime import time as dt_time
+from functools import partial
+from typing import NamedTuple
 from zoneinfo import ZoneInfo
 
 import discord
 
+from athan.audio import audio_assets
 from athan.config import BotSettings, GuildSettings, Prayer, PrayerTimes
-from athan.db import Database
-from athan.time_providers.muslimsalat import MuslimSalatProvider
+from athan.db import Database, normalize_place
+from athan.deadlines import DeadlineQueue, ScheduledEvent
+from athan.dispatch import NotificationDispatcher
+from athan.schedule import DailySchedule, base_timestamps
+from athan.time_providers.registry import ProviderRegistry
 
 logger = logging.getLogger(__name__)
 
+GRACE_PERIOD = 15 * 60  # Send prayers missed by up to 15 minutes (e.g. bot restarts)
+RETRY_DELAY = 60  # Seconds before replanning a guild whose prayer times could not be fetched
+MAX_SLEEP = 300  # Upper bound on a single sleep so wall-clock jumps are picked up
+VOICE_WORKERS = 4  # Default concurrent voice playbacks
+VOICE_PRECONNECT = 30  # Default seconds before a prayer to join voice channels
+PLAN_CONCURRENCY = 8  # Location groups planned (i.e. fetching prayer times) at once
+
+
+class PrayerEvent(NamedTuple):
+    """A prayer notification due for one or more guilds of a location group."""
+
+    prayer: Prayer
+    date: str  # YYYY-MM-DD in the guilds' timezone
+    prayer_time: datetime  # Offset already applied
+    guild_ids: tuple[int, ...] = ()
+    voice_guild_ids: tuple[int, ...] = ()  # Members that also play the Adhan in voice
+
+
+class VoiceWarmup(NamedTuple):
+    """Join voice channels shortly before a prayer so the Adhan starts on time."""
+
+    event: PrayerEvent
+
+
+def location_group_key(settings: GuildSettings) -> str:
+    """
+    Key shared by guilds whose prayer times are identical.
+
+    Covers everything that changes the provider's answer: normalized place,
+    calculation method, daylight saving and timezone. Per-guild offsets and
+    enabled prayers are applied when the group is planned.
+    """
+    location = settings.location
+    return "|".join(
+        str(part)
+        for part in (
+            location.location_type.value,
+            normalize_place(location.city),
+            normalize_place(location.country),
+            location.latitude,
+            location.longitude,
+            settings.calculation_method,
+            int(location.daylight_saving),
+            settings.timezone,
+        )
+    )
 
-class PrayerScheduler:
-    """Manages scheduled prayer notifications."""
 
-    def __init__(self, bot: discord.Client, database: Database, bot_settings: BotSettings):
+class PrayerScheduler:
+    """
+    Manages scheduled prayer notifications.
+
+    Guilds that share a location, method and timezone form a location group.
+    Each group fetches its prayer times once per day and queues one event per
+    distinct notification time, which fans out to every member guild. All
+    groups share one deadline queue and one run loop, so the loop only wakes
+    when something is actually due.
+    """
+
+    def __init__(
+        self,
+        bot: discord.Client,
+        database: Database,
+        bot_settings: BotSettings,
+        providers: ProviderRegistry,
+        *,
+        dispatcher: NotificationDispatcher | None = None,
+        voice_dispatcher: NotificationDispatcher | None = None,
+        voice_preconnect: float = VOICE_PRECONNECT,
+    ):
         self.bot = bot
         self.db = database
         self.settings = bot_settings
-        self.muslimsalat_provider = MuslimSalatProvider(bot_settings.muslimsalat_api_key)
-        self.tasks: dict[int, asyncio.Task] = {}
+        self.providers = providers
+        self.dispatcher = dispatcher or NotificationDispatcher()
+        # Voice setup is slow and loads Lavalink, so it gets its own, smaller pool
+        self.voice_dispatcher = voice_dispatcher or NotificationDispatcher(workers=VOICE_WORKERS)
+        self.voice_preconnect = voice_preconnect
+        self.queue = DeadlineQueue()
+        self.groups: dict[str, set[int]] = {}  # Location group key -> member guild IDs
+        self.guild_groups: dict[int, str] = {}  # Guild ID -> location group key
+        self.schedules: dict[int, DailySchedule] = {}  # Guild ID -> today's schedule
+        self.wakeups = 0
+        self.group_fetches = 0
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._replans: dict[str, asyncio.Task] = {}  # Location group key -> running replan
+        self._plan_slots = asyncio.Semaphore(PLAN_CONCURRENCY)
         self._running = False
 
+    @property
+    def scheduled_guilds(self) -> set[int]:
+        """IDs of every guild currently scheduled."""
+        return set(self.guild_groups)
+
     async def start(self):
         """Start scheduler for all subscribed guilds."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+
         self._running = True
-        guild_ids = await self.db.get_all_subscribed_guilds()
-        logger.info(f"Starting scheduler for {len(guild_ids)} guilds")
+        self.dispatcher.start()
+        self.voice_dispatcher.start()
 
-        for guild_id in guild_ids:
-            await self.schedule_guild(guild_id)
+        # One streamed query for all subscribed guilds instead of a lookup per guild
+        for task in self._replans.values():
+            task.cancel()
+        self._replans.clear()
+        for key in self.groups:
+            self.queue.discard(key)
+        self.groups.clear()
+        self.guild_groups.clear()
+        async for settings in self.db.get_all_subscribed_guild_settings():
+            if settings.location:
+                self._join_group(settings)
+
+        # Groups are planned in the background, so groups whose times are cached
+        # are sending while others still wait on their provider
+        self._task = asyncio.create_task(self._run())
+        for key in self.groups:
+            self._spawn_replan(key)
+        logger.info(
+            f"Started scheduler for {len(self.guild_groups)} guilds "
+            f"in {len(self.groups)} location groups"
+        )
 
     async def stop(self):
-        """Stop all scheduled tasks."""
+        """Stop the scheduler loop."""
         self._running = False
-        for task in self.tasks.values():
+        if self._task:
+            self._task.cancel()
+        for task in self._replans.values():
             task.cancel()
-        await self.muslimsalat_provider.close()
+        self._replans.clear()
+        await self.dispatcher.stop()
+        await self.voice_dispatcher.stop()
         logger.info("Scheduler stopped")
 
     async def schedule_guild(self, guild_id: int):
-        """Schedule prayer notifications for a guild."""
-        if guild_id in self.tasks:
-            self.tasks[guild_id].cancel()
+        """(Re)compute prayer deadlines for a guild."""
+        settings = await self.db.get_guild_settings(guild_id)
+        if not settings or not settings.subscribed_channel_id or not settings.location:
+            logger.debug(f"Guild {guild_id} is missing a channel or location, not scheduling")
+            self._leave_group(guild_id)
+            return
 
-        self.tasks[guild_id] = asyncio.create_task(self._guild_loop(guild_id))
+        self._leave_group(guild_id)
+        key = self._join_group(settings)
+        await self._plan_group(key)
+        self._wakeup.set()
         logger.info(f"Scheduled guild {guild_id}")
 
+    async def reschedule_guild(self, guild_id: int):
+        """Recompute deadlines for an already scheduled guild after a settings change."""
+        self.schedules.pop(guild_id, None)
+        if guild_id in self.guild_groups:
+            await self.schedule_guild(guild_id)
+
     async def unschedule_guild(self, guild_id: int):
-        """Remove scheduled tasks for a guild."""
-        if guild_id in self.tasks:
-            self.tasks[guild_id].cancel()
-            del self.tasks[guild_id]
+        """Remove scheduled events for a guild."""
+        if guild_id in self.guild_groups:
+            self._leave_group(guild_id)
             logger.info(f"Unscheduled guild {guild_id}")
 
-    async def _guild_loop(self, guild_id: int):
-        """Main loop for a single guild's prayer notifications."""
-        while self._running:
-            try:
-                await self._process_guild_prayers(guild_id)
-            except asyncio.CancelledError:
-                logger.info(f"Guild loop cancelled for {guild_id}")
-                break
-            except Exception as e:
-                logger.error(f"Error in guild loop {guild_id}: {e}", exc_info=True)
-
-            # Check again in 1 minute
-            await asyncio.sleep(60)
-
-    async def _process_guild_prayers(self, guild_id: int):
-        """Check and send prayer notifications for a guild."""
-        settings = await self.db.get_guild_settings(guild_id)
-        if not settings:
-            logger.debug(f"No settings for guild {guild_id}")
+    def _join_group(self, settings: GuildSettings) -> str:
+        key = location_group_key(settings)
+        self.groups.setdefault(key, set()).add(settings.guild_id)
+        self.guild_groups[settings.guild_id] = key
+        return key
+
+    def _leave_group(self, guild_id: int):
+        """Drop a guild from its group; queued events skip guilds that left."""
+        key = self.guild_groups.pop(guild_id, None)
+        self.schedules.pop(guild_id, None)
+        if key is None:
             return
-        if not settings.subscribed_channel_id:
-            logger.debug(f"Guild {guild_id} has no subscribed channel")
+        members = self.groups.get(key)
+        if members is not None:
+            members.discard(guild_id)
+            if not members:
+                del self.groups[key]
+                self.queue.discard(key)
+
+    async def _run(self):
+        """Sleep until the next deadline, then handle every event that is due."""
+        while self._running:
+            self._wakeup.clear()
+            deadline = self.queue.next_deadline()
+            timeout = MAX_SLEEP if deadline is None else min(MAX_SLEEP, deadline - time.time())
+
+            if timeout > 0:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+
+            self.wakeups += 1
+            for event in self.queue.pop_due(time.time()):
+                try:
+                    await self._handle_event(event)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error handling event for {event.key}: {e}", exc_info=True)
+
+    async def _handle_event(self, event: ScheduledEvent):
+        """Dispatch a due event: notifications, a voice warm-up or a replan (rollover/retry)."""
+        if event.payload is None:
+            self._spawn_replan(event.key)
+        elif isinstance(event.payload, VoiceWarmup):
+            await self._warm_up_voice(event.key, event.payload.event)
+        else:
+            await self._fan_out(event.key, event.payload)
+
+    def _spawn_replan(self, key: str):
+        """
+        Replan a location group in the background.
+
+        Planning may wait on a prayer times provider, so it runs as its own
+        task and the loop keeps popping and dispatching due events meanwhile.
+        At most PLAN_CONCURRENCY groups plan at once, so a startup or a
+        midnight shared by many groups does not flood the provider.
+        """
+        running = self._replans.get(key)
+        if running and not running.done():
             return
-        if not settings.location:
-            logger.debug(f"Guild {guild_id} has no location")
+        self._replans[key] = asyncio.create_task(self._replan(key))
+
+    async def _replan(self, key: str):
+        try:
+            async with self._plan_slots:
+                await self._plan_group(key)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error replanning group {key}: {e}", exc_info=True)
+        finally:
+            if self._replans.get(key) is asyncio.current_task():
+                del self._replans[key]
+            self._wakeup.set()  # New deadlines may be earlier than the one being slept on
+
+    async def _fan_out(self, key: str, event: PrayerEvent):
+        """
+        Hand each guild still in the group its notification and, if set up, its voice Adhan.
+
+        Voice playback is queued right away, ahead of pending pre-connects,
+        so it never waits for the text message to be delivered.
+        """
+        for guild_id in event.guild_ids:
+            if self.guild_groups.get(guild_id) == key:
+                self.dispatcher.submit(partial(self._check_and_send_prayer, guild_id, event))
+        for guild_id in event.voice_guild_ids:
+            if self.guild_groups.get(guild_id) == key:
+                self.voice_dispatcher.submit(
+                    partial(self._start_voice_adhan, guild_id, event), urgent=True
+                )
+
+    async def _warm_up_voice(self, key: str, event: PrayerEvent):
+        """Pre-connect the voice players of guilds that will play this prayer's Adhan."""
+        from athan.voice import preconnect_voice_channel  # noqa: PLC0415
+
+        for guild_id in event.voice_guild_ids:
+            if self.guild_groups.get(guild_id) != key:
+                continue
+            settings = await self.db.get_guild_settings(guild_id)
+            if settings and settings.voice_channel_id:
+                self.voice_dispatcher.submit(
+                    partial(preconnect_voice_channel, self.bot, settings.voice_channel_id)
+                )
+
+    async def _plan_group(self, key: str):
+        """
+        Queue the rest of today's prayers for a location group plus a replan at midnight.
+
+        Prayer times are fetched once for the whole group. Member guilds whose
+        offsets put a prayer at the same instant share one queued event.
+        """
+        self.queue.discard(key)
+        members = []
+        for guild_id in sorted(self.groups.get(key, ())):
+            settings = await self.db.get_guild_settings(guild_id)
+            if settings and settings.subscribed_channel_id and settings.location:
+                members.append(settings)
+        if not members:
             return
 
-        # Get today's prayer times
-        today = datetime.now(ZoneInfo(settings.timezone)).strftime("%Y-%m-%d")
-        prayer_times = await self.get_prayer_times(settings, today)
+        tz = ZoneInfo(members[0].timezone)
+        now = datetime.now(tz)
+        today = now.strftime("%Y-%m-%d")
+        self.group_fetches += 1
+        prayer_times = await self.get_prayer_times(members[0], today)
 
         if not prayer_times:
-            logger.debug(f"No prayer times fetched for guild {guild_id}")
+            logger.debug(f"No prayer times fetched for group {key}, retrying later")
+            self.queue.push(now.timestamp() + RETRY_DELAY, key)
             return
 
-        # Check each enabled prayer
-        logger.debug(f"Guild {guild_id}: Checking {len(settings.enabled_prayers)} enabled prayers")
-        for prayer in settings.enabled_prayers:
-            if prayer == Prayer.SUNRISE:
-                continue  # Sunrise is informational, not a prayer
-
-            await self._check_and_send_prayer(settings, prayer, prayer_times, today)
-
-    async def _check_and_send_prayer(
-        self, settings: GuildSettings, prayer: Prayer, times: PrayerTimes, date: str
-    ):
-        """Check if prayer time has arrived and send notification."""
-        # Check if already sent
-        if await self.db.is_prayer_sent(settings.guild_id, prayer.value, date):
-            logger.debug(f"Guild {settings.guild_id}: {prayer.value} already sent today")
+        # Prayers that passed within the grace period (e.g. during a restart) fire immediately.
+        # Times are parsed once for the group; each guild's schedule only adds its offsets
+        cutoff = now.timestamp() - GRACE_PERIOD
+        base = base_timestamps(prayer_times)
+        due: dict[tuple[Prayer, float], list[int]] = {}
+        for settings in members:
+            schedule = DailySchedule.build(prayer_times, settings, base)
+            self.schedules[settings.guild_id] = schedule
+            for prayer, stamp in schedule.prayers():
+                if stamp >= cutoff:
+                    due.setdefault((prayer, stamp), []).append(settings.guild_id)
+
+        voice_guilds = {s.guild_id for s in members if s.voice_channel_id}
+        times_tz = ZoneInfo(prayer_times.timezone)
+        for (prayer, stamp), guild_ids in due.items():
+            prayer_dt = datetime.fromtimestamp(stamp, times_tz)
+            voice_ids = tuple(gid for gid in guild_ids if gid in voice_guilds)
+            event = PrayerEvent(prayer, today, prayer_dt, tuple(guild_ids), voice_ids)
+            self.queue.push(stamp, key, event)
+            if self.voice_preconnect > 0 and voice_ids:
+                warmup_at = stamp - self.voice_preconnect
+                if warmup_at > now.timestamp():
+                    self.queue.push(warmup_at, key, VoiceWarmup(event))
+
+        # Rollover: replanning at local midnight rebuilds the members' schedules for the new day
+        next_midnight = datetime.combine(now.date() + timedelta(days=1), dt_time.min, tzinfo=tz)
+        self.queue.push(next_midnight.timestamp(), key)
+        logger.debug(f"Group {key}: planned prayers for {len(members)} guilds on {today}")
+
+    async def _check_and_send_prayer(self, guild_id: int, event: PrayerEvent):
+        """Send a due prayer notification unless it was already sent."""
+        settings = await self.db.get_guild_settings(guild_id)
+        if not settings or not settings.subscribed_channel_id:
             return
 
-        # Get prayer time with offset
-        prayer_time_str = times.get_time(prayer)
-        offset = settings.get_offset(prayer)
-        prayer_dt = self._parse_prayer_time(prayer_time_str, date, times.timezone, offset)
-
-        # Check if it's time to send
-        now = datetime.now(ZoneInfo(times.timezone))
-        time_until = (prayer_dt - now).total_seconds()
-
-        logger.debug(
-            f"Guild {settings.guild_id}: {prayer.value} at {prayer_dt.strftime('%H:%M')} "
-            f"(in {time_until:.0f}s, now={now.strftime('%H:%M')})"
+        prayer = event.prayer
+        claimed = await self.db.claim_prayer(
+            guild_id, prayer.value, event.date, event.prayer_time.strftime("%H:%M")
         )
+        if not claimed:
+            logger.debug(f"Guild {guild_id}: {prayer.value} already sent today")
+            return
 
-        # Send if:
-        # - Prayer time was within the last 15 minutes (grace period for bot restarts)
-        # - OR prayer time is within the next 60 seconds
-        GRACE_PERIOD = 15 * 60  # 15 minutes in seconds
-        if -GRACE_PERIOD <= time_until <= 60:
-            logger.info(f"Sending {prayer.value} notification for guild {settings.guild_id}")
-            await self._send_prayer_notification(settings, prayer, prayer_dt)
-            await self.db.mark_prayer_sent(settings.guild_id, prayer.value, date)
-            await self.db.record_scheduled_prayer(
-                settings.guild_id, prayer.value, prayer_dt.strftime("%H:%M"), date
-            )
-            logger.info(f"Sent {prayer.value} notification for guild {settings.guild_id}")
-
-    def _parse_prayer_time(
-        self, time_str: str, date: str, timezone: str, offset_minutes: int
-    ) -> datetime:
-        """Parse prayer time string and apply offset."""
-        dt_str = f"{date} {time_str}"
-        dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
-        dt = dt.replace(tzinfo=ZoneInfo(timezone))
-        dt += timedelta(minutes=offset_minutes)
-        return dt
+        logger.info(f"Sending {prayer.value} notification for guild {guild_id}")
+        await self._send_prayer_notification(settings, prayer, event.prayer_time)
+        logger.info(f"Sent {prayer.value} notification for guild {guild_id}")
 
     async def _send_prayer_notification(
         self, settings: GuildSettings, prayer: Prayer, prayer_time: datetime
     ):
-        """Send prayer notification to subscribed channel and play Adhan in voice if configured."""
-        # Send text notification
+        """Send prayer notification to subscribed channel."""
         channel = self.bot.get_channel(settings.subscribed_channel_id)
         if not channel:
             logger.warning(
@@ -166,29 +383,58 @@ class PrayerScheduler:
             content = f"<@&{settings.ping_role_id}>"
 
         try:
+            await self.dispatcher.rate_limit(channel.id)
             await channel.send(content=content, embed=embed)
+            self.dispatcher.record_delivery(prayer_time.timestamp())
             logger.info(f"Sent {prayer.value} notification to guild {settings.guild_id}")
         except discord.Forbidden:
             logger.error(f"Missing permissions to send to channel {settings.subscribed_channel_id}")
         except Exception as e:
             logger.error(f"Failed to send prayer notification: {e}")
 
-        # Play Adhan in voice channel if configured
-        if settings.voice_channel_id:
-            await self._play_voice_adhan(settings.voice_channel_id, prayer)
+    async def _start_voice_adhan(self, guild_id: int, event: PrayerEvent):
+        """Play a due voice Adhan unless it was already played."""
+        settings = await self.db.get_guild_settings(guild_id)
+        if not settings or not settings.voice_channel_id:
+            return
+
+        prayer = event.prayer
+        claimed = await self.db.claim_voice(
+            guild_id, prayer.value, event.date, event.prayer_time.strftime("%H:%M")
+        )
+        if not claimed:
+            logger.debug(f"Guild {guild_id}: {prayer.value} Adhan already played today")
+            return
 
-    async def _play_voice_adhan(self, voice_channel_id: int, prayer: Prayer):
-        """Play Adhan in voice channel using Lavalink."""
+        await self._play_voice_adhan(
+            settings.voice_channel_id, prayer, event.prayer_time, settings.adhan_audio
+        )
+
+    async def _play_voice_adhan(
+        self,
+        voice_channel_id: int,
+        prayer: Prayer,
+        prayer_time: datetime | None = None,
+        audio: str | None = None,
+    ):
+        """Play the guild's Adhan (or the prayer's variant of it) in a voice channel."""
         from athan.voice import play_adhan_in_voice_channel
 
-        logger.info(f"Playing Adhan for {prayer.value} prayer")
+        asset = audio_assets.for_prayer(prayer, audio)
+        if asset is None:
+            logger.error(f"❌ No Adhan audio available for {prayer.value}")
+            return
+
+        logger.info(f"Playing Adhan {asset.name} for {prayer.value} prayer")
         success = await play_adhan_in_voice_channel(
             bot=self.bot,
             voice_channel_id=voice_channel_id,
-            adhan_file="assets/adhan.mp3"
+            adhan_file=asset,
         )
         
         if success:
+            if prayer_time:
+                self.voice_dispatcher.record_delivery(prayer_time.timestamp())
             logger.info(f"✅ Adhan playback started for {prayer.value}")
         else:
             logger.error(f"❌ Failed to play Adhan for {prayer.value}")
@@ -217,24 +463,33 @@ class PrayerScheduler:
 
     async def get_prayer_times(self, settings: GuildSettings, date: str) -> PrayerTimes | None:
         """Get prayer times for a guild's location and date."""
-        if not settings.location:
-            return None
+        return await self.providers.get_prayer_times(settings, date)
 
-        try:
-            # Pass calculation method and daylight saving from settings
-            daylight_saving = getattr(settings.location, 'daylight_saving', False)
-            calculation_method = settings.calculation_method if hasattr(settings, 'calculation_method') else None
-            
-            return await self.muslimsalat_provider.get_prayer_times(
-                settings.location, 
-                date, 
-                settings.timezone,
-                daylight_saving=daylight_saving,
-                calculation_method=calculation_method
-            )
-        except Exception as e:
-            logger.error(f"Failed to fetch prayer times: {e}")
+    async def get_schedule(
+        self, settings: GuildSettings, date: str | None = None
+    ) -> DailySchedule | None:
+        """
+        A guild's schedule for a local date (today by default).
+
+        Today's schedule is kept until the guild's next rollover or settings
+        change, so repeated lookups cost no parsing or provider calls.
+
+        Returns:
+            The schedule, or None if prayer times could not be fetched
+        """
+        today = datetime.now(ZoneInfo(settings.timezone)).strftime("%Y-%m-%d")
+        date = date or today
+        cached = self.schedules.get(settings.guild_id)
+        if cached and cached.date == date:
+            return cached
+
+        times = await self.get_prayer_times(settings, date)
+        if not times:
             return None
+        schedule = DailySchedule.build(times, settings)
+        if date == today:
+            self.schedules[settings.guild_id] = schedule
+        return schedule
 
     async def get_next_prayer(self, settings: GuildSettings) -> tuple[Prayer, datetime] | None:
         """Get next prayer and its time for a guild."""
@@ -242,36 +497,13 @@ class PrayerScheduler:
             return None
 
         now = datetime.now(ZoneInfo(settings.timezone))
-        today = now.strftime("%Y-%m-%d")
         tomorrow = (now + timedelta(days=1)).strftime("%Y-%m-%d")
 
-        # Try today first
-        times = await self.get_prayer_times(settings, today)
-        if times:
-            next_prayer = self._find_next_prayer(now, times, settings)
+        # Try today first, then tomorrow
+        for date in (None, tomorrow):
+            schedule = await self.get_schedule(settings, date)
+            next_prayer = schedule.next_prayer(now.timestamp()) if schedule else None
             if next_prayer:
                 return next_prayer
 
-        # Try tomorrow
-        times = await self.get_prayer_times(settings, tomorrow)
-        if times:
-            return self._find_next_prayer(now, times, settings)
-
-        return None
-
-    def _find_next_prayer(
-        self, now: datetime, times: PrayerTimes, settings: GuildSettings
-    ) -> tuple[Prayer, datetime] | None:
-        """Find next prayer from prayer times."""
-        for prayer in settings.enabled_prayers:
-            if prayer == Prayer.SUNRISE:
-                continue
-
-            time_str = times.get_time(prayer)
-            offset = settings.get_offset(prayer)
-            prayer_dt = self._parse_prayer_time(time_str, times.date, times.timezone, offset)
-
-            if prayer_dt > now:
-                return prayer, prayer_dt
-
         return None
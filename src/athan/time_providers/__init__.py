@@ -10,18 +10,25 @@ class TimeProvider(ABC):
 
     @abstractmethod
     async def get_prayer_times(
-        self, location: Location, date: str, method: str | None = None
-    ) -> PrayerTimes:
+        self,
+        location: Location,
+        date: str,
+        timezone: str,
+        daylight_saving: bool = False,
+        calculation_method: str | None = None,
+    ) -> PrayerTimes | None:
         """
         Fetch prayer times for a location and date.
 
         Args:
             location: Location specification
             date: Date in YYYY-MM-DD format
-            method: Optional calculation method
+            timezone: IANA timezone the times are expressed in
+            daylight_saving: Whether the location observes daylight saving
+            calculation_method: Optional calculation method number
 
         Returns:
-            PrayerTimes object with times in HH:MM format
+            PrayerTimes object with times in HH:MM format, or None if unavailable
         """
         pass
 
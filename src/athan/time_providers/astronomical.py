@@ -0,0 +1,220 @@
+"""Local astronomical prayer time calculation (no network access)."""
+
+import logging
+import math
+from datetime import date as date_type
+from datetime import datetime
+from typing import NamedTuple
+from zoneinfo import ZoneInfo
+
+from athan.config import CalculationMethod, Location, Prayer, PrayerTimes
+from athan.time_providers import TimeProvider
+
+logger = logging.getLogger(__name__)
+
+SUNRISE_ANGLE = 0.833  # Refraction plus solar radius, degrees below the horizon
+
+
+class MethodParams(NamedTuple):
+    """Twilight angles and Asr shadow factor for a calculation method."""
+
+    fajr_angle: float
+    isha_angle: float | None  # Degrees below the horizon, or None for a fixed interval
+    isha_minutes: int | None  # Minutes after Maghrib when isha_angle is None
+    asr_factor: int  # 1 = Shafi/standard, 2 = Hanafi
+
+
+METHOD_PARAMS: dict[str, MethodParams] = {
+    CalculationMethod.EGYPT.value: MethodParams(19.5, 17.5, None, 1),
+    CalculationMethod.KARACHI_SHAFI.value: MethodParams(18.0, 18.0, None, 1),
+    CalculationMethod.KARACHI_HANAFI.value: MethodParams(18.0, 18.0, None, 2),
+    CalculationMethod.ISNA.value: MethodParams(15.0, 15.0, None, 1),
+    CalculationMethod.MWL.value: MethodParams(18.0, 17.0, None, 1),
+    CalculationMethod.UMM_AL_QURA.value: MethodParams(18.5, None, 90, 1),
+    CalculationMethod.FIXED_ISHA.value: MethodParams(19.5, None, 90, 1),
+}
+
+
+def get_method_params(calculation_method: str | None) -> MethodParams:
+    """Look up method parameters, defaulting to Muslim World League."""
+    return METHOD_PARAMS.get(calculation_method or "", METHOD_PARAMS[CalculationMethod.MWL.value])
+
+
+def julian_date(day: date_type) -> float:
+    """Julian date at 00:00 UTC for a calendar date."""
+    year, month = day.year, day.month
+    if month <= 2:
+        year -= 1
+        month += 12
+    a = year // 100
+    b = 2 - a + a // 4
+    return (
+        math.floor(365.25 * (year + 4716))
+        + math.floor(30.6001 * (month + 1))
+        + day.day
+        + b
+        - 1524.5
+    )
+
+
+def sun_position(jd: float) -> tuple[float, float]:
+    """
+    Approximate solar position.
+
+    Returns:
+        (declination in degrees, equation of time in hours)
+    """
+    d = jd - 2451545.0
+    g = math.radians((357.529 + 0.98560028 * d) % 360)
+    q = (280.459 + 0.98564736 * d) % 360
+    ecl_long = math.radians((q + 1.915 * math.sin(g) + 0.020 * math.sin(2 * g)) % 360)
+    obliquity = math.radians(23.439 - 0.00000036 * d)
+
+    declination = math.degrees(math.asin(math.sin(obliquity) * math.sin(ecl_long)))
+    right_ascension = math.degrees(
+        math.atan2(math.cos(obliquity) * math.sin(ecl_long), math.cos(ecl_long))
+    ) / 15
+    equation_of_time = q / 15 - right_ascension % 24
+    equation_of_time = (equation_of_time + 12) % 24 - 12
+    return declination, equation_of_time
+
+
+def _hour_angle(angle: float, latitude: float, declination: float) -> float:
+    """Hours between solar noon and the sun reaching ``angle`` degrees below the horizon."""
+    lat, decl = math.radians(latitude), math.radians(declination)
+    cos_h = (-math.sin(math.radians(angle)) - math.sin(decl) * math.sin(lat)) / (
+        math.cos(decl) * math.cos(lat)
+    )
+    if not -1.0 <= cos_h <= 1.0:
+        return math.nan  # Sun never reaches this angle (high latitudes)
+    return math.degrees(math.acos(cos_h)) / 15
+
+
+def _asr_hour_angle(factor: int, latitude: float, declination: float) -> float:
+    """Hours between solar noon and Asr for a shadow-length factor."""
+    noon_zenith = math.radians(abs(latitude - declination))
+    altitude = math.degrees(math.atan(1 / (factor + math.tan(noon_zenith))))
+    return _hour_angle(-altitude, latitude, declination)
+
+
+def compute_prayer_hours(
+    latitude: float,
+    longitude: float,
+    day: date_type,
+    utc_offset: float,
+    calculation_method: str | None = None,
+) -> dict[Prayer, float]:
+    """
+    Compute prayer times as fractional hours of the local day.
+
+    Args:
+        latitude: Latitude in degrees (north positive)
+        longitude: Longitude in degrees (east positive)
+        day: Local calendar date
+        utc_offset: Local UTC offset in hours for that date
+        calculation_method: MuslimSalat method number ("1"-"7")
+
+    Returns:
+        Mapping of each Prayer to local hours (e.g. 13.5 == 13:30)
+    """
+    params = get_method_params(calculation_method)
+    # Solar position at local noon is accurate to well under a minute for all times of day
+    jd = julian_date(day) - longitude / 360 + 0.5
+    declination, equation_of_time = sun_position(jd)
+
+    noon = 12 - equation_of_time + utc_offset - longitude / 15
+    sunrise = noon - _hour_angle(SUNRISE_ANGLE, latitude, declination)
+    sunset = noon + _hour_angle(SUNRISE_ANGLE, latitude, declination)
+    fajr = noon - _hour_angle(params.fajr_angle, latitude, declination)
+    asr = noon + _asr_hour_angle(params.asr_factor, latitude, declination)
+    if params.isha_angle is not None:
+        isha = noon + _hour_angle(params.isha_angle, latitude, declination)
+    else:
+        isha = sunset + params.isha_minutes / 60
+
+    if math.isnan(sunrise) or math.isnan(sunset):
+        raise ValueError(f"The sun does not rise or set at latitude {latitude} on {day}")
+
+    # High latitudes: when twilight never ends (or lasts too long), cap Fajr/Isha at a
+    # fraction of the night proportional to the twilight angle ("angle-based" rule)
+    night = 24 - (sunset - sunrise)
+    fajr_portion = params.fajr_angle / 60 * night
+    if math.isnan(fajr) or sunrise - fajr > fajr_portion:
+        fajr = sunrise - fajr_portion
+    if params.isha_angle is not None:
+        isha_portion = params.isha_angle / 60 * night
+        if math.isnan(isha) or isha - sunset > isha_portion:
+            isha = sunset + isha_portion
+
+    return {
+        Prayer.FAJR: fajr,
+        Prayer.SUNRISE: sunrise,
+        Prayer.DHUHR: noon,
+        Prayer.ASR: asr,
+        Prayer.MAGHRIB: sunset,
+        Prayer.ISHA: isha,
+    }
+
+
+def format_hours(hours: float) -> str:
+    """Format fractional local hours as HH:MM, rounded to the nearest minute."""
+    minutes = round(hours * 60) % 1440
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class AstronomicalProvider(TimeProvider):
+    """Compute prayer times locally from a location's coordinates."""
+
+    def calculate(
+        self,
+        latitude: float,
+        longitude: float,
+        date: str,
+        timezone: str,
+        calculation_method: str | None = None,
+    ) -> PrayerTimes:
+        """Synchronously compute prayer times for coordinates and a YYYY-MM-DD date."""
+        day = datetime.strptime(date, "%Y-%m-%d").date()
+        noon = datetime(day.year, day.month, day.day, 12, tzinfo=ZoneInfo(timezone))
+        utc_offset = noon.utcoffset().total_seconds() / 3600
+
+        hours = compute_prayer_hours(latitude, longitude, day, utc_offset, calculation_method)
+        return PrayerTimes(
+            date=date,
+            timezone=timezone,
+            **{prayer.value.lower(): format_hours(value) for prayer, value in hours.items()},
+        )
+
+    async def get_prayer_times(
+        self,
+        location: Location,
+        date: str,
+        timezone: str,
+        daylight_saving: bool = False,
+        calculation_method: str | None = None,
+    ) -> PrayerTimes | None:
+        """
+        Compute prayer times for a location with coordinates.
+
+        Daylight saving is taken from the timezone database, so
+        ``daylight_saving`` is accepted only for interface compatibility.
+
+        Returns:
+            PrayerTimes object, or None if the location has no coordinates
+        """
+        if location.latitude is None or location.longitude is None:
+            return None
+
+        try:
+            return self.calculate(
+                location.latitude, location.longitude, date, timezone, calculation_method
+            )
+        except ValueError as e:
+            logger.warning(f"Cannot calculate prayer times: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error calculating prayer times: {e}", exc_info=True)
+            return None
+
+    async def close(self):
+        """Nothing to release; no network resources are held."""
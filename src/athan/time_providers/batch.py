@@ -0,0 +1,132 @@
+"""Vectorized prayer time calculation for many locations and dates.
+
+Requires NumPy (``pip install athan[fast]``). Mirrors
+:func:`athan.time_providers.astronomical.compute_prayer_hours` but evaluates a
+whole locations x days grid at once.
+"""
+
+from collections.abc import Sequence
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from athan.config import Prayer
+from athan.time_providers.astronomical import SUNRISE_ANGLE, get_method_params, julian_date
+
+# Column order of the last axis of compute_prayer_times_batch()
+BATCH_PRAYERS: tuple[Prayer, ...] = (
+    Prayer.FAJR,
+    Prayer.SUNRISE,
+    Prayer.DHUHR,
+    Prayer.ASR,
+    Prayer.MAGHRIB,
+    Prayer.ISHA,
+)
+
+MISSING = -1  # Minute-of-day value for times that do not exist (e.g. polar day)
+
+
+def _sun_position(jd: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized solar declination (degrees) and equation of time (hours)."""
+    d = jd - 2451545.0
+    g = np.radians((357.529 + 0.98560028 * d) % 360)
+    q = (280.459 + 0.98564736 * d) % 360
+    ecl_long = np.radians((q + 1.915 * np.sin(g) + 0.020 * np.sin(2 * g)) % 360)
+    obliquity = np.radians(23.439 - 0.00000036 * d)
+
+    declination = np.degrees(np.arcsin(np.sin(obliquity) * np.sin(ecl_long)))
+    right_ascension = (
+        np.degrees(np.arctan2(np.cos(obliquity) * np.sin(ecl_long), np.cos(ecl_long))) / 15
+    )
+    equation_of_time = (q / 15 - right_ascension % 24 + 12) % 24 - 12
+    return declination, equation_of_time
+
+
+def _hour_angle(angle: float | np.ndarray, lat: np.ndarray, decl: np.ndarray) -> np.ndarray:
+    """Vectorized hours from solar noon to ``angle`` degrees below the horizon (NaN if never)."""
+    cos_h = (-np.sin(np.radians(angle)) - np.sin(decl) * np.sin(lat)) / (
+        np.cos(decl) * np.cos(lat)
+    )
+    with np.errstate(invalid="ignore"):
+        return np.where(np.abs(cos_h) <= 1.0, np.degrees(np.arccos(cos_h)) / 15, np.nan)
+
+
+def _utc_offsets(timezones: Sequence[str], dates: Sequence[date]) -> np.ndarray:
+    """UTC offsets in hours at local noon, shape (len(timezones), len(dates))."""
+    unique, inverse = np.unique(np.asarray(timezones), return_inverse=True)
+    table = np.empty((len(unique), len(dates)))
+    for i, name in enumerate(unique):
+        tz = ZoneInfo(str(name))
+        for j, day in enumerate(dates):
+            noon = datetime(day.year, day.month, day.day, 12, tzinfo=tz)
+            table[i, j] = noon.utcoffset().total_seconds() / 3600
+    return table[inverse]
+
+
+def compute_prayer_times_batch(
+    locations: Sequence[tuple[float, float]] | np.ndarray,
+    date_range: Sequence[date],
+    method: str | None = None,
+    timezones: Sequence[str] | None = None,
+) -> np.ndarray:
+    """
+    Compute prayer times for every location on every date.
+
+    Args:
+        locations: (latitude, longitude) pairs, shape (n_locations, 2)
+        date_range: Local calendar dates
+        method: MuslimSalat method number ("1"-"7"), default Muslim World League
+        timezones: IANA timezone per location; times are UTC if omitted
+
+    Returns:
+        int16 array of shape (n_locations, n_days, 6) holding minute-of-day values
+        in BATCH_PRAYERS order, with MISSING where a time does not exist
+    """
+    coords = np.asarray(locations, dtype=np.float64).reshape(-1, 2)
+    latitude = coords[:, 0:1]
+    longitude = coords[:, 1:2]
+    params = get_method_params(method)
+
+    jd = np.array([julian_date(day) for day in date_range], dtype=np.float64)[None, :]
+    if timezones is None:
+        utc_offset = np.zeros((len(coords), len(date_range)))
+    else:
+        utc_offset = _utc_offsets(timezones, date_range)
+
+    declination, equation_of_time = _sun_position(jd - longitude / 360 + 0.5)
+    lat = np.radians(latitude)
+    decl = np.radians(declination)
+
+    noon = 12 - equation_of_time + utc_offset - longitude / 15
+    rise_set = _hour_angle(SUNRISE_ANGLE, lat, decl)
+    sunrise = noon - rise_set
+    sunset = noon + rise_set
+    fajr = noon - _hour_angle(params.fajr_angle, lat, decl)
+
+    noon_zenith = np.radians(np.abs(latitude - declination))
+    asr_altitude = np.degrees(np.arctan(1 / (params.asr_factor + np.tan(noon_zenith))))
+    asr = noon + _hour_angle(-asr_altitude, lat, decl)
+
+    # Same angle-based high latitude rule as the scalar implementation
+    night = 24 - (sunset - sunrise)
+    fajr_portion = params.fajr_angle / 60 * night
+    with np.errstate(invalid="ignore"):
+        fajr = np.where(
+            np.isnan(fajr) | (sunrise - fajr > fajr_portion), sunrise - fajr_portion, fajr
+        )
+        if params.isha_angle is not None:
+            isha = noon + _hour_angle(params.isha_angle, lat, decl)
+            isha_portion = params.isha_angle / 60 * night
+            isha = np.where(
+                np.isnan(isha) | (isha - sunset > isha_portion), sunset + isha_portion, isha
+            )
+        else:
+            isha = sunset + params.isha_minutes / 60
+
+    hours = np.stack(np.broadcast_arrays(fajr, sunrise, noon, asr, sunset, isha), axis=-1)
+    hours[np.isnan(sunrise) | np.isnan(sunset)] = np.nan  # Polar day/night: no usable times
+    minutes = np.full(hours.shape, MISSING, dtype=np.int16)
+    valid = ~np.isnan(hours)
+    minutes[valid] = np.round(hours[valid] * 60) % 1440
+    return minutes
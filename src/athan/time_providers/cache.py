@@ -0,0 +1,82 @@
+"""Bounded in-memory cache for prayer times."""
+
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from athan.config import PrayerTimes
+
+
+def end_of_local_day(date: str, timezone: str) -> float:
+    """UNIX timestamp of the midnight that ends ``date`` (YYYY-MM-DD) in ``timezone``."""
+    day = datetime.strptime(date, "%Y-%m-%d") + timedelta(days=1)
+    return day.replace(tzinfo=ZoneInfo(timezone)).timestamp()
+
+
+class PrayerTimesCache:
+    """
+    LRU cache of PrayerTimes with a size bound and per-entry expiry.
+
+    Entries expire at the end of the local day they describe, so times for
+    today drop out at midnight while later days from a weekly response stay
+    warm until they are used.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[PrayerTimes, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str, now: float | None = None) -> PrayerTimes | None:
+        """Return cached times for ``key``, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        times, expires_at = entry
+        if expires_at <= (time.time() if now is None else now):
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return times
+
+    def set(self, key: str, times: PrayerTimes, expires_at: float | None = None):
+        """Store times, expiring at the end of their local day unless told otherwise."""
+        if expires_at is None:
+            expires_at = end_of_local_day(times.date, times.timezone)
+
+        self._entries[key] = (times, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (statistics are kept)."""
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Hit/miss/eviction counters and current size."""
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -1,43 +1,83 @@
 """MuslimSalat.com API time provider."""
 
+import asyncio
 import logging
-from datetime import datetime
-from zoneinfo import ZoneInfo
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
 
 import aiohttp
 
 from athan.config import Location, LocationType, Prayer, PrayerTimes
+from athan.db import Database
+from athan.time_providers import TimeProvider
+from athan.time_providers.cache import PrayerTimesCache
 
 logger = logging.getLogger(__name__)
 
 
-class MuslimSalatProvider:
+class MuslimSalatProvider(TimeProvider):
     """Fetch prayer times from MuslimSalat.com API."""
 
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        cache_size: int = 4096,
+        store: Database | None = None,
+        session_factory: Callable[[], Awaitable[aiohttp.ClientSession]] | None = None,
+    ):
         self.api_key = api_key
         self.base_url = "https://muslimsalat.com"
         self.session: aiohttp.ClientSession | None = None
-        self.cache: dict[str, tuple[PrayerTimes, datetime]] = {}
+        self.session_factory = session_factory  # Shared session owner, e.g. ProviderRegistry
+        self.cache = PrayerTimesCache(maxsize=cache_size)
+        self.store = store  # Optional persistent cache that survives restarts
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.requests_sent = 0
+        self.requests_coalesced = 0
+        self.store_hits = 0
 
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create aiohttp session."""
+        """Get the shared session, or create a private one."""
+        if self.session_factory:
+            return await self.session_factory()
         if self.session is None or self.session.closed:
             self.session = aiohttp.ClientSession()
         return self.session
 
     async def close(self):
-        """Close the aiohttp session."""
+        """Close the aiohttp session if this provider created it."""
         if self.session and not self.session.closed:
             await self.session.close()
 
-    def _build_cache_key(self, location: Location, date: str) -> str:
-        """Build cache key for location and date."""
+    def _build_location_key(
+        self,
+        location: Location,
+        daylight_saving: bool = False,
+        calculation_method: str | None = None,
+    ) -> str:
+        """Build a normalized key from every URL-affecting parameter except the date."""
         if location.location_type == LocationType.CITY:
-            return f"{location.city}_{location.country}_{date}"
+            place = location.city.lower().replace(" ", "-") if location.city else "doha"
         elif location.location_type == LocationType.COORDINATES:
-            return f"{location.latitude}_{location.longitude}_{date}"
-        return f"location_{date}"
+            place = f"{location.latitude},{location.longitude}"
+        else:
+            place = "doha"
+
+        method = "auto"
+        if calculation_method and calculation_method.isdigit():
+            method = calculation_method
+        daylight = "dst" if daylight_saving else "std"
+        return f"{place}_{daylight}_{method}"
+
+    def _build_cache_key(
+        self,
+        location: Location,
+        date: str,
+        daylight_saving: bool = False,
+        calculation_method: str | None = None,
+    ) -> str:
+        """Build cache key for a location's request parameters and date."""
+        return f"{self._build_location_key(location, daylight_saving, calculation_method)}_{date}"
 
     def _build_url(
         self, 
@@ -78,6 +118,74 @@ class MuslimSalatProvider:
         
         return url
 
+    def _parse_items(
+        self, items: list[dict], date: str, timezone: str
+    ) -> dict[str, PrayerTimes]:
+        """
+        Parse every day in an API response, keyed by YYYY-MM-DD.
+
+        Items carry their own ``date_for`` (e.g. "2025-1-7"); items without it
+        are assumed to be consecutive days starting at ``date``.
+        """
+        start = datetime.strptime(date, "%Y-%m-%d").date()
+        days: dict[str, PrayerTimes] = {}
+
+        for index, item in enumerate(items):
+            try:
+                day = datetime.strptime(item["date_for"], "%Y-%m-%d").date()
+            except (KeyError, TypeError, ValueError):
+                day = start + timedelta(days=index)
+
+            prayer_times = self._parse_item(item, day.strftime("%Y-%m-%d"), timezone)
+            if prayer_times:
+                days[prayer_times.date] = prayer_times
+
+        return days
+
+    def _parse_item(self, times: dict, date: str, timezone: str) -> PrayerTimes | None:
+        """Parse one day of times in "HH:MM am/pm" format into a PrayerTimes object."""
+        # Parse all prayer times
+        prayer_data = {}
+
+        for prayer, key in [
+            (Prayer.FAJR, "fajr"),
+            (Prayer.DHUHR, "dhuhr"),
+            (Prayer.ASR, "asr"),
+            (Prayer.MAGHRIB, "maghrib"),
+            (Prayer.ISHA, "isha"),
+        ]:
+            if key not in times:
+                logger.warning(f"Missing {prayer.value} time for {date}")
+                return None
+            time_str = times[key].strip()
+            try:
+                # Parse "5:58 am" or "12:44 pm" format
+                prayer_data[prayer] = datetime.strptime(time_str, "%I:%M %p")
+            except ValueError as e:
+                logger.warning(f"Failed to parse {prayer.value} time: {time_str} - {e}")
+                return None
+
+        # Parse sunrise if available
+        sunrise_dt = None
+        if "shurooq" in times:
+            time_str = times["shurooq"].strip()
+            try:
+                sunrise_dt = datetime.strptime(time_str, "%I:%M %p")
+            except ValueError:
+                logger.warning(f"Failed to parse sunrise time: {time_str}")
+
+        # Create PrayerTimes object with all required fields
+        return PrayerTimes(
+            date=date,
+            fajr=prayer_data[Prayer.FAJR].strftime("%H:%M"),
+            sunrise=sunrise_dt.strftime("%H:%M") if sunrise_dt else "06:00",
+            dhuhr=prayer_data[Prayer.DHUHR].strftime("%H:%M"),
+            asr=prayer_data[Prayer.ASR].strftime("%H:%M"),
+            maghrib=prayer_data[Prayer.MAGHRIB].strftime("%H:%M"),
+            isha=prayer_data[Prayer.ISHA].strftime("%H:%M"),
+            timezone=timezone,
+        )
+
     async def get_prayer_times(
         self, 
         location: Location, 
@@ -98,20 +206,78 @@ class MuslimSalatProvider:
             PrayerTimes object or None if failed
         """
         # Check cache first
-        cache_key = self._build_cache_key(location, date)
-        if cache_key in self.cache:
-            cached_times, cached_at = self.cache[cache_key]
-            # Cache valid for 1 hour
-            if (datetime.now(ZoneInfo("UTC")) - cached_at).total_seconds() < 3600:
-                logger.debug(f"Using cached prayer times for {cache_key}")
-                return cached_times
+        cache_key = self._build_cache_key(location, date, daylight_saving, calculation_method)
+        cached_times = self.cache.get(cache_key)
+        if cached_times:
+            logger.debug(f"Using cached prayer times for {cache_key}")
+            return self._with_timezone(cached_times, timezone)
 
+        # Concurrent misses for the same request share one in-flight fetch
+        task = self._inflight.get(cache_key)
+        if task is not None:
+            self.requests_coalesced += 1
+            logger.debug(f"Joining in-flight request for {cache_key}")
+        else:
+            task = asyncio.create_task(
+                self._load_prayer_times(
+                    location, date, timezone, daylight_saving, calculation_method
+                )
+            )
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+
+        # Shield so a cancelled caller does not cancel the fetch for everyone else
+        return self._with_timezone(await asyncio.shield(task), timezone)
+
+    @staticmethod
+    def _with_timezone(times: PrayerTimes | None, timezone: str) -> PrayerTimes | None:
+        """Label shared times with the caller's timezone (the API times themselves match)."""
+        if times is None or times.timezone == timezone:
+            return times
+        return times.model_copy(update={"timezone": timezone})
+
+    async def _load_prayer_times(
+        self,
+        location: Location,
+        date: str,
+        timezone: str,
+        daylight_saving: bool,
+        calculation_method: str | None,
+    ) -> PrayerTimes | None:
+        """Serve from the persistent store when possible, otherwise fetch from the API."""
+        if self.store:
+            location_key = self._build_location_key(location, daylight_saving, calculation_method)
+            try:
+                stored = await self.store.get_cached_prayer_times(location_key, date)
+            except Exception as e:
+                logger.warning(f"Could not read persisted prayer times: {e}")
+                stored = None
+
+            if stored:
+                self.store_hits += 1
+                self.cache.set(f"{location_key}_{date}", stored)
+                return stored
+
+        return await self._fetch_prayer_times(
+            location, date, timezone, daylight_saving, calculation_method
+        )
+
+    async def _fetch_prayer_times(
+        self,
+        location: Location,
+        date: str,
+        timezone: str,
+        daylight_saving: bool,
+        calculation_method: str | None,
+    ) -> PrayerTimes | None:
+        """Request prayer times from the API and cache every day in the response."""
         try:
             session = await self._get_session()
             url = self._build_url(location, date, daylight_saving, calculation_method)
 
             # Add API key as parameter
             params = {"key": self.api_key}
+            self.requests_sent += 1
 
             logger.info(f"Fetching prayer times...")
 
@@ -126,59 +292,25 @@ class MuslimSalatProvider:
                     logger.error("Invalid response from prayer times API")
                     return None
 
-                # Get today's times (first item)
-                times = data["items"][0]
-
-                # MuslimSalat returns times in format "HH:MM am/pm"
-                tz = ZoneInfo(timezone)
-                today = datetime.strptime(date, "%Y-%m-%d").date()
-
-                # Parse all prayer times
-                prayer_data = {}
-
-                for prayer, key in [
-                    (Prayer.FAJR, "fajr"),
-                    (Prayer.DHUHR, "dhuhr"),
-                    (Prayer.ASR, "asr"),
-                    (Prayer.MAGHRIB, "maghrib"),
-                    (Prayer.ISHA, "isha"),
-                ]:
-                    if key in times:
-                        time_str = times[key].strip()
-                        try:
-                            # Parse "5:58 am" or "12:44 pm" format
-                            time_obj = datetime.strptime(time_str, "%I:%M %p")
-                            # Combine with today's date and timezone
-                            prayer_dt = datetime.combine(today, time_obj.time()).replace(tzinfo=tz)
-                            prayer_data[prayer] = prayer_dt
-                        except ValueError as e:
-                            logger.warning(f"Failed to parse {prayer.value} time: {time_str} - {e}")
-                            return None
-
-                # Parse sunrise if available
-                sunrise_dt = None
-                if "shurooq" in times:
-                    time_str = times["shurooq"].strip()
-                    try:
-                        time_obj = datetime.strptime(time_str, "%I:%M %p")
-                        sunrise_dt = datetime.combine(today, time_obj.time()).replace(tzinfo=tz)
-                    except ValueError:
-                        logger.warning(f"Failed to parse sunrise time: {time_str}")
-
-                # Create PrayerTimes object with all required fields
-                prayer_times = PrayerTimes(
-                    date=date,
-                    fajr=prayer_data[Prayer.FAJR].strftime("%H:%M"),
-                    sunrise=sunrise_dt.strftime("%H:%M") if sunrise_dt else "06:00",
-                    dhuhr=prayer_data[Prayer.DHUHR].strftime("%H:%M"),
-                    asr=prayer_data[Prayer.ASR].strftime("%H:%M"),
-                    maghrib=prayer_data[Prayer.MAGHRIB].strftime("%H:%M"),
-                    isha=prayer_data[Prayer.ISHA].strftime("%H:%M"),
-                    timezone=timezone,
+                # Weekly responses carry seven days; cache all of them
+                days = self._parse_items(data["items"], date, timezone)
+                if not days:
+                    return None
+
+                location_key = self._build_location_key(
+                    location, daylight_saving, calculation_method
                 )
+                for day, day_times in days.items():
+                    self.cache.set(f"{location_key}_{day}", day_times)
 
-                # Cache the result
-                self.cache[cache_key] = (prayer_times, datetime.now(ZoneInfo("UTC")))
+                # The daily endpoint has no date parameter, so fall back to its only item
+                prayer_times = days.get(date) or next(iter(days.values()))
+                if prayer_times.date != date:
+                    prayer_times = prayer_times.model_copy(update={"date": date})
+                    self.cache.set(f"{location_key}_{date}", prayer_times)
+                    days[date] = prayer_times
+
+                await self._persist(location_key, list(days.values()))
 
                 logger.info("Successfully fetched prayer times")
                 return prayer_times
@@ -189,3 +321,12 @@ class MuslimSalatProvider:
         except Exception as e:
             logger.error(f"Error fetching prayer times: {e}", exc_info=True)
             return None
+
+    async def _persist(self, location_key: str, days: list[PrayerTimes]):
+        """Write fetched days to the persistent store, if one is configured."""
+        if not self.store:
+            return
+        try:
+            await self.store.save_cached_prayer_times(location_key, days)
+        except Exception as e:
+            logger.warning(f"Could not persist prayer times for {location_key}: {e}")
@@ -0,0 +1,79 @@
+"""Shared, long-lived prayer time providers."""
+
+import logging
+
+import aiohttp
+
+from athan.config import BotSettings, GuildSettings, PrayerTimes
+from athan.db import Database
+from athan.time_providers import TimeProvider
+from athan.time_providers.astronomical import AstronomicalProvider
+from athan.time_providers.muslimsalat import MuslimSalatProvider
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderRegistry:
+    """
+    Owns the bot's prayer time providers and their HTTP session.
+
+    One registry is created by the bot and shared by the scheduler and slash
+    commands, so every caller hits the same warm caches and reuses pooled
+    keep-alive connections instead of opening a session per request.
+    """
+
+    def __init__(self, settings: BotSettings, store: Database | None = None):
+        self.settings = settings
+        self.session: aiohttp.ClientSession | None = None
+        self.muslimsalat = MuslimSalatProvider(
+            settings.muslimsalat_api_key,
+            cache_size=settings.prayer_cache_size,
+            store=store,
+            session_factory=self.get_session,
+        )
+        self.astronomical = AstronomicalProvider()
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Get or create the shared HTTP session with a tuned connection pool."""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.settings.http_connection_limit,
+                limit_per_host=self.settings.http_connection_limit_per_host,
+                ttl_dns_cache=self.settings.http_dns_cache_ttl,
+                keepalive_timeout=self.settings.http_keepalive_timeout,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=10)
+            )
+        return self.session
+
+    def for_settings(self, settings: GuildSettings) -> TimeProvider:
+        """Pick the provider for a guild; coordinates are computed locally."""
+        location = settings.location
+        if location and location.latitude is not None and location.longitude is not None:
+            return self.astronomical
+        return self.muslimsalat
+
+    async def get_prayer_times(self, settings: GuildSettings, date: str) -> PrayerTimes | None:
+        """Get prayer times for a guild's location, method and date."""
+        if not settings.location:
+            return None
+
+        try:
+            return await self.for_settings(settings).get_prayer_times(
+                settings.location,
+                date,
+                settings.timezone,
+                daylight_saving=settings.location.daylight_saving,
+                calculation_method=settings.calculation_method,
+            )
+        except Exception as e:
+            logger.error(f"Failed to fetch prayer times: {e}")
+            return None
+
+    async def close(self):
+        """Close providers and the shared HTTP session."""
+        await self.muslimsalat.close()
+        await self.astronomical.close()
+        if self.session and not self.session.closed:
+            await self.session.close()
@@ -1,91 +1,555 @@
-"""Voice playback using Lavalink/Wavelink."""
+"""Voice playback using Lavalink/Wavelink, or natively from pre-encoded Opus."""
 
+import asyncio
+import contextlib
 import logging
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import discord
 import wavelink
 
+from athan.audio import AudioAsset, audio_file_key
+from athan.config import VoiceBackend
+from athan.opus import OpusAssetCache, OpusPacketSource
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_ADHAN_FILE = Path("assets/adhan.mp3")
+IDLE_TIMEOUT = 60  # Seconds a voice session stays connected without playing
+MAX_VOICE_SESSIONS = 100  # Concurrent voice connections across all guilds
+NODE_POLL_INTERVAL = 30  # Seconds between Lavalink node stats polls
+CPU_WEIGHT = 50  # Players a fully loaded node CPU is worth when placing new players
+LATENCY_SMOOTHING = 0.2  # Weight of the newest sample in per-node latency averages
+
+
+@dataclass(slots=True)
+class NodeLoad:
+    """Last known load and latency of a Lavalink node."""
+
+    players: int = 0
+    cpu_load: float = 0.0  # Lavalink process load, 0-1
+    rest_latency: float | None = None  # Seconds for a stats request
+    play_latency: float | None = None  # Seconds for a play request (moving average)
+    plays: int = 0
+    failures: int = 0
+
+
+def _smooth(average: float | None, sample: float) -> float:
+    if average is None:
+        return sample
+    return average + LATENCY_SMOOTHING * (sample - average)
+
+
+class NodeMonitor:
+    """
+    Tracks Lavalink node health so players land on the least loaded node.
+
+    Stats are polled from every node in the pool; new players go to the
+    connected node with the lowest score of live players plus weighted CPU
+    load. When a node drops, its players are moved to the best remaining node.
+    """
+
+    def __init__(self, poll_interval: float = NODE_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self.loads: dict[str, NodeLoad] = {}
+        self._task: asyncio.Task | None = None
+
+    def _load(self, node: wavelink.Node) -> NodeLoad:
+        return self.loads.setdefault(node.identifier, NodeLoad())
+
+    def score(self, node: wavelink.Node) -> float:
+        """Lower is better: players on the node plus weighted CPU load."""
+        load = self._load(node)
+        return len(node.players) + CPU_WEIGHT * load.cpu_load
+
+    def best_node(
+        self,
+        exclude: wavelink.Node | None = None,
+        nodes: Iterable[wavelink.Node] | None = None,
+    ) -> wavelink.Node | None:
+        """Connected node with the lowest score, or None if no node is usable."""
+        if nodes is None:
+            nodes = wavelink.Pool.nodes.values()
+        candidates = [
+            node
+            for node in nodes
+            if node.status is wavelink.NodeStatus.CONNECTED and node is not exclude
+        ]
+        if not candidates:
+            return None
+        return min(
+            candidates,
+            key=lambda node: (self.score(node), self._load(node).rest_latency or 0.0),
+        )
+
+    def record_play(self, node: wavelink.Node, seconds: float):
+        """Record how long a play request took on a node."""
+        load = self._load(node)
+        load.plays += 1
+        load.play_latency = _smooth(load.play_latency, seconds)
+
+    def record_failure(self, node: wavelink.Node):
+        """Count a failed request against a node."""
+        self._load(node).failures += 1
+
+    async def poll(self):
+        """Refresh load and REST latency for every node in the pool."""
+        for node in list(wavelink.Pool.nodes.values()):
+            load = self._load(node)
+            started = time.perf_counter()
+            try:
+                stats = await node.fetch_stats()
+            except Exception as e:
+                load.failures += 1
+                logger.warning(f"Could not fetch stats from Lavalink node {node.identifier}: {e}")
+                continue
+            load.rest_latency = _smooth(load.rest_latency, time.perf_counter() - started)
+            load.players = stats.players
+            load.cpu_load = stats.cpu.lavalink_load
+
+    def start(self):
+        """Poll node stats in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll_loop())
+
+    def stop(self):
+        """Stop polling."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _poll_loop(self):
+        while True:
+            with contextlib.suppress(Exception):
+                await self.poll()
+            await asyncio.sleep(self.poll_interval)
+
+    async def fail_over(self, node: wavelink.Node) -> int:
+        """
+        Move every player off a node that went away.
+
+        Returns:
+            Number of players moved
+        """
+        moved = 0
+        for player in list(node.players.values()):
+            target = self.best_node(exclude=node)
+            if target is None:
+                logger.error(f"No Lavalink node left to take players from {node.identifier}")
+                break
+            try:
+                await player.switch_node(target)
+                moved += 1
+            except Exception as e:
+                logger.warning(f"Could not move player to node {target.identifier}: {e}")
+                with contextlib.suppress(Exception):
+                    await player.disconnect()
+        if moved:
+            logger.info(f"Moved {moved} players from Lavalink node {node.identifier}")
+        return moved
+
+    def stats(self) -> dict[str, dict[str, float | int | None]]:
+        """Per-node load, latency and failure counters."""
+        return {
+            identifier: {
+                "players": load.players,
+                "cpu_load": load.cpu_load,
+                "rest_latency": load.rest_latency,
+                "play_latency": load.play_latency,
+                "plays": load.plays,
+                "failures": load.failures,
+            }
+            for identifier, load in self.loads.items()
+        }
+
+
+class TrackCache:
+    """
+    Resolved Lavalink tracks for local audio files.
+
+    Resolving a ``local:`` track is a REST round trip plus a decode probe on
+    the Lavalink node, so each file is resolved once and reused until its
+    modification time changes. Concurrent misses for the same file share one
+    lookup.
+    """
+
+    def __init__(self):
+        self._tracks: dict[Path, tuple[int, wavelink.Playable]] = {}
+        self._locks: dict[Path, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, audio_file: str | Path | AudioAsset) -> wavelink.Playable | None:
+        """
+        Get the playable track for a file, resolving it through Lavalink if needed.
+
+        Returns:
+            The track, or None if the file is missing or Lavalink cannot load it
+        """
+        key = audio_file_key(audio_file)
+        if key is None:
+            return None
+        path, mtime = key
+
+        cached = self._tracks.get(path)
+        if cached and cached[0] == mtime:
+            self.hits += 1
+            return cached[1]
+
+        async with self._locks.setdefault(path, asyncio.Lock()):
+            cached = self._tracks.get(path)
+            if cached and cached[0] == mtime:
+                self.hits += 1
+                return cached[1]
+
+            self.misses += 1
+            result = await wavelink.Playable.search(f"local:{path}")
+            if not result:
+                logger.error(f"Could not load track from {path}")
+                return None
+
+            track = result[0] if isinstance(result, list) else result.tracks[0]
+            self._tracks[path] = (mtime, track)
+            logger.info(f"Resolved Lavalink track for {path}")
+            return track
+
+    async def preload(self, audio_file: str | Path | AudioAsset) -> bool:
+        """Resolve a file ahead of its first playback; returns whether it loaded."""
+        try:
+            return await self.get(audio_file) is not None
+        except Exception as e:
+            logger.warning(f"Could not preload track {audio_file}: {e}")
+            return False
+
+    def clear(self):
+        """Forget every resolved track (e.g. after reconnecting to Lavalink)."""
+        self._tracks.clear()
+
+
+@dataclass(slots=True)
+class VoiceSession:
+    """A guild's voice connection and whether it is in use."""
+
+    client: discord.VoiceClient
+    playing: bool = False
+    last_active: float = field(default_factory=time.monotonic)
+    idle_timer: asyncio.TimerHandle | None = None
+
+
+def _is_connected(client: discord.VoiceClient) -> bool:
+    if isinstance(client, wavelink.Player):
+        return bool(client.connected)
+    return client.is_connected()
+
+
+class VoiceSessionManager:
+    """
+    Owns every voice connection the bot holds, one per guild.
+
+    A session is reused while it stays connected (a pre-connected player, or
+    a second playback shortly after the first), disconnected once it has been
+    idle for ``idle_timeout`` seconds after its last playback, and counted
+    against ``max_sessions``. When the cap is reached the longest idle
+    session is dropped to make room; if every session is playing, new
+    connections are refused.
+    """
+
+    def __init__(self, idle_timeout: float = IDLE_TIMEOUT, max_sessions: int = MAX_VOICE_SESSIONS):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.sessions: dict[int, VoiceSession] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._pending = 0  # Connections in progress, already counted against the cap
+        self.connects = 0
+        self.reuses = 0
+        self.evictions = 0
+
+    async def acquire(
+        self, channel: discord.VoiceChannel | discord.StageChannel, *, native: bool = False
+    ) -> discord.VoiceClient | None:
+        """
+        Get a connected voice client in ``channel``, reusing the guild's session if possible.
+
+        Args:
+            channel: Voice channel to be connected to
+            native: Use a plain discord.py voice client instead of a Lavalink player
+
+        Returns:
+            The client, or None if no Lavalink node or session slot is available
+        """
+        guild_id = channel.guild.id
+        async with self._locks.setdefault(guild_id, asyncio.Lock()):
+            session = self.sessions.get(guild_id)
+            client = session.client if session else channel.guild.voice_client
+
+            # A guild has one voice connection; replace it if stale or of the other backend
+            other_backend = isinstance(client, wavelink.Player) == native
+            if client and (other_backend or not _is_connected(client)):
+                self.forget(guild_id)
+                with contextlib.suppress(Exception):
+                    await client.disconnect(force=True)
+                client = None
+
+            if client:
+                if client.channel.id != channel.id:
+                    logger.info(f"Moving to voice channel {channel.id}")
+                    await client.move_to(channel)
+                self.reuses += 1
+                session = self.sessions.setdefault(guild_id, VoiceSession(client))
+                if not session.playing:
+                    self._mark_idle(guild_id, session)  # Restart the idle countdown
+                return client
+
+            victim = None
+            if len(self.sessions) + self._pending >= self.max_sessions:
+                victim = self._evict()
+                if victim is None:
+                    logger.warning(
+                        f"All {self.max_sessions} voice sessions are playing; "
+                        f"not joining channel {channel.id}"
+                    )
+                    return None
+
+            self._pending += 1
+            try:
+                if victim:
+                    with contextlib.suppress(Exception):
+                        await victim.disconnect()
+                client = await self._connect(channel, native)
+            finally:
+                self._pending -= 1
+            if client is None:
+                return None
+
+            self.connects += 1
+            session = VoiceSession(client)
+            self.sessions[guild_id] = session
+            self._mark_idle(guild_id, session)
+            return client
+
+    async def _connect(
+        self, channel: discord.VoiceChannel | discord.StageChannel, native: bool
+    ) -> discord.VoiceClient | None:
+        if native:
+            logger.info(f"Connecting natively to voice channel {channel.id}")
+            return await channel.connect()
+
+        node = node_monitor.best_node()
+        if node is None:
+            logger.error("No connected Lavalink node available")
+            return None
+
+        # Connect to voice channel on the least loaded node
+        logger.info(f"Connecting to voice channel {channel.id} via {node.identifier}")
+        player = await channel.connect(cls=wavelink.Player(nodes=[node]))
+        player.inactive_timeout = None  # Idle disconnects are handled here
+        return player
+
+    def _evict(self) -> discord.VoiceClient | None:
+        """Drop the longest idle session and return its client, or None if all are playing."""
+        idle = [(s.last_active, gid) for gid, s in self.sessions.items() if not s.playing]
+        if not idle:
+            return None
+        _, guild_id = min(idle)
+        client = self.sessions[guild_id].client
+        self.forget(guild_id)
+        self.evictions += 1
+        logger.info(f"Dropping idle voice session in guild {guild_id} to stay under the cap")
+        return client
+
+    def started(self, guild_id: int):
+        """Mark a session as playing; it is not disconnected until playback finishes."""
+        session = self.sessions.get(guild_id)
+        if session:
+            session.playing = True
+            session.last_active = time.monotonic()
+            if session.idle_timer:
+                session.idle_timer.cancel()
+                session.idle_timer = None
+
+    def finished(self, guild_id: int):
+        """Mark a session as idle after playback; it disconnects after ``idle_timeout``."""
+        session = self.sessions.get(guild_id)
+        if session:
+            self._mark_idle(guild_id, session)
+
+    def _mark_idle(self, guild_id: int, session: VoiceSession):
+        session.playing = False
+        session.last_active = time.monotonic()
+        if session.idle_timer:
+            session.idle_timer.cancel()
+        session.idle_timer = asyncio.get_running_loop().call_later(
+            self.idle_timeout, self._expire, guild_id, session
+        )
+
+    def _expire(self, guild_id: int, session: VoiceSession):
+        if self.sessions.get(guild_id) is session and not session.playing:
+            logger.info(f"Voice session in guild {guild_id} idle for {self.idle_timeout:.0f}s")
+            task = asyncio.create_task(self.release(guild_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def forget(self, guild_id: int):
+        """Stop tracking a session without disconnecting (e.g. it was disconnected elsewhere)."""
+        session = self.sessions.pop(guild_id, None)
+        if session and session.idle_timer:
+            session.idle_timer.cancel()
+
+    async def release(self, guild_id: int) -> bool:
+        """Disconnect a guild's session; returns whether there was one."""
+        session = self.sessions.get(guild_id)
+        if session is None:
+            return False
+        self.forget(guild_id)
+        with contextlib.suppress(Exception):
+            await session.client.disconnect()
+        return True
+
+    async def close(self):
+        """Disconnect every session."""
+        for guild_id in list(self.sessions):
+            await self.release(guild_id)
+
+    def counts(self) -> dict[str, int]:
+        """Sessions currently playing and sessions connected but idle."""
+        active = sum(session.playing for session in self.sessions.values())
+        return {"active": active, "idle": len(self.sessions) - active}
+
+
+track_cache = TrackCache()
+node_monitor = NodeMonitor()
+voice_sessions = VoiceSessionManager()
+opus_cache = OpusAssetCache()
+voice_backend = VoiceBackend.LAVALINK
+
+
+def configure_voice_backend(backend: VoiceBackend, cache_dir: str | Path | None = None):
+    """Select the voice backend (and where native audio is encoded to) for this process."""
+    global voice_backend  # noqa: PLW0603
+    voice_backend = backend
+    if cache_dir is not None:
+        opus_cache.cache_dir = Path(cache_dir)
+
+
+def use_native_voice() -> bool:
+    """Whether the next playback should bypass Lavalink."""
+    if voice_backend is VoiceBackend.AUTO:
+        return node_monitor.best_node() is None
+    return voice_backend is VoiceBackend.NATIVE
+
+
+def _describe(audio_file: str | Path | AudioAsset) -> str:
+    return str(audio_file.path if isinstance(audio_file, AudioAsset) else audio_file)
+
+
+async def preload_audio(assets: Iterable[AudioAsset]) -> int:
+    """
+    Resolve audio ahead of playback for whichever backends may play it.
+
+    Returns:
+        Number of assets ready for at least one backend
+    """
+    ready = 0
+    for asset in assets:
+        loaded = False
+        if voice_backend is not VoiceBackend.NATIVE and node_monitor.best_node():
+            loaded = await track_cache.preload(asset)
+        if voice_backend is not VoiceBackend.LAVALINK:
+            loaded = await opus_cache.get(asset) is not None or loaded
+        ready += loaded
+    return ready
+
+
+async def connect_voice_player(
+    bot: discord.Client, voice_channel_id: int, *, native: bool = False
+) -> discord.VoiceClient | None:
+    """
+    Connect (or move) the guild's voice client to a voice channel.
+
+    Connecting takes a voice handshake of up to a few seconds, so the
+    scheduler calls this ahead of the prayer time and playback then starts
+    on an already connected player. Connections are owned by voice_sessions,
+    which disconnects them once they have been idle for a while.
+
+    Args:
+        bot: Discord bot client
+        voice_channel_id: ID of the voice channel to join
+        native: Connect a plain discord.py voice client instead of a Lavalink player
+
+    Returns:
+        The connected client, or None if the channel is unusable
+    """
+    # Get voice channel (try cache first, then fetch from API)
+    voice_channel = bot.get_channel(voice_channel_id)
+
+    # If not in cache, fetch from Discord API
+    if not voice_channel:
+        try:
+            voice_channel = await bot.fetch_channel(voice_channel_id)
+        except discord.NotFound:
+            logger.error(f"Voice channel {voice_channel_id} not found")
+            return None
+        except Exception as e:
+            logger.error(f"Error fetching voice channel {voice_channel_id}: {e}")
+            return None
+
+    # Verify it's a voice channel
+    if not isinstance(voice_channel, (discord.VoiceChannel, discord.StageChannel)):
+        logger.error(
+            f"Channel {voice_channel_id} is not a voice channel (type: {type(voice_channel)})"
+        )
+        return None
+
+    # Reuses the guild's session (e.g. pre-connected by the scheduler) when there is one
+    return await voice_sessions.acquire(voice_channel, native=native)
+
 
 async def play_adhan_in_voice_channel(
     bot: discord.Client,
     voice_channel_id: int,
-    adhan_file: str | Path = "assets/adhan.mp3",
+    adhan_file: str | Path | AudioAsset = DEFAULT_ADHAN_FILE,
 ) -> bool:
     """
-    Play Adhan audio file in a voice channel using Lavalink.
+    Play Adhan audio file in a voice channel using the configured backend.
 
     Args:
         bot: Discord bot client
         voice_channel_id: ID of the voice channel to play in
-        adhan_file: Path to the adhan audio file
+        adhan_file: Adhan audio, preferably an asset from the audio registry
 
     Returns:
         True if playback started successfully, False otherwise
     """
     try:
-        # Get voice channel (try cache first, then fetch from API)
-        voice_channel = bot.get_channel(voice_channel_id)
-        
-        # If not in cache, fetch from Discord API
-        if not voice_channel:
-            try:
-                voice_channel = await bot.fetch_channel(voice_channel_id)
-            except discord.NotFound:
-                logger.error(f"Voice channel {voice_channel_id} not found")
-                return False
-            except Exception as e:
-                logger.error(f"Error fetching voice channel {voice_channel_id}: {e}")
-                return False
-        
-        # Verify it's a voice channel
-        if not isinstance(voice_channel, (discord.VoiceChannel, discord.StageChannel)):
-            logger.error(f"Channel {voice_channel_id} is not a voice channel (type: {type(voice_channel)})")
-            return False
-        
-        logger.info(f"Found voice channel: {voice_channel.name} (ID: {voice_channel_id})")
+        if use_native_voice():
+            return await _play_native(bot, voice_channel_id, adhan_file)
 
-        # Check if adhan file exists
-        adhan_path = Path(adhan_file)
-        if not adhan_path.exists():
-            logger.error(f"Adhan file not found: {adhan_path}")
+        # Resolve the track before connecting so a missing file never joins voice
+        track = await track_cache.get(adhan_file)
+        if not track:
             return False
 
-        # Get or create player for the guild
-        guild = voice_channel.guild
-        player: wavelink.Player | None = guild.voice_client
-
+        # Reuses a player pre-connected by the scheduler when there is one
+        player = await connect_voice_player(bot, voice_channel_id)
         if not player:
-            # Connect to voice channel
-            logger.info(f"Connecting to voice channel {voice_channel_id}")
-            player: wavelink.Player = await voice_channel.connect(cls=wavelink.Player)
-        elif player.channel.id != voice_channel_id:
-            # Move to different channel if needed
-            logger.info(f"Moving to voice channel {voice_channel_id}")
-            await player.move_to(voice_channel)
-
-        # Load and play the audio file
-        logger.info(f"Playing adhan from {adhan_path}")
-        
-        # Wavelink requires a search query, we'll use the local file path
-        # Convert to absolute path for Lavalink to access
-        abs_path = adhan_path.absolute()
-        
-        # Play the track
-        track = await wavelink.Playable.search(f"local:{abs_path}")
-        if not track:
-            logger.error(f"Could not load track from {abs_path}")
             return False
 
-        await player.play(track[0] if isinstance(track, list) else track)
+        logger.info(f"Playing adhan from {_describe(adhan_file)}")
+        started = time.perf_counter()
+        try:
+            await player.play(track)
+        except wavelink.LavalinkException:
+            node_monitor.record_failure(player.node)
+            raise
+        node_monitor.record_play(player.node, time.perf_counter() - started)
+        voice_sessions.started(player.guild.id)
         logger.info("Adhan playback started successfully")
 
-        # Disconnect after playback finishes
-        # Note: Wavelink will handle auto-disconnect, but we can also do it manually
-        # We'll let it auto-disconnect after track ends
-
+        # The bot marks the session idle when the track ends
         return True
 
     except wavelink.LavalinkException as e:
@@ -99,6 +563,50 @@ async def play_adhan_in_voice_channel(
         return False
 
 
+async def _play_native(
+    bot: discord.Client, voice_channel_id: int, adhan_file: str | Path | AudioAsset
+) -> bool:
+    """Stream pre-encoded Opus packets through discord.py; nothing is transcoded."""
+    packets = await opus_cache.get(adhan_file)
+    if not packets:
+        return False
+    # Hold the packets before awaiting, so a re-encode meanwhile cannot unmap them
+    source = OpusPacketSource(packets)
+
+    client = await connect_voice_player(bot, voice_channel_id, native=True)
+    if not client:
+        source.cleanup()
+        return False
+
+    loop = asyncio.get_running_loop()
+    guild_id = client.guild.id
+
+    def after(error: Exception | None):
+        # Runs on discord.py's audio thread once the packets run out
+        if error:
+            logger.error(f"Native voice playback failed: {error}")
+        loop.call_soon_threadsafe(voice_sessions.finished, guild_id)
+
+    logger.info(f"Playing adhan from {_describe(adhan_file)} natively")
+    try:
+        client.play(source, after=after)
+    except Exception:
+        source.cleanup()  # Playback never started, so discord.py will not release it
+        raise
+    voice_sessions.started(guild_id)
+    return True
+
+
+async def preconnect_voice_channel(bot: discord.Client, voice_channel_id: int) -> bool:
+    """Connect to a voice channel ahead of playback; returns whether it is ready."""
+    try:
+        player = await connect_voice_player(bot, voice_channel_id, native=use_native_voice())
+        return player is not None
+    except Exception as e:
+        logger.warning(f"Could not pre-connect to voice channel {voice_channel_id}: {e}")
+        return False
+
+
 async def stop_adhan_playback(guild_id: int, bot: discord.Client) -> bool:
     """
     Stop adhan playback and disconnect from voice channel.
@@ -116,13 +624,14 @@ async def stop_adhan_playback(guild_id: int, bot: discord.Client) -> bool:
             logger.warning(f"Guild {guild_id} not found")
             return False
 
-        player: wavelink.Player | None = guild.voice_client
-        if not player:
+        player: discord.VoiceClient | None = guild.voice_client
+        if not player and guild_id not in voice_sessions.sessions:
             logger.debug(f"No active player in guild {guild_id}")
             return False
 
         logger.info(f"Stopping adhan playback in guild {guild_id}")
-        await player.disconnect()
+        if not await voice_sessions.release(guild_id):
+            await player.disconnect()  # Connected outside the session manager
         return True
 
     except Exception as e:
@@ -0,0 +1,62 @@
+"""Tests for the audio asset registry."""
+
+import os
+
+from athan.audio import AudioAssetRegistry, audio_file_key
+from athan.config import Prayer
+
+
+def make_registry(tmp_path, *files):
+    for name in files:
+        (tmp_path / name).write_bytes(b"audio")
+    registry = AudioAssetRegistry(tmp_path)
+    registry.scan()
+    return registry
+
+
+def test_scan_indexes_audio_files_only(tmp_path):
+    """Non-audio and empty files are skipped; names are lowercase stems."""
+    (tmp_path / "empty.mp3").write_bytes(b"")
+    registry = make_registry(tmp_path, "adhan.mp3", "Mishary.ogg", "README.md")
+
+    assert sorted(registry.assets) == ["adhan", "mishary"]
+    assert registry.get("MISHARY").path == (tmp_path / "Mishary.ogg").absolute()
+
+
+def test_prayer_variants_and_guild_selection(tmp_path):
+    """A <name>_<prayer> file wins for that prayer; unknown selections fall back."""
+    registry = make_registry(
+        tmp_path, "adhan.mp3", "adhan_fajr.mp3", "mishary.mp3", "mishary_fajr.mp3"
+    )
+
+    assert registry.names() == ["adhan", "mishary"]
+    assert registry.for_prayer(Prayer.FAJR).name == "adhan_fajr"
+    assert registry.for_prayer(Prayer.ISHA).name == "adhan"
+    assert registry.for_prayer(Prayer.FAJR, "mishary").name == "mishary_fajr"
+    assert registry.for_prayer(Prayer.ASR, "mishary").name == "mishary"
+    assert registry.for_prayer(None, "removed").name == "adhan"
+    assert AudioAssetRegistry(tmp_path / "missing").for_prayer(Prayer.ASR) is None
+
+
+def test_audio_file_key_uses_index_until_rescan(tmp_path):
+    """Indexed assets are keyed without a stat(); a rescan picks up a replaced file."""
+    registry = make_registry(tmp_path, "adhan.mp3")
+    asset = registry.get("adhan")
+    stat = asset.path.stat()
+    os.utime(asset.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert audio_file_key(asset) == (asset.path, asset.mtime_ns)
+
+    registry.scan()
+    assert audio_file_key(registry.get("adhan")) == (asset.path, asset.mtime_ns + 1_000_000_000)
+
+    asset.path.unlink()
+    assert audio_file_key(asset) == (asset.path, asset.mtime_ns)
+    assert audio_file_key(tmp_path / "adhan.mp3") is None
+
+
+def test_choice_rejects_unknown_names_and_variants(tmp_path):
+    """Guilds pick base names only; per-prayer variants are chosen automatically."""
+    registry = make_registry(tmp_path, "adhan.mp3", "adhan_fajr.mp3")
+    assert registry.choice("ADHAN").name == "adhan"
+    assert registry.choice("adhan_fajr") is None
+    assert registry.choice("missing") is None
@@ -1,6 +1,7 @@
 """Tests for configuration models."""
 
 from athan.config import (
+    BotSettings,
     GuildSettings,
     Location,
     LocationType,
@@ -60,3 +61,16 @@ def test_prayer_times_get_time():
 
     assert times.get_time(Prayer.FAJR) == "05:30"
     assert times.get_time(Prayer.MAGHRIB) == "17:30"
+
+
+def test_lavalink_uris():
+    """LAVALINK_NODES overrides the single host/port pair."""
+    single = BotSettings(DISCORD_TOKEN="t", MUSLIMSALAT_API_KEY="k", LAVALINK_HOST="lava")
+    assert single.get_lavalink_uris() == ["http://lava:2333"]
+
+    many = BotSettings(
+        DISCORD_TOKEN="t",
+        MUSLIMSALAT_API_KEY="k",
+        LAVALINK_NODES="a:2333, https://b:443 ,",
+    )
+    assert many.get_lavalink_uris() == ["http://a:2333", "https://b:443"]
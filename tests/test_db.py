@@ -1,11 +1,14 @@
 """Tests for database layer."""
 
+import asyncio
+import json
 import os
 import tempfile
 
+import aiosqlite
 import pytest
 
-from athan.config import GuildSettings, Location, LocationType, UserSettings
+from athan.config import GuildSettings, Location, LocationType, Prayer, PrayerTimes, UserSettings
 from athan.db import Database
 
 
@@ -121,3 +124,332 @@ async def test_prayer_sent_tracking(db):
 
     # Should now be marked as sent
     assert await db.is_prayer_sent(guild_id, prayer, date)
+
+
+async def test_claim_prayer_is_exclusive(db):
+    """Only one of several concurrent claims wins, and it is visible as sent."""
+    claims = await asyncio.gather(
+        *(db.claim_prayer(123, "Fajr", "2024-01-01", "05:30") for _ in range(5))
+    )
+
+    assert claims.count(True) == 1
+    assert await db.is_prayer_sent(123, "Fajr", "2024-01-01")
+    assert not await db.is_prayer_sent(123, "Dhuhr", "2024-01-01")
+
+    # A cold process (empty bitset) still sees the claim in SQLite
+    db._sent_prayers.clear()
+    assert not await db.claim_prayer(123, "Fajr", "2024-01-01", "05:30")
+    assert await db.claim_prayer(123, "Dhuhr", "2024-01-01", "12:00")
+
+
+async def test_claim_voice_is_independent_of_text(db):
+    """Voice and text claims on the same prayer do not block each other."""
+    assert await db.claim_voice(123, "Asr", "2024-01-01", "15:00")
+    assert not await db.is_prayer_sent(123, "Asr", "2024-01-01")
+    assert await db.claim_prayer(123, "Asr", "2024-01-01", "15:00")
+    assert not await db.claim_voice(123, "Asr", "2024-01-01", "15:00")
+
+
+async def test_prayer_times_cache_roundtrip_and_prune(db):
+    """Persisted prayer times round-trip and past dates can be pruned."""
+    days = [
+        PrayerTimes(
+            date=f"2025-01-0{d}",
+            fajr="05:00",
+            sunrise="06:30",
+            dhuhr="12:00",
+            asr="15:00",
+            maghrib="17:30",
+            isha="19:00",
+            timezone="Europe/London",
+        )
+        for d in (1, 2, 3)
+    ]
+    await db.save_cached_prayer_times("london_std_5", days)
+
+    retrieved = await db.get_cached_prayer_times("london_std_5", "2025-01-02")
+    assert retrieved == days[1]
+    assert await db.get_cached_prayer_times("london_std_4", "2025-01-02") is None
+
+    assert await db.prune_prayer_times_cache("2025-01-03") == 2
+    assert await db.get_cached_prayer_times("london_std_5", "2025-01-02") is None
+    assert await db.get_cached_prayer_times("london_std_5", "2025-01-03") is not None
+
+
+async def test_guild_settings_cache(db):
+    """Reads after a save are served from memory; only copies for update are isolated."""
+    await db.save_guild_settings(GuildSettings(guild_id=1, subscribed_channel_id=10))
+    misses = db.settings_cache_misses
+
+    first = await db.get_guild_settings(1, for_update=True)
+    first.subscribed_channel_id = 99  # Not saved
+    second = await db.get_guild_settings(1)
+
+    assert second.subscribed_channel_id == 10
+    assert await db.get_guild_settings(1) is second  # Read-only callers share the cache
+    assert db.settings_cache_misses == misses
+    assert db.settings_cache_hits == 3
+
+
+async def test_warm_guild_settings_cache(db):
+    """Warm loading fills the cache so later reads need no queries."""
+    for guild_id in (1, 2, 3):
+        await db.save_guild_settings(GuildSettings(guild_id=guild_id))
+    db._guild_settings_cache.clear()
+
+    assert await db.warm_guild_settings_cache() == 3
+    assert (await db.get_guild_settings(2)).guild_id == 2
+    assert db.settings_cache_stats()["hit_rate"] == 1.0
+
+
+async def test_stream_subscribed_guild_settings(db):
+    """Subscribed guild settings stream in batches from one query."""
+    for guild_id in range(1, 8):
+        channel = guild_id * 10 if guild_id % 2 else None
+        settings = GuildSettings(guild_id=guild_id, subscribed_channel_id=channel)
+        await db.save_guild_settings(settings)
+
+    streamed = [s async for s in db.get_all_subscribed_guild_settings(batch_size=2)]
+
+    assert sorted(s.guild_id for s in streamed) == [1, 3, 5, 7]
+    assert all(s.subscribed_channel_id == s.guild_id * 10 for s in streamed)
+
+
+async def test_wal_journal_mode(db):
+    """Connections default to WAL so reads do not block on writes."""
+    async with db.conn.execute("PRAGMA journal_mode") as cursor:
+        assert (await cursor.fetchone())[0] == "wal"
+
+
+async def test_group_commit():
+    """Writes issued within the commit window share one commit."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+
+    database = Database(db_path, commit_window=0.01)
+    await database.connect()
+    try:
+        guilds = range(20)
+        await asyncio.gather(
+            *(database.record_scheduled_prayer(g, "Fajr", "05:00", "2025-01-01") for g in guilds)
+        )
+        assert database.commits == 1
+
+        await asyncio.gather(*(database.mark_prayer_sent(g, "Fajr", "2025-01-01") for g in guilds))
+        assert database.commits == 2
+    finally:
+        await database.close()
+
+    # Committed data is visible to a fresh connection
+    reopened = Database(db_path)
+    await reopened.connect()
+    try:
+        assert await reopened.is_prayer_sent(3, "Fajr", "2025-01-01")
+    finally:
+        await reopened.close()
+        os.unlink(db_path)
+
+
+async def test_prune_scheduled_prayers_in_chunks(db):
+    """Old sent-prayer records are deleted across several chunks; recent ones stay."""
+    for guild_id in range(25):
+        await db.claim_prayer(guild_id, "Fajr", "2024-01-01", "05:30")
+    await db.claim_prayer(1, "Fajr", "2024-03-01", "05:30")
+
+    assert await db.prune_scheduled_prayers("2024-02-01", chunk_size=10) == 25
+    assert (await db.table_stats())["scheduled_prayers_rows"] == 1
+
+
+async def test_run_maintenance_reports_stats(db):
+    """Maintenance prunes by retention horizon and reports table size and timing."""
+    await db.claim_prayer(1, "Fajr", "2000-01-01", "05:30")
+    old_times = PrayerTimes(
+        date="2000-01-01",
+        fajr="05:00",
+        sunrise="06:30",
+        dhuhr="12:00",
+        asr="15:00",
+        maghrib="17:30",
+        isha="19:00",
+        timezone="UTC",
+    )
+    await db.save_cached_prayer_times("london_std_5", [old_times])
+
+    report = await db.run_maintenance(retention_days=30)
+
+    assert report["pruned"] == 1
+    assert await db.get_cached_prayer_times("london_std_5", "2000-01-01") is None
+    assert report["scheduled_prayers_rows"] == 0
+    assert report["size_bytes"] > 0
+    assert report["prune_seconds"] >= 0
+
+
+async def test_reclaim_free_pages_empties_freelist(db):
+    """Reclaiming frees every free page, not just the first one."""
+    for guild_id in range(2000):
+        await db.claim_prayer(guild_id, "Fajr", "2000-01-01", "05:30")
+    await db.prune_scheduled_prayers("2000-02-01")
+    free = (await db.table_stats())["freelist_count"]
+    assert free > 1
+
+    assert await db.reclaim_free_pages() == free
+    assert (await db.table_stats())["freelist_count"] == 0
+
+
+async def test_connect_enables_incremental_vacuum_on_existing_file():
+    """A database created without auto-vacuum is converted once on connect."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+    async with aiosqlite.connect(db_path) as conn:
+        await conn.execute("PRAGMA auto_vacuum=NONE")
+        await conn.execute("CREATE TABLE legacy (id INTEGER PRIMARY KEY)")
+        await conn.commit()
+
+    database = Database(db_path)
+    await database.connect()
+    try:
+        async with database.conn.execute("PRAGMA auto_vacuum") as cursor:
+            assert (await cursor.fetchone())[0] == 2  # INCREMENTAL
+    finally:
+        await database.close()
+        os.unlink(db_path)
+
+
+async def test_guild_settings_roundtrip_from_columns(db):
+    """Settings read back from native columns (not the cache) match what was saved."""
+    settings = GuildSettings(
+        guild_id=7,
+        location=Location(location_type=LocationType.CITY, city="London", country="UK"),
+        calculation_method="5",
+        timezone="Europe/London",
+        subscribed_channel_id=70,
+        adhan_audio="mishary",
+        enabled_prayers=[Prayer.MAGHRIB, Prayer.FAJR],
+        prayer_offsets={"Fajr": 5, "Isha": 0},
+    )
+    await db.save_guild_settings(settings)
+    db._guild_settings_cache.clear()
+
+    retrieved = await db.get_guild_settings(7)
+
+    assert retrieved.location == settings.location
+    assert retrieved.enabled_prayers == [Prayer.FAJR, Prayer.MAGHRIB]
+    assert retrieved.prayer_offsets == {"Fajr": 5, "Isha": 0}
+    assert retrieved.adhan_audio == "mishary"
+
+
+async def test_stream_groups_guilds_by_location_through_index(db):
+    """The startup stream returns guilds grouped by normalized location, read via the index."""
+    places = ((1, "London", "5"), (2, "Paris", "5"), (3, " london ", "5"), (4, "London", "2"))
+    for guild_id, city, method in places:
+        location = Location(location_type=LocationType.CITY, city=city, country="UK")
+        await db.save_guild_settings(
+            GuildSettings(
+                guild_id=guild_id,
+                location=location,
+                calculation_method=method,
+                subscribed_channel_id=guild_id * 10,
+            )
+        )
+
+    streamed = [s.guild_id async for s in db.get_all_subscribed_guild_settings()]
+    # London (method 2), then both spellings of London (method 5) together, then Paris
+    assert streamed[0] == 4
+    assert set(streamed[1:3]) == {1, 3}
+    assert streamed[3] == 2
+
+    async with db.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT guild_id FROM guild_settings "
+        "WHERE subscribed_channel_id IS NOT NULL "
+        "ORDER BY city_norm, country_norm, calculation_method, daylight_saving"
+    ) as cursor:
+        plan = " ".join(row[-1] for row in await cursor.fetchall())
+    assert "idx_guild_settings_location" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+async def test_migrate_json_guild_settings():
+    """Legacy JSON guild settings are converted to native columns on connect."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+
+    legacy = await aiosqlite.connect(db_path)
+    await legacy.execute(
+        """
+        CREATE TABLE guild_settings (
+            guild_id INTEGER PRIMARY KEY,
+            location_json TEXT,
+            calculation_method TEXT DEFAULT '2',
+            timezone TEXT DEFAULT 'UTC',
+            subscribed_channel_id INTEGER,
+            voice_channel_id INTEGER,
+            enabled_prayers TEXT,
+            prayer_offsets TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    await legacy.execute(
+        "INSERT INTO guild_settings VALUES (?, ?, '5', 'Asia/Qatar', 10, NULL, ?, ?, NULL)",
+        (
+            1,
+            json.dumps({"location_type": "city", "city": "Doha", "country": "Qatar"}),
+            json.dumps(["Fajr", "Isha"]),
+            json.dumps({"Isha": -3}),
+        ),
+    )
+    await legacy.commit()
+    await legacy.close()
+
+    database = Database(db_path)
+    await database.connect()
+    try:
+        settings = await database.get_guild_settings(1)
+        assert settings.location.city == "Doha"
+        assert settings.enabled_prayers == [Prayer.FAJR, Prayer.ISHA]
+        assert settings.prayer_offsets == {"Isha": -3}
+        assert settings.adhan_audio is None
+        async with database.conn.execute(
+            "SELECT city_norm, country_norm FROM guild_settings WHERE guild_id = 1"
+        ) as cursor:
+            assert await cursor.fetchone() == ("doha", "qatar")
+    finally:
+        await database.close()
+        os.unlink(db_path)
+
+
+async def test_schema_version_recorded_once(db):
+    """A fresh database records every migration, and reconnecting applies none."""
+    async with db.conn.execute("SELECT version FROM schema_version ORDER BY version") as cursor:
+        versions = [row[0] for row in await cursor.fetchall()]
+    assert versions == [version for version, _, _ in db._migrations()]
+
+    await db.close()
+    await db.connect()
+    async with db.conn.execute("SELECT COUNT(*) FROM schema_version") as cursor:
+        assert (await cursor.fetchone())[0] == len(versions)
+
+
+async def test_failed_migration_rolls_back(db, monkeypatch):
+    """A failing step leaves the schema and version untouched."""
+    migrations = db._migrations()
+
+    async def add_table():
+        await db.conn.execute("CREATE TABLE half_done (id INTEGER)")
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    latest = migrations[-1][0]
+    monkeypatch.setattr(
+        db,
+        "_migrations",
+        lambda: [*migrations, (latest + 1, "add", add_table), (latest + 2, "fail", fail)],
+    )
+
+    with pytest.raises(RuntimeError):
+        await db._init_schema()
+
+    async with db.conn.execute("SELECT MAX(version) FROM schema_version") as cursor:
+        assert (await cursor.fetchone())[0] == latest
+    assert await db._table_columns("half_done") == set()
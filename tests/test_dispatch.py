@@ -0,0 +1,79 @@
+"""Tests for the notification dispatcher."""
+
+import asyncio
+import time
+
+from athan.dispatch import NotificationDispatcher, TokenBucket
+
+
+async def test_token_bucket_limits_rate():
+    """After the burst is spent, tokens arrive at the configured rate."""
+    bucket = TokenBucket(rate=100.0, capacity=2)
+    start = time.monotonic()
+    for _ in range(6):
+        await bucket.acquire()
+
+    # 2 immediate tokens, then 4 more at 100/s
+    assert time.monotonic() - start >= 0.035
+
+
+async def test_dispatcher_bounds_concurrency():
+    """No more jobs run at once than there are workers, and all of them finish."""
+    dispatcher = NotificationDispatcher(workers=3)
+    dispatcher.start()
+    running = 0
+    peak = 0
+
+    async def job():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    for _ in range(10):
+        dispatcher.submit(job)
+    await dispatcher.join()
+    await dispatcher.stop()
+
+    assert peak == 3
+    assert dispatcher.completed == 10
+
+
+async def test_dispatcher_survives_failing_jobs_and_reports_lateness():
+    """A failing job is counted and lateness percentiles come from recorded deliveries."""
+    dispatcher = NotificationDispatcher(workers=2)
+    assert dispatcher.lateness_summary() == "no deliveries yet"
+    dispatcher.start()
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    async def deliver(delay: float):
+        dispatcher.record_delivery(time.time() - delay)
+
+    dispatcher.submit(fail)
+    for delay in (1.0, 2.0, 3.0):
+        dispatcher.submit(lambda delay=delay: deliver(delay))
+    await dispatcher.join()
+    await dispatcher.stop()
+
+    stats = dispatcher.lateness_stats()
+    assert dispatcher.failed == 1
+    assert stats["count"] == 3
+    assert 1.9 < stats["p50"] < 2.5
+    assert 2.9 < stats["max"] < 3.5
+    assert dispatcher.lateness_summary().endswith("over 3 deliveries")
+
+
+async def test_idle_channel_buckets_are_swept(monkeypatch):
+    """Buckets that have refilled are dropped once enough channels accumulate."""
+    monkeypatch.setattr("athan.dispatch.BUCKET_SWEEP_SIZE", 4)
+    dispatcher = NotificationDispatcher(global_rate=1000.0, channel_rate=1000.0, channel_burst=1)
+    for channel_id in range(4):
+        await dispatcher.rate_limit(channel_id)
+    assert len(dispatcher._channel_buckets) == 4
+
+    await asyncio.sleep(0.01)  # Every bucket refills
+    await dispatcher.rate_limit(99)
+    assert list(dispatcher._channel_buckets) == [99]
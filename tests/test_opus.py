@@ -0,0 +1,108 @@
+"""Tests for pre-encoded Opus playback."""
+
+import struct
+
+import pytest
+
+from athan.opus import OpusAssetCache, OpusPackets, OpusPacketSource
+
+
+def ogg_page(segments: list[bytes], *, continued: bool = False) -> bytes:
+    """Build an Ogg page from raw segment chunks (CRC is not checked by the reader)."""
+    lacing = bytes(len(segment) for segment in segments)
+    header = struct.pack("<4sBBqIIIB", b"OggS", 0, int(continued), 0, 1, 0, 0, len(lacing))
+    return header + lacing + b"".join(segments)
+
+
+def lace(packet: bytes) -> list[bytes]:
+    """Split a packet into lacing segments; a multiple of 255 gets an empty terminator."""
+    chunks = [packet[i : i + 255] for i in range(0, len(packet), 255)]
+    if not chunks or len(chunks[-1]) == 255:
+        chunks.append(b"")
+    return chunks
+
+
+def write_ogg(path, packets: list[bytes], split_last: bool = False):
+    """Headers on their own pages, then audio packets (optionally one spanning two pages)."""
+    pages = [ogg_page(lace(b"OpusHead" + bytes(11))), ogg_page(lace(b"OpusTags" + bytes(8)))]
+    body = [segment for packet in packets[:-1] for segment in lace(packet)]
+    last = lace(packets[-1])
+    if split_last:
+        pages.append(ogg_page(body + last[:1]))
+        pages.append(ogg_page(last[1:], continued=True))
+    else:
+        pages.append(ogg_page(body + last))
+    path.write_bytes(b"".join(pages))
+
+
+def test_packets_skip_headers_and_reassemble(tmp_path):
+    """Packets are returned in order, including ones laced over several segments or pages."""
+    packets = [b"\x01" * 60, b"\x02" * 255, b"\x03" * 700, b"\x04" * 300]
+    path = tmp_path / "adhan.opus"
+    write_ogg(path, packets, split_last=True)
+
+    opus = OpusPackets(path)
+    assert len(opus) == 4
+    assert [opus[i] for i in range(4)] == packets
+    assert opus.duration == pytest.approx(0.08)
+    opus.close()
+
+
+def test_packets_reject_non_ogg(tmp_path):
+    path = tmp_path / "adhan.opus"
+    path.write_bytes(b"ID3" + bytes(64))
+    with pytest.raises(ValueError, match="Invalid Ogg page"):
+        OpusPackets(path)
+
+
+@pytest.mark.parametrize("cut", [60, 5])  # Inside the last page header, inside its body
+def test_packets_reject_truncated_page(tmp_path, cut):
+    path = tmp_path / "adhan.opus"
+    write_ogg(path, [b"x" * 40])
+    path.write_bytes(path.read_bytes()[:-cut])
+    with pytest.raises(ValueError, match="Truncated Ogg page"):
+        OpusPackets(path)
+
+
+def test_packet_source_streams_opus_then_ends(tmp_path):
+    """The source hands packets over untouched and signals the end with b''."""
+    path = tmp_path / "adhan.opus"
+    write_ogg(path, [b"a", b"bb"])
+    source = OpusPacketSource(OpusPackets(path))
+
+    assert source.is_opus()
+    assert [source.read(), source.read(), source.read()] == [b"a", b"bb", b""]
+
+
+async def test_asset_cache_reuses_existing_encoding(tmp_path, monkeypatch):
+    """An encoding newer than its source is loaded without running ffmpeg."""
+    source = tmp_path / "adhan.mp3"
+    source.write_bytes(b"mp3")
+    cache = OpusAssetCache(tmp_path / "audio")
+    cache.cache_dir.mkdir()
+    write_ogg(cache.encoded_path(source), [b"x" * 10])
+
+    async def no_ffmpeg(*args, **kwargs):
+        raise AssertionError("ffmpeg should not run")
+
+    monkeypatch.setattr("athan.opus.encode_opus", no_ffmpeg)
+    packets = await cache.get(source)
+    assert packets is not None and len(packets) == 1
+    assert await cache.get(source) is packets
+
+
+def test_retired_packets_stay_mapped_until_last_stream_ends(tmp_path):
+    """Replacing an encoding does not unmap it under streams that are still playing."""
+    path = tmp_path / "adhan.opus"
+    write_ogg(path, [b"a", b"bb"])
+    packets = OpusPackets(path)
+    first, second = OpusPacketSource(packets), OpusPacketSource(packets)
+
+    packets.retire()
+    first.cleanup()
+    assert second.read() == b"a"  # Still mapped for the remaining stream
+
+    second.cleanup()
+    assert packets._map.closed
+    with pytest.raises(ValueError, match="already unmapped"):
+        OpusPacketSource(packets)
@@ -0,0 +1,54 @@
+"""Tests for precomputed daily prayer schedules."""
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from athan.config import GuildSettings, Prayer, PrayerTimes
+from athan.schedule import DailySchedule, base_timestamps
+
+TIMES = PrayerTimes(
+    date="2026-03-29",  # Europe/London switches to BST at 01:00 UTC
+    fajr="04:50",
+    sunrise="06:40",
+    dhuhr="13:10",
+    asr="16:45",
+    maghrib="19:35",
+    isha="21:05",
+    timezone="Europe/London",
+)
+
+
+def test_timestamps_are_timezone_aware():
+    """Times are interpreted in the provider's timezone, across DST changes."""
+    base = base_timestamps(TIMES)
+    tz = ZoneInfo("Europe/London")
+
+    assert base[0] == datetime(2026, 3, 29, 4, 50, tzinfo=tz).timestamp()
+    assert base[5] - base[0] == (21 * 60 + 5 - (4 * 60 + 50)) * 60
+
+
+def test_build_applies_offsets_and_enabled_prayers():
+    """Offsets are baked in; disabled prayers and Sunrise are not announced."""
+    settings = GuildSettings(
+        guild_id=1,
+        enabled_prayers=[Prayer.FAJR, Prayer.MAGHRIB],
+        prayer_offsets={"Fajr": 10, "Maghrib": -5},
+    )
+    schedule = DailySchedule.build(TIMES, settings)
+
+    assert schedule.at(Prayer.FAJR).strftime("%H:%M") == "05:00"
+    assert schedule.at(Prayer.MAGHRIB).strftime("%H:%M") == "19:30"
+    assert schedule.at(Prayer.SUNRISE).strftime("%H:%M") == "06:40"
+    assert [prayer for prayer, _ in schedule.prayers()] == [Prayer.FAJR, Prayer.MAGHRIB]
+
+    noon = schedule.timestamp(Prayer.DHUHR)
+    assert schedule.next_prayer(noon)[0] == Prayer.MAGHRIB
+    assert schedule.next_prayer(schedule.timestamp(Prayer.MAGHRIB)) is None
+
+
+def test_missing_time_is_skipped():
+    """A time the provider left empty is absent rather than an error."""
+    schedule = DailySchedule.build(TIMES.model_copy(update={"asr": ""}), GuildSettings(guild_id=1))
+
+    assert schedule.timestamp(Prayer.ASR) is None
+    assert Prayer.ASR not in [prayer for prayer, _ in schedule.prayers()]
@@ -0,0 +1,355 @@
+"""Tests for the deadline-driven prayer scheduler."""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from freezegun import freeze_time
+
+from athan.config import GuildSettings, Location, LocationType, Prayer, PrayerTimes
+from athan.deadlines import DeadlineQueue
+from athan.scheduler import GRACE_PERIOD, PrayerEvent, PrayerScheduler, VoiceWarmup
+
+# Prayer times relative to "now" must not wrap past midnight
+MIDDAY = "2025-06-01 12:00:00"
+
+
+class FakeDatabase:
+    """Minimal in-memory stand-in for Database."""
+
+    def __init__(self, *settings: GuildSettings):
+        self.settings = {s.guild_id: s for s in settings}
+
+    async def get_guild_settings(self, guild_id: int) -> GuildSettings | None:
+        return self.settings.get(guild_id)
+
+    async def claim_prayer(self, guild_id, prayer, date, scheduled_time) -> bool:
+        return True
+
+    async def claim_voice(self, guild_id, prayer, date, scheduled_time) -> bool:
+        return True
+
+    async def get_all_subscribed_guild_settings(self):
+        for settings in self.settings.values():
+            if settings.subscribed_channel_id:
+                yield settings
+
+
+class FakeBotSettings:
+    muslimsalat_api_key = "test"
+
+
+def test_deadline_queue_orders_events():
+    """Events come out in deadline order."""
+    queue = DeadlineQueue()
+    queue.push(30.0, 1, "c")
+    queue.push(10.0, 2, "a")
+    queue.push(20.0, 3, "b")
+
+    assert queue.next_deadline() == 10.0
+    due = queue.pop_due(25.0)
+    assert [e.payload for e in due] == ["a", "b"]
+    assert queue.next_deadline() == 30.0
+
+
+def test_deadline_queue_discard_invalidates_key():
+    """Discarding a key drops its queued events but keeps later pushes."""
+    queue = DeadlineQueue()
+    queue.push(10.0, 1, "old")
+    queue.push(15.0, 2, "other")
+    queue.discard(1)
+    queue.push(20.0, 1, "new")
+
+    assert queue.next_deadline() == 15.0
+    assert [e.payload for e in queue.pop_due(100.0)] == ["other", "new"]
+    assert queue.next_deadline() is None
+
+
+@freeze_time(MIDDAY)
+async def test_plan_guild_queues_remaining_prayers_and_rollover():
+    """Planning queues upcoming prayers, skips stale ones, and adds a midnight replan."""
+    tz = ZoneInfo("UTC")
+    now = datetime.now(tz)
+    today = now.strftime("%Y-%m-%d")
+
+    def hhmm(delta: timedelta) -> str:
+        return (now + delta).strftime("%H:%M")
+
+    settings = GuildSettings(
+        guild_id=1,
+        location=Location(location_type=LocationType.CITY, city="London", country="UK"),
+        timezone="UTC",
+        subscribed_channel_id=10,
+    )
+    times = PrayerTimes(
+        date=today,
+        fajr=hhmm(-timedelta(seconds=GRACE_PERIOD + 600)),
+        sunrise=hhmm(timedelta(0)),
+        dhuhr=hhmm(-timedelta(minutes=5)),
+        asr=hhmm(timedelta(minutes=1)),
+        maghrib=hhmm(timedelta(minutes=2)),
+        isha=hhmm(timedelta(minutes=3)),
+        timezone="UTC",
+    )
+
+    scheduler = PrayerScheduler(None, FakeDatabase(settings), FakeBotSettings(), providers=None)
+
+    async def fake_get_prayer_times(_settings, _date):
+        return times
+
+    scheduler.get_prayer_times = fake_get_prayer_times
+    await scheduler.schedule_guild(1)
+
+    events = scheduler.queue.pop_due(time.time() + 86400 * 2)
+    prayers = [e.payload.prayer for e in events if isinstance(e.payload, PrayerEvent)]
+    assert prayers == [Prayer.DHUHR, Prayer.ASR, Prayer.MAGHRIB, Prayer.ISHA]
+    assert events[-1].payload is None  # Midnight rollover
+
+
+async def test_location_group_fetches_once_and_fans_out():
+    """Guilds sharing a location fetch once; equal offsets share one event."""
+    london = Location(location_type=LocationType.CITY, city="London", country="UK")
+    guilds = [
+        GuildSettings(guild_id=1, location=london, subscribed_channel_id=10),
+        GuildSettings(guild_id=2, location=london, subscribed_channel_id=20),
+        GuildSettings(
+            guild_id=3,
+            location=london.model_copy(update={"city": "LONDON"}),
+            subscribed_channel_id=30,
+            prayer_offsets={"Isha": 5},
+        ),
+    ]
+    scheduler = PrayerScheduler(None, FakeDatabase(*guilds), FakeBotSettings(), providers=None)
+
+    fetches = []
+
+    async def fake_get_prayer_times(_settings, date):
+        fetches.append(date)
+        return PrayerTimes(
+            date=date,
+            fajr="23:50",
+            sunrise="23:51",
+            dhuhr="23:52",
+            asr="23:53",
+            maghrib="23:54",
+            isha="23:55",
+            timezone="UTC",
+        )
+
+    scheduler.get_prayer_times = fake_get_prayer_times
+    for guild in guilds:
+        scheduler._join_group(guild)
+    assert len(scheduler.groups) == 1
+
+    (key,) = scheduler.groups
+    await scheduler._plan_group(key)
+
+    assert len(fetches) == 1
+    events = [
+        e.payload
+        for e in scheduler.queue.pop_due(time.time() + 86400 * 2)
+        if e.payload is not None
+    ]
+    isha = sorted((e.prayer_time, e.guild_ids) for e in events if e.prayer == Prayer.ISHA)
+    assert [guild_ids for _, guild_ids in isha] == [(1, 2), (3,)]
+    assert [e.guild_ids for e in events if e.prayer == Prayer.FAJR] == [(1, 2, 3)]
+
+
+async def test_slow_replan_does_not_block_due_events():
+    """A replan waiting on its provider runs aside while later due events are dispatched."""
+    scheduler = PrayerScheduler(None, FakeDatabase(), FakeBotSettings(), providers=None)
+    release_plan = asyncio.Event()
+    fanned_out = asyncio.Event()
+
+    async def slow_plan(key):
+        await release_plan.wait()
+
+    async def fake_fan_out(key, event):
+        fanned_out.set()
+
+    scheduler._plan_group = slow_plan
+    scheduler._fan_out = fake_fan_out
+    now = datetime.now(ZoneInfo("UTC"))
+    scheduler.queue.push(time.time() - 2, "slow")  # Midnight replan
+    scheduler.queue.push(time.time() - 1, "other", PrayerEvent(Prayer.ASR, "", now))
+
+    scheduler._running = True
+    task = asyncio.create_task(scheduler._run())
+    try:
+        await asyncio.wait_for(fanned_out.wait(), timeout=1)
+        assert "slow" in scheduler._replans
+        release_plan.set()
+        await asyncio.sleep(0.01)
+        assert not scheduler._replans
+    finally:
+        await scheduler.stop()
+        task.cancel()
+
+
+async def test_start_plans_groups_without_blocking_the_loop():
+    """A group stuck on its provider at startup does not hold back other groups' prayers."""
+    guilds = [
+        GuildSettings(
+            guild_id=1,
+            location=Location(location_type=LocationType.CITY, city="Slow", country="UK"),
+            subscribed_channel_id=10,
+        ),
+        GuildSettings(
+            guild_id=2,
+            location=Location(location_type=LocationType.CITY, city="Cached", country="UK"),
+            subscribed_channel_id=20,
+        ),
+    ]
+    scheduler = PrayerScheduler(None, FakeDatabase(*guilds), FakeBotSettings(), providers=None)
+    release_plan = asyncio.Event()
+    fanned_out = asyncio.Event()
+
+    async def plan(key):
+        if scheduler.groups[key] == {1}:
+            await release_plan.wait()
+        else:
+            now = datetime.now(ZoneInfo("UTC"))
+            scheduler.queue.push(time.time() - 1, key, PrayerEvent(Prayer.ASR, "", now, (2,)))
+            scheduler._wakeup.set()
+
+    async def fake_fan_out(key, event):
+        fanned_out.set()
+
+    scheduler._plan_group = plan
+    scheduler._fan_out = fake_fan_out
+    try:
+        await asyncio.wait_for(scheduler.start(), timeout=1)
+        await asyncio.wait_for(fanned_out.wait(), timeout=1)
+        assert scheduler.guild_groups[1] in scheduler._replans  # Still fetching
+    finally:
+        release_plan.set()
+        await scheduler.stop()
+
+
+async def test_voice_playback_does_not_wait_for_text():
+    """The fan-out starts voice playback right away, ahead of queued pre-connects and text."""
+    london = Location(location_type=LocationType.CITY, city="London", country="UK")
+    settings = GuildSettings(
+        guild_id=1, location=london, subscribed_channel_id=10, voice_channel_id=20
+    )
+    release_text = asyncio.Event()
+    sent = []
+
+    class FakeChannel:
+        id = 10
+
+        async def send(self, content=None, embed=None):
+            await release_text.wait()
+            sent.append(embed.title)
+
+    class FakeBot:
+        def get_channel(self, channel_id):
+            return FakeChannel()
+
+    scheduler = PrayerScheduler(FakeBot(), FakeDatabase(settings), FakeBotSettings(), None)
+    key = scheduler._join_group(settings)
+    played = []
+    voice_started = asyncio.Event()
+
+    async def fake_voice(voice_channel_id, prayer, prayer_time=None, audio=None):
+        played.append((voice_channel_id, prayer))
+        voice_started.set()
+
+    async def preconnect():
+        played.append("preconnect")
+
+    scheduler._play_voice_adhan = fake_voice
+    now = datetime.now(ZoneInfo("UTC"))
+    event = PrayerEvent(Prayer.ASR, now.strftime("%Y-%m-%d"), now, (1,), (1,))
+
+    # Fill the queue before workers start so ordering is decided by priority alone
+    for _ in range(scheduler.voice_dispatcher.workers + 2):
+        scheduler.voice_dispatcher.submit(preconnect)
+    await scheduler._fan_out(key, event)
+    scheduler.dispatcher.start()
+    scheduler.voice_dispatcher.start()
+    try:
+        await asyncio.wait_for(voice_started.wait(), timeout=1)
+        assert played[0] == (20, Prayer.ASR)
+        assert sent == []  # Text is still being delivered
+
+        release_text.set()
+        await scheduler.dispatcher.join()
+        await scheduler.voice_dispatcher.join()
+        assert sent == ["🕌 Asr Prayer Time"]
+    finally:
+        await scheduler.dispatcher.stop()
+        await scheduler.voice_dispatcher.stop()
+
+
+@freeze_time(MIDDAY)
+async def test_voice_warmup_queued_before_prayer():
+    """Guilds with voice get a warm-up event ``voice_preconnect`` seconds before the prayer."""
+    now = datetime.now(ZoneInfo("UTC"))
+
+    london = Location(location_type=LocationType.CITY, city="London", country="UK")
+    guilds = [
+        GuildSettings(guild_id=1, location=london, subscribed_channel_id=10, voice_channel_id=11),
+        GuildSettings(guild_id=2, location=london, subscribed_channel_id=20),
+    ]
+    scheduler = PrayerScheduler(
+        None, FakeDatabase(*guilds), FakeBotSettings(), None, voice_preconnect=60
+    )
+    asr = (now + timedelta(minutes=5)).strftime("%H:%M")
+
+    async def fake_get_prayer_times(_settings, date):
+        return PrayerTimes(
+            date=date,
+            fajr="00:00",
+            sunrise="00:00",
+            dhuhr="00:00",
+            asr=asr,
+            maghrib="00:00",
+            isha="00:00",
+            timezone="UTC",
+        )
+
+    scheduler.get_prayer_times = fake_get_prayer_times
+    for guild in guilds:
+        scheduler._join_group(guild)
+    await scheduler._plan_group(next(iter(scheduler.groups)))
+
+    events = scheduler.queue.pop_due(time.time() + 86400 * 2)
+    warmups = [e for e in events if isinstance(e.payload, VoiceWarmup)]
+    assert len(warmups) == 1
+    assert warmups[0].payload.event.prayer == Prayer.ASR
+    assert warmups[0].fire_at == warmups[0].payload.event.prayer_time.timestamp() - 60
+
+
+async def test_schedule_is_computed_once_per_day():
+    """/next_prayer and /today reuse today's schedule until the guild's settings change."""
+    settings = GuildSettings(
+        guild_id=1,
+        location=Location(location_type=LocationType.CITY, city="London", country="UK"),
+        timezone="UTC",
+    )
+    scheduler = PrayerScheduler(None, FakeDatabase(settings), FakeBotSettings(), providers=None)
+    fetches = []
+
+    async def fake_get_prayer_times(_settings, date):
+        fetches.append(date)
+        return PrayerTimes(
+            date=date,
+            fajr="00:00",
+            sunrise="00:00",
+            dhuhr="00:00",
+            asr="00:00",
+            maghrib="00:00",
+            isha="23:59",
+            timezone="UTC",
+        )
+
+    scheduler.get_prayer_times = fake_get_prayer_times
+    first = await scheduler.get_schedule(settings)
+    assert await scheduler.get_schedule(settings) is first
+    assert len(fetches) == 1
+
+    await scheduler.reschedule_guild(1)
+    assert await scheduler.get_schedule(settings) is not first
+    assert len(fetches) == 2
@@ -1,9 +1,22 @@
 """Tests for prayer time providers."""
 
+import asyncio
+import math
+from datetime import UTC, date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
 import pytest
 
-from athan.config import Location, LocationType
+from athan.config import BotSettings, GuildSettings, Location, LocationType, PrayerTimes
+from athan.db import Database
+from athan.time_providers.astronomical import (
+    METHOD_PARAMS,
+    AstronomicalProvider,
+    get_method_params,
+)
+from athan.time_providers.cache import PrayerTimesCache, end_of_local_day
 from athan.time_providers.muslimsalat import MuslimSalatProvider
+from athan.time_providers.registry import ProviderRegistry
 
 
 class TestMuslimSalatProvider:
@@ -12,19 +25,18 @@ class TestMuslimSalatProvider:
     @pytest.fixture
     def provider(self):
         """Create provider instance."""
-        return MuslimSalatProvider()
+        return MuslimSalatProvider("test-key")
 
     def test_build_cache_key(self, provider):
         """Test cache key generation."""
-        # Qatar location
-        location = Location(location_type=LocationType.QATAR)
+        location = Location(location_type=LocationType.CITY, city="New York", country="USA")
         key = provider._build_cache_key(location, "2025-10-31")
-        assert key == "qatar_2025-10-31"
+        assert key == "new-york_std_auto_2025-10-31"
 
-        # City location
-        location = Location(location_type=LocationType.CITY, city="London", country="UK")
-        key = provider._build_cache_key(location, "2025-10-31")
-        assert key == "London_UK_2025-10-31"
+        # Method and daylight saving change the URL, so they must change the key
+        key = provider._build_cache_key(location, "2025-10-31", True, "5")
+        assert key == "new-york_dst_5_2025-10-31"
+        assert key != provider._build_cache_key(location, "2025-10-31", True, "4")
 
     def test_build_url_qatar(self, provider):
         """Test URL building for Qatar."""
@@ -49,3 +61,377 @@ class TestMuslimSalatProvider:
         """Test provider cleanup."""
         await provider.close()
         assert provider.session is None or provider.session.closed
+
+
+
+class TestPrayerTimesCache:
+    """Test the bounded prayer times cache."""
+
+    @staticmethod
+    def times(date: str = "2025-01-06") -> PrayerTimes:
+        return PrayerTimes(
+            date=date,
+            fajr="05:00",
+            sunrise="06:30",
+            dhuhr="12:00",
+            asr="15:00",
+            maghrib="17:30",
+            isha="19:00",
+            timezone="Europe/London",
+        )
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted once the bound is reached."""
+        cache = PrayerTimesCache(maxsize=2)
+        cache.set("a", self.times(), expires_at=float("inf"))
+        cache.set("b", self.times(), expires_at=float("inf"))
+        assert cache.get("a") is not None  # "b" is now least recently used
+        cache.set("c", self.times(), expires_at=float("inf"))
+
+        assert "b" not in cache
+        assert "a" in cache
+        assert "c" in cache
+        assert cache.stats()["evictions"] == 1
+
+    def test_expires_at_end_of_local_day(self):
+        """Entries expire at the midnight that ends their date in their timezone."""
+        cache = PrayerTimesCache()
+        cache.set("k", self.times("2025-01-06"))
+        midnight = end_of_local_day("2025-01-06", "Europe/London")
+
+        assert midnight == datetime(2025, 1, 7, tzinfo=ZoneInfo("Europe/London")).timestamp()
+        assert cache.get("k", now=midnight - 1) is not None
+        assert cache.get("k", now=midnight) is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["expirations"] == 1
+
+
+def weekly_payload(start: date, days: int = 7) -> dict:
+    """Build a MuslimSalat-style weekly response starting at ``start``."""
+    return {
+        "items": [
+            {
+                "date_for": f"{d.year}-{d.month}-{d.day}",
+                "fajr": "4:30 am",
+                "shurooq": "6:00 am",
+                "dhuhr": "12:15 pm",
+                "asr": "3:45 pm",
+                "maghrib": f"6:{10 + i:02d} pm",
+                "isha": "7:40 pm",
+            }
+            for i, d in enumerate(start + timedelta(days=n) for n in range(days))
+        ]
+    }
+
+
+class FakeResponse:
+    """Async context manager mimicking an aiohttp response."""
+
+    def __init__(self, payload: dict, delay: float = 0):
+        self.status = 200
+        self.payload = payload
+        self.delay = delay
+
+    async def __aenter__(self):
+        await asyncio.sleep(self.delay)
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self):
+        return self.payload
+
+
+class FakeSession:
+    """Records requested URLs and returns a fixed payload."""
+
+    closed = False
+
+    def __init__(self, payload: dict, delay: float = 0):
+        self.payload = payload
+        self.delay = delay
+        self.urls: list[str] = []
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        return FakeResponse(self.payload, self.delay)
+
+
+async def test_weekly_response_serves_seven_days():
+    """One weekly request caches every day in the payload under its own date."""
+    start = date.today() + timedelta(days=1)
+    provider = MuslimSalatProvider("key")
+    session = FakeSession(weekly_payload(start))
+    provider.session = session
+    location = Location(location_type=LocationType.CITY, city="London", country="UK")
+
+    for i in range(7):
+        day = (start + timedelta(days=i)).isoformat()
+        times = await provider.get_prayer_times(location, day, "Europe/London", False, "5")
+        assert times.date == day
+        assert times.maghrib == f"18:{10 + i:02d}"
+        assert times.sunrise == "06:00"
+
+    assert len(session.urls) == 1
+    assert f"/weekly/{start:%d-%m-%Y}/false/5.json" in session.urls[0]
+
+
+async def test_concurrent_misses_are_coalesced():
+    """Concurrent callers for the same request share one HTTP fetch."""
+    start = date.today() + timedelta(days=1)
+    provider = MuslimSalatProvider("key")
+    session = FakeSession(weekly_payload(start), delay=0.01)
+    provider.session = session
+    location = Location(location_type=LocationType.CITY, city="London", country="UK")
+
+    results = await asyncio.gather(
+        *(
+            provider.get_prayer_times(location, start.isoformat(), "Europe/London", False, "5")
+            for _ in range(50)
+        )
+    )
+
+    assert all(r is results[0] for r in results)
+    assert len(session.urls) == 1
+    assert provider.requests_sent == 1
+    assert provider.requests_coalesced == 49
+    assert not provider._inflight
+
+
+
+async def test_cold_start_served_from_store(tmp_path):
+    """A new provider instance reads persisted times instead of calling the API."""
+    start = date.today() + timedelta(days=1)
+    location = Location(location_type=LocationType.CITY, city="London", country="UK")
+    db = Database(str(tmp_path / "athan.db"))
+    await db.connect()
+    try:
+        first = MuslimSalatProvider("key", store=db)
+        first.session = FakeSession(weekly_payload(start))
+        await first.get_prayer_times(location, start.isoformat(), "Europe/London", False, "5")
+
+        # Simulate a restart: empty memory cache, same database
+        second = MuslimSalatProvider("key", store=db)
+        session = FakeSession(weekly_payload(start))
+        second.session = session
+        day = (start + timedelta(days=3)).isoformat()
+        times = await second.get_prayer_times(location, day, "Europe/London", False, "5")
+
+        assert times.date == day
+        assert session.urls == []
+        assert second.store_hits == 1
+    finally:
+        await db.close()
+
+
+def reference_sun(when: datetime) -> tuple[float, float]:
+    """
+    Solar declination (degrees) and equation of time (minutes) at an instant.
+
+    NOAA's implementation of Meeus' algorithms, evaluated at the instant
+    itself. It is independent of the provider's noon-based approximation.
+    """
+    jd = when.timestamp() / 86400 + 2440587.5
+    t = (jd - 2451545.0) / 36525
+    mean_long = math.radians((280.46646 + t * (36000.76983 + t * 0.0003032)) % 360)
+    anomaly = math.radians(357.52911 + t * (35999.05029 - 0.0001537 * t))
+    ecc = 0.016708634 - t * (0.000042037 + 0.0000001267 * t)
+    center = (
+        math.sin(anomaly) * (1.914602 - t * (0.004817 + 0.000014 * t))
+        + math.sin(2 * anomaly) * (0.019993 - 0.000101 * t)
+        + math.sin(3 * anomaly) * 0.000289
+    )
+    omega = math.radians(125.04 - 1934.136 * t)
+    apparent = mean_long + math.radians(center - 0.00569 - 0.00478 * math.sin(omega))
+    mean_obliquity = 23 + (26 + (21.448 - t * (46.815 + t * (0.00059 - t * 0.001813))) / 60) / 60
+    obliquity = math.radians(mean_obliquity + 0.00256 * math.cos(omega))
+    declination = math.asin(math.sin(obliquity) * math.sin(apparent))
+    y = math.tan(obliquity / 2) ** 2
+    equation_of_time = 4 * math.degrees(
+        y * math.sin(2 * mean_long)
+        - 2 * ecc * math.sin(anomaly)
+        + 4 * ecc * y * math.sin(anomaly) * math.cos(2 * mean_long)
+        - 0.5 * y * y * math.sin(4 * mean_long)
+        - 1.25 * ecc * ecc * math.sin(2 * anomaly)
+    )
+    return math.degrees(declination), equation_of_time
+
+
+def reference_altitude(latitude: float, longitude: float, when: datetime) -> float:
+    """Geometric altitude of the sun in degrees at a UTC instant."""
+    declination, equation_of_time = reference_sun(when)
+    minutes = when.hour * 60 + when.minute + when.second / 60
+    hour_angle = math.radians((minutes + equation_of_time + 4 * longitude) / 4 - 180)
+    lat, decl = math.radians(latitude), math.radians(declination)
+    cos_zenith = math.sin(lat) * math.sin(decl) + math.cos(lat) * math.cos(decl) * math.cos(
+        hour_angle
+    )
+    return 90 - math.degrees(math.acos(cos_zenith))
+
+
+def reference_crossing(
+    latitude: float, longitude: float, altitude: float, near: datetime
+) -> datetime:
+    """When the sun passes ``altitude`` within 45 minutes of ``near`` (bisection)."""
+    low, high = near - timedelta(minutes=45), near + timedelta(minutes=45)
+    low_above = reference_altitude(latitude, longitude, low) > altitude
+    while high - low > timedelta(seconds=1):
+        mid = low + (high - low) / 2
+        if (reference_altitude(latitude, longitude, mid) > altitude) == low_above:
+            low = mid
+        else:
+            high = mid
+    return low
+
+
+class TestAstronomicalProvider:
+    """Test local astronomical calculation."""
+
+    @pytest.fixture
+    def provider(self):
+        """Create provider instance."""
+        return AstronomicalProvider()
+
+    @staticmethod
+    def minutes(hhmm: str) -> int:
+        hours, minutes = hhmm.split(":")
+        return int(hours) * 60 + int(minutes)
+
+    @pytest.mark.parametrize(
+        ("date", "sunrise", "dhuhr", "maghrib"),
+        [
+            # Almanac values for London (sunrise, solar noon, sunset)
+            ("2024-06-21", "04:43", "13:02", "21:21"),
+            ("2024-12-21", "08:04", "11:58", "15:53"),
+        ],
+    )
+    def test_london_sun_times(self, provider, date, sunrise, dhuhr, maghrib):
+        """Sunrise, noon and sunset match almanac values within two minutes."""
+        times = provider.calculate(51.5074, -0.1278, date, "Europe/London", "5")
+        assert abs(self.minutes(times.sunrise) - self.minutes(sunrise)) <= 2
+        assert abs(self.minutes(times.dhuhr) - self.minutes(dhuhr)) <= 2
+        assert abs(self.minutes(times.maghrib) - self.minutes(maghrib)) <= 2
+
+    @pytest.mark.parametrize(
+        "case",
+        [
+            # Latitude, longitude, timezone, method, date
+            (21.4225, 39.8262, "Asia/Riyadh", "6", "2024-03-20"),  # Makkah, Umm al-Qura
+            (24.8607, 67.0011, "Asia/Karachi", "2", "2024-05-01"),  # Karachi, Shafi
+            (24.8607, 67.0011, "Asia/Karachi", "3", "2024-11-01"),  # Karachi, Hanafi
+            (30.0444, 31.2357, "Africa/Cairo", "1", "2024-08-15"),  # Cairo, Egypt
+            (40.7128, -74.0060, "America/New_York", "4", "2024-07-04"),  # New York, ISNA
+            (51.5074, -0.1278, "Europe/London", "5", "2024-12-21"),  # London, MWL
+            (3.1390, 101.6869, "Asia/Kuala_Lumpur", "5", "2024-02-10"),  # Kuala Lumpur, MWL
+        ],
+    )
+    def test_twilight_and_asr_match_reference(self, provider, case):
+        """
+        Fajr, Asr and Isha are within a minute of an independent solar model.
+
+        Fajr and Isha are when the sun is at the method's twilight angle; Asr is
+        when shadows reach the method's factor plus the noon shadow. One minute
+        covers rounding to HH:MM plus the provider's noon-based approximation.
+        """
+        latitude, longitude, timezone, method, date = case
+        times = provider.calculate(latitude, longitude, date, timezone, method)
+        params = get_method_params(method)
+
+        def utc(hhmm: str) -> datetime:
+            local = datetime.strptime(f"{date} {hhmm}", "%Y-%m-%d %H:%M")
+            return local.replace(tzinfo=ZoneInfo(timezone)).astimezone(UTC)
+
+        def assert_close(hhmm: str, altitude: float):
+            reference = reference_crossing(latitude, longitude, altitude, utc(hhmm))
+            assert abs((utc(hhmm) - reference).total_seconds()) <= 60, hhmm
+
+        assert_close(times.fajr, -params.fajr_angle)
+        noon_declination, _ = reference_sun(utc(times.dhuhr))
+        noon_shadow = math.tan(math.radians(abs(latitude - noon_declination)))
+        assert_close(times.asr, math.degrees(math.atan(1 / (params.asr_factor + noon_shadow))))
+        if params.isha_angle is not None:
+            assert_close(times.isha, -params.isha_angle)
+
+    def test_prayers_are_ordered(self, provider):
+        """Prayers occur in order through the day for every method."""
+        for method in METHOD_PARAMS:
+            times = provider.calculate(25.2854, 51.5310, "2024-01-15", "Asia/Qatar", method)
+            order = [times.fajr, times.sunrise, times.dhuhr, times.asr, times.maghrib, times.isha]
+            assert [self.minutes(t) for t in order] == sorted(self.minutes(t) for t in order)
+
+    def test_umm_al_qura_fixed_isha(self, provider):
+        """Umm al-Qura Isha is 90 minutes after Maghrib."""
+        times = provider.calculate(21.4225, 39.8262, "2024-03-20", "Asia/Riyadh", "6")
+        assert self.minutes(times.isha) - self.minutes(times.maghrib) == 90
+
+    def test_hanafi_asr_is_later(self, provider):
+        """Hanafi Asr (shadow factor 2) is later than Shafi Asr."""
+        shafi = provider.calculate(24.8607, 67.0011, "2024-05-01", "Asia/Karachi", "2")
+        hanafi = provider.calculate(24.8607, 67.0011, "2024-05-01", "Asia/Karachi", "3")
+        assert self.minutes(hanafi.asr) > self.minutes(shafi.asr)
+        assert hanafi.fajr == shafi.fajr
+
+    async def test_city_without_coordinates(self, provider):
+        """Locations without coordinates cannot be calculated locally."""
+        location = Location(location_type=LocationType.CITY, city="London", country="UK")
+        assert await provider.get_prayer_times(location, "2024-06-21", "Europe/London") is None
+
+    async def test_polar_day_returns_none(self, provider):
+        """Dates where the sun never sets return None instead of raising."""
+        location = Location(
+            location_type=LocationType.COORDINATES, latitude=69.65, longitude=18.96
+        )
+        assert await provider.get_prayer_times(location, "2024-06-21", "Europe/Oslo") is None
+
+
+def test_batch_matches_scalar():
+    """Vectorized batch results match the scalar calculation."""
+    pytest.importorskip("numpy")
+    from athan.time_providers.batch import (  # noqa: PLC0415
+        BATCH_PRAYERS,
+        MISSING,
+        compute_prayer_times_batch,
+    )
+
+    locations = [(51.5074, -0.1278), (21.4225, 39.8262), (-33.8688, 151.2093), (69.65, 18.96)]
+    timezones = ["Europe/London", "Asia/Riyadh", "Australia/Sydney", "Europe/Oslo"]
+    dates = [date(2024, 1, 1) + timedelta(days=i) for i in range(0, 366, 7)]
+
+    for method in METHOD_PARAMS:
+        table = compute_prayer_times_batch(locations, dates, method, timezones)
+        assert table.shape == (len(locations), len(dates), len(BATCH_PRAYERS))
+
+        provider = AstronomicalProvider()
+        for i, ((lat, lon), tz) in enumerate(zip(locations, timezones, strict=True)):
+            for j, day in enumerate(dates):
+                try:
+                    times = provider.calculate(lat, lon, day.isoformat(), tz, method)
+                except ValueError:
+                    assert (table[i, j] == MISSING).all()
+                    continue
+                for k, prayer in enumerate(BATCH_PRAYERS):
+                    hours, minutes = times.get_time(prayer).split(":")
+                    assert table[i, j, k] == int(hours) * 60 + int(minutes)
+
+
+async def test_registry_shares_one_session():
+    """Every provider call through the registry reuses a single pooled session."""
+    settings = BotSettings(DISCORD_TOKEN="token", MUSLIMSALAT_API_KEY="key")
+    registry = ProviderRegistry(settings)
+    try:
+        first = await registry.muslimsalat._get_session()
+        second = await registry.muslimsalat._get_session()
+        assert first is second is registry.session
+        assert first.connector.limit == settings.http_connection_limit
+
+        coords = GuildSettings(
+            guild_id=1,
+            location=Location(
+                location_type=LocationType.COORDINATES, latitude=51.5, longitude=-0.13
+            ),
+        )
+        assert registry.for_settings(coords) is registry.astronomical
+    finally:
+        await registry.close()
+    assert registry.session.closed
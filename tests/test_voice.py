@@ -0,0 +1,218 @@
+"""Tests for voice playback helpers."""
+
+import asyncio
+import os
+from types import SimpleNamespace
+
+import discord
+import pytest
+import wavelink
+
+from athan import voice
+from athan.config import VoiceBackend
+from athan.voice import NodeLoad, NodeMonitor, TrackCache, VoiceSessionManager
+
+
+async def test_track_cache_resolves_once_until_file_changes(tmp_path, monkeypatch):
+    """Concurrent lookups share one Lavalink search; a newer mtime triggers another."""
+    audio = tmp_path / "adhan.mp3"
+    audio.write_bytes(b"audio")
+    searches = []
+
+    async def fake_search(query):
+        searches.append(query)
+        await asyncio.sleep(0.01)
+        return [f"track-{len(searches)}"]
+
+    monkeypatch.setattr(wavelink.Playable, "search", fake_search)
+    cache = TrackCache()
+
+    tracks = await asyncio.gather(*(cache.get(audio) for _ in range(5)))
+    assert tracks == ["track-1"] * 5
+    assert len(searches) == 1
+    assert searches[0] == f"local:{audio.absolute()}"
+
+    stat = audio.stat()
+    os.utime(audio, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert await cache.get(audio) == "track-2"
+    assert cache.misses == 2
+
+
+async def test_track_cache_missing_file(tmp_path):
+    """A missing file resolves to None without contacting Lavalink."""
+    assert await TrackCache().get(tmp_path / "missing.mp3") is None
+
+
+class FakeNode:
+    def __init__(self, identifier, players=0, status=wavelink.NodeStatus.CONNECTED):
+        self.identifier = identifier
+        self.players = dict.fromkeys(range(players))
+        self.status = status
+
+
+def test_best_node_prefers_low_load_and_skips_down_nodes():
+    """Placement weighs live players and CPU load and ignores disconnected nodes."""
+    monitor = NodeMonitor()
+    busy = FakeNode("busy", players=10)
+    idle_but_hot = FakeNode("hot", players=2)
+    quiet = FakeNode("quiet", players=4)
+    down = FakeNode("down", status=wavelink.NodeStatus.DISCONNECTED)
+    monitor.loads["hot"] = NodeLoad(cpu_load=0.5)
+    nodes = [busy, idle_but_hot, quiet, down]
+
+    assert monitor.best_node(nodes=nodes) is quiet
+    assert monitor.best_node(exclude=quiet, nodes=nodes) is busy
+    assert monitor.best_node(nodes=[down]) is None
+
+
+def test_node_play_latency_is_smoothed():
+    """Per-node play latency is a moving average of recorded plays."""
+    monitor = NodeMonitor()
+    node = FakeNode("a")
+    monitor.record_play(node, 1.0)
+    monitor.record_play(node, 2.0)
+
+    stats = monitor.stats()["a"]
+    assert stats["plays"] == 2
+    assert 1.0 < stats["play_latency"] < 2.0
+
+
+def test_auto_backend_goes_native_without_lavalink(monkeypatch):
+    """AUTO uses Lavalink while a node is connected and native playback otherwise."""
+    monkeypatch.setattr(voice, "voice_backend", VoiceBackend.AUTO)
+    monkeypatch.setattr(voice.node_monitor, "best_node", lambda: FakeNode("a"))
+    assert not voice.use_native_voice()
+
+    monkeypatch.setattr(voice.node_monitor, "best_node", lambda: None)
+    assert voice.use_native_voice()
+
+    monkeypatch.setattr(voice, "voice_backend", VoiceBackend.LAVALINK)
+    assert not voice.use_native_voice()
+
+
+class FakeVoiceClient:
+    def __init__(self, channel):
+        self.channel = channel
+        self.guild = channel.guild
+        self.disconnected = False
+
+    def is_connected(self):
+        return not self.disconnected
+
+    async def disconnect(self, force=False):
+        self.disconnected = True
+
+    async def move_to(self, channel):
+        self.channel = channel
+
+
+class FakeVoiceChannel:
+    def __init__(self, channel_id, guild_id):
+        self.id = channel_id
+        self.guild = SimpleNamespace(id=guild_id, voice_client=None)
+
+    async def connect(self):
+        return FakeVoiceClient(self)
+
+
+async def test_voice_sessions_are_reused_and_idle_out():
+    """A connected session is reused; it disconnects only once idle after playback."""
+    sessions = VoiceSessionManager(idle_timeout=0.05)
+    channel = FakeVoiceChannel(1, guild_id=10)
+
+    client = await sessions.acquire(channel, native=True)
+    sessions.started(10)
+    assert await sessions.acquire(channel, native=True) is client
+    assert (sessions.connects, sessions.reuses) == (1, 1)
+
+    await asyncio.sleep(0.1)
+    assert sessions.counts() == {"active": 1, "idle": 0}
+    assert not client.disconnected
+
+    sessions.finished(10)
+    assert sessions.counts() == {"active": 0, "idle": 1}
+    await asyncio.sleep(0.1)
+    assert client.disconnected
+    assert sessions.counts() == {"active": 0, "idle": 0}
+
+
+async def test_voice_session_cap_evicts_idle_then_refuses():
+    """At the cap the longest idle session makes room; playing sessions never do."""
+    sessions = VoiceSessionManager(max_sessions=2)
+    first = await sessions.acquire(FakeVoiceChannel(1, guild_id=10), native=True)
+    await sessions.acquire(FakeVoiceChannel(2, guild_id=20), native=True)
+    sessions.started(20)
+
+    assert await sessions.acquire(FakeVoiceChannel(3, guild_id=30), native=True)
+    assert first.disconnected
+    assert sessions.evictions == 1
+    sessions.started(30)
+
+    assert await sessions.acquire(FakeVoiceChannel(4, guild_id=40), native=True) is None
+    assert set(sessions.sessions) == {20, 30}
+    await sessions.close()
+
+
+async def test_fail_over_moves_players_to_best_node():
+    """Players on a dropped node are switched to the least loaded remaining node."""
+    moved_to = []
+
+    class FakePlayer:
+        async def switch_node(self, node):
+            moved_to.append(node.identifier)
+
+    down = FakeNode("down", status=wavelink.NodeStatus.DISCONNECTED)
+    down.players = {1: FakePlayer(), 2: FakePlayer()}
+    spare = FakeNode("spare")
+    monitor = NodeMonitor()
+    monitor.best_node = lambda exclude=None: spare
+
+    assert await monitor.fail_over(down) == 2
+    assert moved_to == ["spare", "spare"]
+
+
+def test_bot_module_matches_installed_wavelink():
+    """Event payload annotations resolve against the pinned wavelink API."""
+    from athan import bot  # noqa: PLC0415
+
+    assert hasattr(wavelink, "NodeDisconnectedEventPayload")
+    assert hasattr(wavelink.Player, "switch_node")
+    assert bot.AthanBot.on_wavelink_node_disconnected
+
+
+async def test_native_playback_releases_packets_when_play_fails(monkeypatch):
+    """If discord.py refuses to play, the packets are released instead of staying mapped."""
+
+    class FakePackets:
+        streams = 0
+
+        def acquire(self):
+            self.streams += 1
+
+        def release(self):
+            self.streams -= 1
+
+    class BusyClient:
+        guild = SimpleNamespace(id=1)
+
+        def play(self, source, after=None):
+            raise discord.ClientException("Already playing audio.")
+
+    packets = FakePackets()
+
+    async def fake_get(audio_file):
+        return packets
+
+    async def fake_connect(bot, voice_channel_id, *, native=False):
+        return BusyClient()
+
+    monkeypatch.setattr(voice.opus_cache, "get", fake_get)
+    monkeypatch.setattr(voice, "connect_voice_player", fake_connect)
+
+    try:
+        await voice._play_native(None, 10, "adhan.mp3")
+    except discord.ClientException:
+        # The traceback keeps the source alive, so only an explicit cleanup releases it
+        assert packets.streams == 0
+    else:
+        pytest.fail("play() error was swallowed")